@@ -0,0 +1,35 @@
+# analytics/admin.py
+from django.contrib import admin
+from .models import DailySalesRollup, ProductSalesRollup, RollupWatermark
+
+
+class ReadOnlyAdmin(admin.ModelAdmin):
+    """Rollups are derived data: rebuild them with backfill_sales_rollups instead of editing."""
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(DailySalesRollup)
+class DailySalesRollupAdmin(ReadOnlyAdmin):
+    list_display = ("day", "currency", "orders", "units", "revenue", "updated_at")
+    list_filter = ("currency",)
+    date_hierarchy = "day"
+    ordering = ("-day", "currency")
+
+
+@admin.register(ProductSalesRollup)
+class ProductSalesRollupAdmin(ReadOnlyAdmin):
+    list_display = ("day", "product_id", "currency", "units", "revenue")
+    list_filter = ("currency",)
+    search_fields = ("product_id",)
+    date_hierarchy = "day"
+    ordering = ("-day", "-units")
+
+
+@admin.register(RollupWatermark)
+class RollupWatermarkAdmin(ReadOnlyAdmin):
+    list_display = ("name", "paid_at", "order_id", "updated_at")
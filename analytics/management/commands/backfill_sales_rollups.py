@@ -0,0 +1,92 @@
+# analytics/management/commands/backfill_sales_rollups.py
+"""
+Rebuild the sales rollups from orders, in parallel date-range chunks.
+
+    python manage.py backfill_sales_rollups                         # all history up to today
+    python manage.py backfill_sales_rollups --from 2025-01-01 --to 2025-07-01 --workers 8 --chunk-days 7
+
+Days are rebuilt from scratch (delete + recompute), so re-running is safe.
+In batch mode only days already behind the rollup_sales watermark are
+rebuilt; the very first run (no --from) also initialises the watermark.
+"""
+import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils.dateparse import parse_date
+
+from analytics import rollups
+
+
+def _rebuild_chunk(start, end):
+    try:
+        return rollups.rebuild_range(start, end)
+    finally:
+        connection.close()  # worker threads own their connection
+
+
+class Command(BaseCommand):
+    help = "Rebuild DailySalesRollup/ProductSalesRollup for a date range, in parallel chunks."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--from", dest="start", help="first day (YYYY-MM-DD, default: first paid order, archived ones included)")
+        parser.add_argument("--to", dest="end", help="day after the last rebuilt day (default: today, UTC)")
+        parser.add_argument("--chunk-days", type=int, default=7)
+        parser.add_argument("--workers", type=int, default=4, help="parallel DB connections (use 1 on SQLite)")
+
+    def _day(self, value, name):
+        day = parse_date(value)
+        if day is None:
+            raise CommandError(f"--{name}: expected YYYY-MM-DD")
+        return day
+
+    def handle(self, *args, **options):
+        end = self._day(options["end"], "to") if options["end"] else rollups.utc_day(datetime.datetime.now(rollups.UTC))
+        if options["start"]:
+            start = self._day(options["start"], "from")
+        else:
+            first = rollups.first_paid_at()
+            start = rollups.utc_day(first) if first else end
+
+        initialise_watermark = False
+        if rollups.rollup_mode() == rollups.MODE_BATCH:
+            wm = rollups.get_watermark()
+            if wm.paid_at == rollups.EPOCH:
+                if options["start"]:
+                    raise CommandError("The rollup_sales watermark is not initialised yet; "
+                                       "run the first backfill without --from.")
+                initialise_watermark = True
+            else:
+                # Later days are (being) counted by rollup_sales
+                end = min(end, rollups.utc_day(wm.paid_at))
+
+        if start >= end:
+            self.stdout.write("Nothing to rebuild.")
+            return
+
+        step = datetime.timedelta(days=max(options["chunk_days"], 1))
+        chunks = []
+        cursor = start
+        while cursor < end:
+            chunks.append((cursor, min(cursor + step, end)))
+            cursor += step
+
+        orders = 0
+        if options["workers"] <= 1:
+            for chunk in chunks:
+                orders += rollups.rebuild_range(*chunk)
+                self.stdout.write(f"  {chunk[0]}..{chunk[1]} done")
+        else:
+            with ThreadPoolExecutor(max_workers=options["workers"]) as pool:
+                futures = {pool.submit(_rebuild_chunk, *chunk): chunk for chunk in chunks}
+                for future in as_completed(futures):
+                    orders += future.result()
+                    chunk = futures[future]
+                    self.stdout.write(f"  {chunk[0]}..{chunk[1]} done")
+
+        if initialise_watermark:
+            rollups.set_watermark(rollups.day_start(end))
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {start}..{end} ({len(chunks)} chunks, {orders} paid orders)"
+        ))
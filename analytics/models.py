@@ -0,0 +1,52 @@
+# analytics/models.py
+"""
+Precomputed sales rollups (paid orders only, bucketed by the UTC day of paid_at).
+Maintained by analytics.rollups: inline on payment, or by the watermark batch
+job, plus the parallel backfill command.
+"""
+from django.db import models
+
+
+class DailySalesRollup(models.Model):
+    day = models.DateField()
+    currency = models.CharField(max_length=10)
+    orders = models.PositiveIntegerField(default=0)
+    units = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=["day", "currency"], name="uniq_daily_sales_day_currency")]
+        ordering = ["day", "currency"]
+
+    def __str__(self):
+        return f"{self.day} {self.currency}: {self.revenue}"
+
+
+class ProductSalesRollup(models.Model):
+    day = models.DateField()
+    product_id = models.IntegerField()
+    currency = models.CharField(max_length=10)
+    units = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["day", "product_id", "currency"], name="uniq_product_sales_day_product"),
+        ]
+        indexes = [models.Index(fields=["product_id", "day"], name="product_sales_product_day")]
+
+    def __str__(self):
+        return f"{self.day} product={self.product_id}: {self.units}"
+
+
+class RollupWatermark(models.Model):
+    """Position of the batch job: every paid order with (paid_at, id) <= this is counted."""
+    name = models.CharField(max_length=50, primary_key=True)
+    paid_at = models.DateTimeField()
+    order_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name}: {self.paid_at.isoformat()} #{self.order_id}"
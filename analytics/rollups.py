@@ -0,0 +1,177 @@
+# analytics/rollups.py
+"""
+Maintenance of the sales rollups (analytics.models).
+
+Every order with a paid_at is counted once, in the UTC day of paid_at
+(gross sales: later refunds/cancellations do not change the rollups).
+
+ANALYTICS_ROLLUP_MODE picks how new payments are counted:
+- "inline": record_paid_order() increments the rollups inside the paying
+  transaction (Order.mark_paid_and_decrement_stock). Always fresh, but every
+  payment of a day/currency updates the same row.
+- "batch" (default): process_batch() (manage.py rollup_sales) folds paid
+  orders in (paid_at, id) order past a stored watermark. Orders younger than
+  ANALYTICS_ROLLUP_LAG_SECONDS are left for the next run, so a payment
+  transaction that commits late is not skipped.
+
+rebuild_range() recomputes whole days from the source tables (live and
+archived orders); the backfill
+command runs it in parallel date-range chunks.
+"""
+import datetime
+import logging
+from collections import defaultdict
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Min, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from orders.archive import SOURCES
+from orders.models import Order, OrderItem
+from .models import DailySalesRollup, ProductSalesRollup, RollupWatermark
+
+log = logging.getLogger("analytics.rollups")
+
+MODE_INLINE = "inline"
+MODE_BATCH = "batch"
+WATERMARK = "sales"
+EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+UTC = datetime.timezone.utc
+
+
+def rollup_mode():
+    return getattr(settings, "ANALYTICS_ROLLUP_MODE", MODE_BATCH)
+
+
+def utc_day(dt):
+    return dt.astimezone(UTC).date()
+
+
+def day_start(day):
+    return datetime.datetime.combine(day, datetime.time.min, tzinfo=UTC)
+
+
+def _increment(model, keys, deltas):
+    """UPDATE ... SET col = col + delta, creating the row on first use."""
+    updates = {name: F(name) + value for name, value in deltas.items()}
+    if model.objects.filter(**keys).update(**updates):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**keys, **deltas)
+    except IntegrityError:
+        # created concurrently between our UPDATE and INSERT
+        model.objects.filter(**keys).update(**updates)
+
+
+def _apply(order_rows, item_rows):
+    """
+    order_rows: (order_id, paid_at, currency, total_amount)
+    item_rows:  (order_id, product_id, qty, line_total)
+    """
+    daily = defaultdict(lambda: {"orders": 0, "units": 0, "revenue": Decimal("0.00")})
+    products = defaultdict(lambda: {"units": 0, "revenue": Decimal("0.00")})
+    bucket = {}
+    for order_id, paid_at, currency, total in order_rows:
+        key = (utc_day(paid_at), currency)
+        bucket[order_id] = key
+        daily[key]["orders"] += 1
+        daily[key]["revenue"] += total
+    for order_id, product_id, qty, line_total in item_rows:
+        day, currency = bucket[order_id]
+        daily[(day, currency)]["units"] += qty
+        products[(day, product_id, currency)]["units"] += qty
+        products[(day, product_id, currency)]["revenue"] += line_total
+
+    for (day, currency), deltas in daily.items():
+        _increment(DailySalesRollup, {"day": day, "currency": currency}, deltas)
+    for (day, product_id, currency), deltas in products.items():
+        _increment(ProductSalesRollup, {"day": day, "product_id": product_id, "currency": currency}, deltas)
+
+
+def _item_rows(order_ids):
+    return OrderItem.objects.filter(order_id__in=order_ids).values_list("order_id", "product_id", "qty", "line_total")
+
+
+def record_paid_order(order):
+    """Inline mode: count a just-paid order. Call inside the transaction that marks it paid."""
+    if rollup_mode() != MODE_INLINE:
+        return
+    _apply([(order.id, order.paid_at, order.currency, order.total_amount)], _item_rows([order.id]))
+
+
+def get_watermark():
+    return RollupWatermark.objects.get_or_create(name=WATERMARK, defaults={"paid_at": EPOCH})[0]
+
+
+def set_watermark(paid_at, order_id=0):
+    RollupWatermark.objects.update_or_create(name=WATERMARK, defaults={"paid_at": paid_at, "order_id": order_id})
+
+
+def process_batch(batch_size=1000, lag_seconds=None, now=None):
+    """Fold the next batch of paid orders past the watermark into the rollups. Returns orders processed."""
+    if lag_seconds is None:
+        lag_seconds = getattr(settings, "ANALYTICS_ROLLUP_LAG_SECONDS", 120)
+    cutoff = (now or timezone.now()) - datetime.timedelta(seconds=lag_seconds)
+    get_watermark()
+    with transaction.atomic():
+        # Row lock: concurrent runs queue here instead of double counting
+        wm = RollupWatermark.objects.select_for_update().get(name=WATERMARK)
+        rows = list(
+            Order.objects.filter(paid_at__isnull=False, paid_at__lt=cutoff)
+            .filter(Q(paid_at__gt=wm.paid_at) | Q(paid_at=wm.paid_at, id__gt=wm.order_id))
+            .order_by("paid_at", "id")
+            .values_list("id", "paid_at", "currency", "total_amount")[:batch_size]
+        )
+        if not rows:
+            return 0
+        _apply(rows, _item_rows([r[0] for r in rows]))
+        last_id, last_paid_at = rows[-1][0], rows[-1][1]
+        set_watermark(last_paid_at, last_id)
+    log.info("Sales rollup batch orders=%s watermark=%s #%s", len(rows), last_paid_at.isoformat(), last_id)
+    return len(rows)
+
+
+def first_paid_at():
+    """paid_at of the oldest paid order, live or archived (None without any)."""
+    firsts = [order_model.objects.aggregate(first=Min("paid_at"))["first"] for order_model, _ in SOURCES]
+    return min((first for first in firsts if first is not None), default=None)
+
+
+def rebuild_range(start, end):
+    """Recompute the rollups of days [start, end) from the source tables. Returns paid orders found."""
+    lo, hi = day_start(start), day_start(end)
+    daily = defaultdict(lambda: {"orders": 0, "units": 0, "revenue": Decimal("0.00")})
+    products = defaultdict(lambda: {"units": 0, "revenue": Decimal("0.00")})
+    # Archived orders keep counting (orders.archive moves old paid orders out of Order)
+    for order_model, item_model in SOURCES:
+        paid = order_model.objects.filter(paid_at__gte=lo, paid_at__lt=hi)
+        items = item_model.objects.filter(order__paid_at__gte=lo, order__paid_at__lt=hi)
+        for r in (paid.annotate(day=TruncDate("paid_at", tzinfo=UTC))
+                  .values("day", "currency").annotate(n=Count("id"), revenue=Sum("total_amount")).order_by()):
+            daily[(r["day"], r["currency"])]["orders"] += r["n"]
+            daily[(r["day"], r["currency"])]["revenue"] += r["revenue"]
+        for r in (items.annotate(day=TruncDate("order__paid_at", tzinfo=UTC))
+                  .values("day", "product_id", "order__currency")
+                  .annotate(units=Sum("qty"), revenue=Sum("line_total")).order_by().iterator()):
+            daily[(r["day"], r["order__currency"])]["units"] += r["units"]
+            key = (r["day"], r["product_id"], r["order__currency"])
+            products[key]["units"] += r["units"]
+            products[key]["revenue"] += r["revenue"]
+
+    with transaction.atomic():
+        DailySalesRollup.objects.filter(day__gte=start, day__lt=end).delete()
+        ProductSalesRollup.objects.filter(day__gte=start, day__lt=end).delete()
+        DailySalesRollup.objects.bulk_create(
+            (DailySalesRollup(day=day, currency=currency, **stats) for (day, currency), stats in daily.items()),
+            batch_size=1000,
+        )
+        ProductSalesRollup.objects.bulk_create(
+            (ProductSalesRollup(day=day, product_id=product_id, currency=currency, **stats)
+             for (day, product_id, currency), stats in products.items()),
+            batch_size=1000,
+        )
+    return sum(stats["orders"] for stats in daily.values())
@@ -0,0 +1,17 @@
+from rest_framework import serializers
+
+
+class DailySalesSerializer(serializers.Serializer):
+    day = serializers.DateField()
+    currency = serializers.CharField()
+    orders = serializers.IntegerField()
+    units = serializers.IntegerField()
+    revenue = serializers.DecimalField(max_digits=14, decimal_places=2)
+
+
+class ProductSalesSerializer(serializers.Serializer):
+    product_id = serializers.IntegerField()
+    title = serializers.CharField(allow_null=True)
+    currency = serializers.CharField()
+    units = serializers.IntegerField()
+    revenue = serializers.DecimalField(max_digits=14, decimal_places=2)
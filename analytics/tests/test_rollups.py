@@ -0,0 +1,117 @@
+# analytics/tests/test_rollups.py
+"""
+Sales rollups: inline and watermark-batch maintenance agree with a full
+rebuild (backfill command), and the staff endpoints read them.
+"""
+
+import datetime
+import io
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from analytics import rollups
+from analytics.models import DailySalesRollup, ProductSalesRollup
+from catalog.models import Category, Product
+from orders.archive import archive_batch
+from orders.models import Order, OrderItem
+
+User = get_user_model()
+
+
+class SalesRollupTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="gail@example.com", password="G-secure-pass1")
+        cat = Category.objects.create(name="Tools")
+        self.hammer = Product.objects.create(category=cat, sku="H1", title="Hammer", price=Decimal("12.00"),
+                                             stock_qty=100)
+        self.saw = Product.objects.create(category=cat, sku="S1", title="Saw", price=Decimal("30.00"), stock_qty=100)
+
+    def _order(self, lines, paid_days_ago=None, currency="USD"):
+        order = Order.objects.create(user=self.user, currency=currency)
+        total = Decimal("0.00")
+        for product, qty in lines:
+            OrderItem.objects.create(order=order, product_id=product.id, sku=product.sku, title=product.title,
+                                     unit_price=product.price, qty=qty, line_total=product.price * qty)
+            total += product.price * qty
+        order.subtotal_amount = order.total_amount = total
+        order.save()
+        if paid_days_ago is not None:
+            order.mark_paid_and_decrement_stock()
+            paid_at = timezone.now() - datetime.timedelta(days=paid_days_ago)
+            Order.objects.filter(pk=order.pk).update(paid_at=paid_at)
+        return order
+
+    def _snapshot(self):
+        daily = list(DailySalesRollup.objects.order_by("day", "currency")
+                     .values_list("day", "currency", "orders", "units", "revenue"))
+        products = list(ProductSalesRollup.objects.order_by("day", "product_id")
+                        .values_list("day", "product_id", "units", "revenue"))
+        return daily, products
+
+    @override_settings(ANALYTICS_ROLLUP_MODE="inline")
+    def test_inline_counts_each_payment_once(self):
+        order = self._order([(self.hammer, 2), (self.saw, 1)])
+        order.mark_paid_and_decrement_stock()
+        Order.objects.get(pk=order.pk).mark_paid_and_decrement_stock()  # duplicate delivery
+        row = DailySalesRollup.objects.get()
+        self.assertEqual((row.orders, row.units, row.revenue), (1, 3, Decimal("54.00")))
+        self.assertEqual(ProductSalesRollup.objects.get(product_id=self.hammer.id).units, 2)
+
+    @override_settings(ANALYTICS_ROLLUP_MODE="batch")
+    def test_batch_watermark_matches_rebuild(self):
+        self._order([(self.hammer, 1)], paid_days_ago=3)
+        self._order([(self.saw, 2)], paid_days_ago=3)
+        self._order([(self.hammer, 4), (self.saw, 1)], paid_days_ago=1)
+        self._order([(self.saw, 1)])  # unpaid
+        self.assertEqual(DailySalesRollup.objects.count(), 0)  # nothing inline
+
+        self.assertEqual(rollups.process_batch(batch_size=2, lag_seconds=0), 2)
+        self.assertEqual(rollups.process_batch(batch_size=2, lag_seconds=0), 1)
+        self.assertEqual(rollups.process_batch(batch_size=2, lag_seconds=0), 0)
+        batched = self._snapshot()
+        self.assertEqual(len(batched[0]), 2)
+
+        # Full rebuild of the same days gives identical rows
+        call_command("backfill_sales_rollups", "--workers", "1", "--chunk-days", "1",
+                     "--to", str(timezone.now().date() + datetime.timedelta(days=1)), stdout=io.StringIO())
+        self.assertEqual(self._snapshot(), batched)
+
+    @override_settings(ANALYTICS_ROLLUP_MODE="batch")
+    def test_first_backfill_initialises_watermark(self):
+        self._order([(self.hammer, 1)], paid_days_ago=2)
+        call_command("backfill_sales_rollups", "--workers", "1", stdout=io.StringIO())
+        self.assertEqual(DailySalesRollup.objects.get().orders, 1)
+        # Already counted by the backfill: the batch job must not add it again
+        self.assertEqual(rollups.process_batch(lag_seconds=0), 0)
+
+    @override_settings(ANALYTICS_ROLLUP_MODE="inline")
+    def test_backfill_starts_at_the_oldest_archived_order(self):
+        old = self._order([(self.hammer, 1)], paid_days_ago=10)
+        self._order([(self.saw, 1)], paid_days_ago=1)
+        Order.objects.filter(pk=old.pk).update(created_at=timezone.now() - datetime.timedelta(days=10))
+        self.assertEqual(archive_batch(timezone.now() - datetime.timedelta(days=5))[0], 1)
+        DailySalesRollup.objects.all().delete()
+        call_command("backfill_sales_rollups", "--workers", "1", stdout=io.StringIO())
+        self.assertEqual(DailySalesRollup.objects.count(), 2)
+
+    @override_settings(ANALYTICS_ROLLUP_MODE="inline")
+    def test_staff_endpoints(self):
+        self._order([(self.hammer, 3)], paid_days_ago=0)
+        self._order([(self.saw, 2)], paid_days_ago=0)
+        client = APIClient()
+        client.force_authenticate(self.user)
+        self.assertEqual(client.get("/api/analytics/sales/daily/").status_code, 403)
+
+        staff = User.objects.create_user(email="boss@example.com", password="B-secure-pass1", is_staff=True)
+        client.force_authenticate(staff)
+        daily = client.get("/api/analytics/sales/daily/", {"currency": "usd"}).json()
+        self.assertEqual(daily[0]["orders"], 2)
+        self.assertEqual(daily[0]["revenue"], "96.00")
+        top = client.get("/api/analytics/sales/top-products/", {"by": "revenue"}).json()
+        self.assertEqual([r["title"] for r in top], ["Saw", "Hammer"])
+        self.assertEqual(client.get("/api/analytics/sales/daily/", {"from": "nope"}).status_code, 400)
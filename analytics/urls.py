@@ -0,0 +1,7 @@
+from django.urls import path
+from .views import DailySalesView, TopProductsView
+
+urlpatterns = [
+    path("analytics/sales/daily/", DailySalesView.as_view(), name="analytics-sales-daily"),
+    path("analytics/sales/top-products/", TopProductsView.as_view(), name="analytics-top-products"),
+]
@@ -0,0 +1,67 @@
+# analytics/views.py
+"""
+Staff sales reports, read from the precomputed rollups (never from orders):
+
+GET /api/analytics/sales/daily/?from=2025-01-01&to=2025-02-01&currency=USD
+GET /api/analytics/sales/top-products/?from=&to=&currency=&by=units|revenue&limit=20
+
+`from` is inclusive, `to` exclusive (UTC days of payment).
+"""
+from django.db.models import Sum
+from django.utils.dateparse import parse_date
+from rest_framework import permissions
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from catalog.models import Product
+from .models import DailySalesRollup, ProductSalesRollup
+from .serializers import DailySalesSerializer, ProductSalesSerializer
+
+MAX_LIMIT = 200
+
+
+def _filter_range(qs, params):
+    for name, lookup in (("from", "day__gte"), ("to", "day__lt")):
+        if params.get(name):
+            day = parse_date(params[name])
+            if day is None:
+                raise ValidationError({name: "Expected YYYY-MM-DD"})
+            qs = qs.filter(**{lookup: day})
+    if params.get("currency"):
+        qs = qs.filter(currency=params["currency"].upper())
+    return qs
+
+
+class DailySalesView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        qs = _filter_range(DailySalesRollup.objects.all(), request.query_params).order_by("day", "currency")
+        rows = qs.values("day", "currency", "orders", "units", "revenue")
+        return Response(DailySalesSerializer(rows, many=True).data)
+
+
+class TopProductsView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        params = request.query_params
+        by = params.get("by", "units")
+        if by not in ("units", "revenue"):
+            raise ValidationError({"by": "Expected 'units' or 'revenue'"})
+        try:
+            limit = max(1, min(int(params.get("limit", 20)), MAX_LIMIT))
+        except ValueError:
+            raise ValidationError({"limit": "Expected an integer"})
+
+        rows = list(
+            _filter_range(ProductSalesRollup.objects.all(), params)
+            .values("product_id", "currency")
+            .annotate(units=Sum("units"), revenue=Sum("revenue"))
+            .order_by(f"-{by}", "product_id")[:limit]
+        )
+        titles = dict(Product.objects.filter(id__in=[r["product_id"] for r in rows]).values_list("id", "title"))
+        for row in rows:
+            row["title"] = titles.get(row["product_id"])
+        return Response(ProductSalesSerializer(rows, many=True).data)
@@ -0,0 +1,113 @@
+# benchmarks/__main__.py
+"""
+Run the in-process benchmark suite.
+
+    python -m benchmarks                                  # all flows, default sizes
+    python -m benchmarks --only cart_add,create_order --iterations 500
+    python -m benchmarks --output bench.json --baseline benchmarks/baseline.json
+
+A throwaway test database is created (and destroyed) for every run; the
+exit status is 1 when --baseline is given and a regression is found.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+from pathlib import Path
+
+DEFAULT_OUTPUT = Path(__file__).resolve().parent / "results" / "latest.json"
+
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__,
+                                formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--settings", default=os.environ.get("DJANGO_SETTINGS_MODULE", "ecom.settings.dev"))
+    p.add_argument("--categories", type=int, default=20)
+    p.add_argument("--products", type=int, default=2000)
+    p.add_argument("--users", type=int, default=50)
+    p.add_argument("--orders-per-user", type=int, default=5)
+    p.add_argument("--history-orders", type=int, default=1200, help="orders of the order-history customer")
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--iterations", type=int, default=200)
+    p.add_argument("--warmup", type=int, default=10)
+    p.add_argument("--only", default="", help="comma-separated flow names")
+    p.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    p.add_argument("--baseline", type=Path, help="fail on regressions against this results file")
+    p.add_argument("--tolerance", type=float, default=0.25, help="allowed relative p95 growth")
+    p.add_argument("--verbose", action="store_true", help="keep application INFO logs")
+    p.add_argument("--list", action="store_true", help="list flow names and exit")
+    return p.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    os.environ["DJANGO_SETTINGS_MODULE"] = args.settings
+
+    import django
+    django.setup()
+    if not args.verbose:
+        # Per-request INFO lines would dominate both the output and the timings
+        logging.disable(logging.INFO)
+
+    from django.db import connection
+    from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+
+    from .flows import ALL_FLOWS, BenchContext
+    from .harness import build_report, compare, format_table, run_flow, save_report
+    from .seed import seed_dataset
+
+    flows = [cls() for cls in ALL_FLOWS]
+    if args.list:
+        print("\n".join(f.name for f in flows))
+        return 0
+    if args.only:
+        wanted = {n.strip() for n in args.only.split(",") if n.strip()}
+        unknown = wanted - {f.name for f in flows}
+        if unknown:
+            print(f"unknown flows: {', '.join(sorted(unknown))}", file=sys.stderr)
+            return 2
+        flows = [f for f in flows if f.name in wanted]
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        # Measure the production request path: no per-request query inspection,
+        # Stripe key present (calls are mocked), unsigned webhooks accepted,
+        # no rate limits (every flow comes from one client).
+        with override_settings(
+            QUERY_INSPECTOR_SAMPLE_RATE=0.0,
+            RATELIMIT_ENABLED=False,
+            STRIPE_SECRET_KEY="sk_test_bench",
+            PAYMENTS_ALLOW_UNVERIFIED_WEBHOOKS=True,
+        ):
+            dataset = seed_dataset(
+                categories=args.categories, products=args.products, users=args.users,
+                orders_per_user=args.orders_per_user, seed=args.seed,
+            )
+            ctx = BenchContext(dataset, history_orders=args.history_orders)
+            results = {}
+            for flow in flows:
+                results[flow.name] = run_flow(flow, ctx, args.iterations, warmup=args.warmup)
+                print(f"  done {flow.name}", file=sys.stderr)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+    params = {k: v for k, v in vars(args).items() if k not in ("output", "baseline", "list", "verbose")}
+    report = build_report(results, params)
+    save_report(report, args.output)
+    print(format_table(results))
+    print(f"\nresults written to {args.output}")
+
+    if args.baseline:
+        problems = compare(report, json.loads(args.baseline.read_text()), tolerance=args.tolerance)
+        if problems:
+            print("\nREGRESSIONS:\n  " + "\n  ".join(problems))
+            return 1
+        print("no regressions against", args.baseline)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,309 @@
+# benchmarks/flows.py
+"""
+Core purchase-flow benchmarks, driven through the Django test client so the
+full middleware/DRF stack is measured:
+
+browse (filters, search) -> cart add/update/get -> create-order
+-> create-intent (Stripe mocked) -> webhook payment_intent.succeeded
+
+plus order history for a customer with --history-orders (1k+) orders,
+full representation vs ?fields= projection, and serializer throughput
+(rows/s) of the DRF serializers vs ecom.fastserializers and of the
+stdlib JSONRenderer vs ecom.renderers.ORJSONRenderer.
+"""
+from decimal import Decimal
+from itertools import count
+from unittest.mock import patch
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from cart.models import Cart, CartItem
+from catalog.models import Product
+from catalog.serializers import ProductSerializer
+from ecom.fastserializers import FastSerializer
+from ecom.renderers import ORJSONRenderer
+from orders.models import Order, OrderItem
+from orders.serializers import OrderSerializer
+
+from .harness import Flow
+from .seed import seed_orders
+
+
+class BenchContext:
+    """Seeded dataset plus one force-authenticated client per user."""
+
+    def __init__(self, dataset, history_orders=1200):
+        self.dataset = dataset
+        self.history_orders = history_orders
+        self._clients = {}
+        self._history_user = None
+        self.anonymous = APIClient()
+
+    def user(self, i):
+        users = self.dataset.users
+        return users[i % len(users)]
+
+    def client(self, user):
+        c = self._clients.get(user.pk)
+        if c is None:
+            c = APIClient()
+            c.force_authenticate(user)
+            self._clients[user.pk] = c
+        return c
+
+    def product_id(self, i):
+        ids = self.dataset.product_ids
+        return ids[(i * 7919) % len(ids)]
+
+    def history_user(self):
+        """A customer with history_orders orders (seeded on first use)."""
+        if self._history_user is None:
+            from django.contrib.auth import get_user_model
+            user = get_user_model().objects.create_user(email="bench-history@example.com", password=None)
+            seed_orders([user], self.history_orders)
+            self._history_user = user
+        return self._history_user
+
+
+def _fill_cart(user, product_ids):
+    cart, _ = Cart.objects.get_or_create(user=user, status=Cart.STATUS_OPEN)
+    prices = dict(Product.objects.filter(id__in=product_ids).values_list("id", "price"))
+    CartItem.objects.filter(cart=cart).delete()
+    CartItem.objects.bulk_create(
+        [CartItem(cart=cart, product_id=pid, qty=1, unit_price=prices[pid]) for pid in product_ids]
+    )
+    return cart
+
+
+def _pending_order(user, product_ids, payment_intent_id=""):
+    prices = dict(Product.objects.filter(id__in=product_ids).values_list("id", "price"))
+    total = sum(prices.values(), Decimal("0.00"))
+    order = Order.objects.create(
+        user=user, currency="USD", subtotal_amount=total, total_amount=total,
+        payment_intent_id=payment_intent_id,
+    )
+    OrderItem.objects.bulk_create([
+        OrderItem(order=order, product_id=pid, sku=f"P{pid}", title=f"Product {pid}",
+                  unit_price=prices[pid], qty=1, line_total=prices[pid])
+        for pid in product_ids
+    ])
+    return order
+
+
+class ProductListFiltered(Flow):
+    name = "product_list_filtered"
+
+    def run(self, ctx, i):
+        category = ctx.dataset.category_ids[i % len(ctx.dataset.category_ids)]
+        return ctx.anonymous.get(
+            "/api/products/", {"category": category, "in_stock": "true", "ordering": "price", "price_max": "500"}
+        )
+
+
+class ProductSearch(Flow):
+    name = "product_search"
+
+    def run(self, ctx, i):
+        term = ctx.dataset.search_terms[i % len(ctx.dataset.search_terms)]
+        return ctx.anonymous.get("/api/products/", {"search": term, "category": ctx.dataset.category_ids[0]})
+
+
+class CartAdd(Flow):
+    name = "cart_add"
+    expected_status = (201,)
+
+    def run(self, ctx, i):
+        return ctx.client(ctx.user(i)).post(
+            "/api/cart/items/", {"product_id": ctx.product_id(i), "qty": 1}, format="json"
+        )
+
+
+class CartUpdate(Flow):
+    name = "cart_update"
+
+    def prepare(self, ctx, i):
+        user = ctx.user(i)
+        self.item_id = _fill_cart(user, [ctx.product_id(i)]).items.values_list("id", flat=True)[0]
+
+    def run(self, ctx, i):
+        return ctx.client(ctx.user(i)).patch(f"/api/cart/items/{self.item_id}/", {"qty": 2}, format="json")
+
+
+class CartGet(Flow):
+    name = "cart_get"
+
+    def run(self, ctx, i):
+        return ctx.client(ctx.user(i)).get("/api/cart/")
+
+
+class CreateOrder(Flow):
+    name = "create_order"
+    expected_status = (201,)
+
+    def prepare(self, ctx, i):
+        _fill_cart(ctx.user(i), [ctx.product_id(i), ctx.product_id(i + 1), ctx.product_id(i + 2)])
+
+    def run(self, ctx, i):
+        return ctx.client(ctx.user(i)).post("/api/checkout/create-order/", {}, format="json")
+
+
+class CreateIntent(Flow):
+    name = "create_intent"
+
+    def setup(self, ctx):
+        seq = count()
+
+        def fake_create(**kwargs):
+            pi = f"pi_bench_{next(seq)}"
+            return {"id": pi, "client_secret": f"{pi}_secret", "amount": kwargs["amount"],
+                    "currency": kwargs["currency"]}
+
+        self._patch = patch("payments.views.stripe.PaymentIntent.create", side_effect=fake_create)
+        self._patch.start()
+
+    def prepare(self, ctx, i):
+        self.order_id = _pending_order(ctx.user(i), [ctx.product_id(i)]).id
+
+    def run(self, ctx, i):
+        return ctx.client(ctx.user(i)).post("/api/payments/create-intent/", {"order_id": self.order_id},
+                                            format="json")
+
+    def teardown(self, ctx):
+        self._patch.stop()
+
+
+class WebhookSucceeded(Flow):
+    name = "webhook_succeeded"
+
+    def prepare(self, ctx, i):
+        pi = f"pi_hook_{i}"
+        order = _pending_order(ctx.user(i), [ctx.product_id(i), ctx.product_id(i + 3)], payment_intent_id=pi)
+        self.event = {
+            "id": f"evt_bench_{i}_{order.id}",
+            "type": "payment_intent.succeeded",
+            "data": {"object": {"id": pi, "metadata": {"order_id": str(order.id)}}},
+        }
+
+    def run(self, ctx, i):
+        return ctx.anonymous.post("/api/payments/webhook/", self.event, format="json")
+
+
+class OrderHistoryFull(Flow):
+    name = "order_history_full"
+
+    def setup(self, ctx):
+        self.client = ctx.client(ctx.history_user())
+
+    def run(self, ctx, i):
+        return self.client.get("/api/orders/")
+
+
+class OrderHistoryCompact(Flow):
+    name = "order_history_compact"
+
+    def setup(self, ctx):
+        self.client = ctx.client(ctx.history_user())
+
+    def run(self, ctx, i):
+        return self.client.get("/api/orders/", {"fields": "id,status,total_amount,created_at"})
+
+
+class OrderHistoryExpanded(Flow):
+    name = "order_history_expanded"
+
+    def setup(self, ctx):
+        self.client = ctx.client(ctx.history_user())
+
+    def run(self, ctx, i):
+        return self.client.get("/api/orders/", {"fields": "id,status,total_amount,created_at",
+                                                "expand": "items"})
+
+
+class _SerializeFlow(Flow):
+    """Serialize a fixed queryset (query included); run() returns no response."""
+    serializer_class = None
+    fast = False
+
+    def queryset(self, ctx):
+        raise NotImplementedError
+
+    def setup(self, ctx):
+        self.qs = self.queryset(ctx)
+        self.rows = self.qs.count()
+        self.fast_serializer = FastSerializer(self.serializer_class)
+
+    def run(self, ctx, i):
+        qs = self.qs.all()  # fresh clone: no result cache between runs
+        if self.fast:
+            self.fast_serializer.serialize(qs)
+        else:
+            self.serializer_class(qs, many=True).data
+
+
+class SerializeProductsDRF(_SerializeFlow):
+    name = "serialize_products_drf"
+    serializer_class = ProductSerializer
+
+    def queryset(self, ctx):
+        return Product.objects.select_related("category").order_by("id")
+
+
+class SerializeProductsFast(SerializeProductsDRF):
+    name = "serialize_products_fast"
+    fast = True
+
+
+class SerializeOrdersDRF(_SerializeFlow):
+    name = "serialize_orders_drf"
+    serializer_class = OrderSerializer
+
+    def queryset(self, ctx):
+        return Order.objects.filter(user=ctx.history_user()).prefetch_related("items").order_by("id")
+
+
+class SerializeOrdersFast(SerializeOrdersDRF):
+    name = "serialize_orders_fast"
+    fast = True
+
+
+class RenderProductsStdlib(Flow):
+    """Render an already serialized product list (no DB work)."""
+    name = "render_products_stdlib"
+    renderer_class = JSONRenderer
+
+    def setup(self, ctx):
+        self.data = FastSerializer(ProductSerializer).serialize(
+            Product.objects.select_related("category").order_by("id")
+        )
+        self.rows = len(self.data)
+        self.renderer = self.renderer_class()
+
+    def run(self, ctx, i):
+        self.renderer.render(self.data)
+
+
+class RenderProductsOrjson(RenderProductsStdlib):
+    name = "render_products_orjson"
+    renderer_class = ORJSONRenderer
+
+
+ALL_FLOWS = [
+    ProductListFiltered,
+    ProductSearch,
+    CartAdd,
+    CartUpdate,
+    CartGet,
+    CreateOrder,
+    CreateIntent,
+    WebhookSucceeded,
+    OrderHistoryFull,
+    OrderHistoryCompact,
+    OrderHistoryExpanded,
+    SerializeProductsDRF,
+    SerializeProductsFast,
+    SerializeOrdersDRF,
+    SerializeOrdersFast,
+    RenderProductsStdlib,
+    RenderProductsOrjson,
+]
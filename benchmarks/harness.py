@@ -0,0 +1,162 @@
+# benchmarks/harness.py
+"""
+Timing harness: runs Flow objects in-process, collects latency percentiles
+and query counts, writes JSON results and compares them against a baseline.
+"""
+import json
+import math
+import platform
+import statistics
+import subprocess
+import time
+from contextlib import ExitStack
+from datetime import datetime, timezone
+
+from django.db import connections
+
+
+class Flow:
+    """
+    One benchmarked operation.
+
+    setup(ctx)      once, untimed (e.g. patch Stripe, pick fixtures)
+    prepare(ctx, i) before each iteration, untimed (e.g. fill a cart)
+    run(ctx, i)     timed; should return the response so status can be checked
+    teardown(ctx)   once, untimed
+
+    Throughput flows set `rows` (rows handled per run) to get rows/s reported.
+    """
+    name = ""
+    expected_status = (200,)
+    rows = None
+
+    def setup(self, ctx):
+        pass
+
+    def prepare(self, ctx, i):
+        pass
+
+    def run(self, ctx, i):
+        raise NotImplementedError
+
+    def teardown(self, ctx):
+        pass
+
+
+class _QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile over an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    k = math.ceil(pct / 100 * len(sorted_values)) - 1
+    return sorted_values[max(0, min(len(sorted_values) - 1, k))]
+
+
+def summarize(timings_ms, query_counts):
+    timings = sorted(timings_ms)
+    return {
+        "iterations": len(timings),
+        "mean_ms": round(statistics.fmean(timings), 3) if timings else 0.0,
+        "p50_ms": round(percentile(timings, 50), 3),
+        "p95_ms": round(percentile(timings, 95), 3),
+        "p99_ms": round(percentile(timings, 99), 3),
+        "max_ms": round(timings[-1], 3) if timings else 0.0,
+        "queries_median": statistics.median(query_counts) if query_counts else 0,
+        "queries_max": max(query_counts) if query_counts else 0,
+    }
+
+
+def run_flow(flow, ctx, iterations, warmup=0):
+    flow.setup(ctx)
+    try:
+        for i in range(warmup):
+            flow.prepare(ctx, -1 - i)
+            flow.run(ctx, -1 - i)
+
+        timings, queries = [], []
+        for i in range(iterations):
+            flow.prepare(ctx, i)
+            counter = _QueryCounter()
+            with ExitStack() as stack:
+                for conn in connections.all():
+                    stack.enter_context(conn.execute_wrapper(counter))
+                start = time.perf_counter()
+                result = flow.run(ctx, i)
+                elapsed = (time.perf_counter() - start) * 1000
+            status = getattr(result, "status_code", None)
+            if status is not None and status not in flow.expected_status:
+                raise RuntimeError(f"{flow.name}: unexpected status {status}: {result.content[:300]!r}")
+            timings.append(elapsed)
+            queries.append(counter.count)
+    finally:
+        flow.teardown(ctx)
+    result = summarize(timings, queries)
+    if flow.rows and result["mean_ms"]:
+        result["rows_per_s"] = round(flow.rows / (result["mean_ms"] / 1000))
+    return result
+
+
+def _git_rev():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def build_report(results, params):
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "git_rev": _git_rev(),
+            "python": platform.python_version(),
+            "params": params,
+        },
+        "flows": results,
+    }
+
+
+def save_report(report, path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2, sort_keys=True))
+
+
+def compare(current, baseline, tolerance=0.25, min_delta_ms=1.0):
+    """
+    Return a list of regression messages (empty == pass).
+    - p95 latency may grow by `tolerance` (and at least `min_delta_ms`, to
+      ignore noise on sub-millisecond flows).
+    - Query counts are deterministic, so any increase is a regression.
+    """
+    problems = []
+    for name, base in baseline.get("flows", {}).items():
+        cur = current.get("flows", {}).get(name)
+        if cur is None:
+            continue
+        limit = max(base["p95_ms"] * (1 + tolerance), base["p95_ms"] + min_delta_ms)
+        if cur["p95_ms"] > limit:
+            problems.append(f"{name}: p95 {cur['p95_ms']:.2f}ms > {limit:.2f}ms (baseline {base['p95_ms']:.2f}ms)")
+        if cur["queries_max"] > base["queries_max"]:
+            problems.append(f"{name}: queries {cur['queries_max']} > baseline {base['queries_max']}")
+    return problems
+
+
+def format_table(results):
+    header = f"{'flow':<28}{'n':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'queries':>9}{'rows/s':>11}"
+    lines = [header, "-" * len(header)]
+    for name, r in results.items():
+        rows = r.get("rows_per_s")
+        lines.append(
+            f"{name:<28}{r['iterations']:>6}{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}{r['p99_ms']:>10.2f}"
+            f"{r['queries_max']:>9}{rows if rows is not None else '':>11}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,122 @@
+# benchmarks/seed.py
+"""
+Deterministic data generator for benchmarks.
+
+seed_dataset() bulk-inserts N categories, M products and K users, each user
+with an open cart and a few orders. The same seed always yields the same rows,
+so results are comparable between runs.
+"""
+import random
+from dataclasses import dataclass, field
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+
+from cart.models import Cart, CartItem
+from catalog.models import Category, Product
+from orders.models import Order, OrderItem
+
+WORDS = (
+    "alpha", "nova", "classic", "ultra", "mini", "pro", "max", "lite", "eco", "smart",
+    "wireless", "steel", "carbon", "cotton", "travel", "studio", "sport", "home", "urban", "retro",
+)
+
+BENCH_PASSWORD = "Bench-pass-1"
+
+
+@dataclass
+class Dataset:
+    category_ids: list = field(default_factory=list)
+    product_ids: list = field(default_factory=list)
+    users: list = field(default_factory=list)
+    search_terms: list = field(default_factory=lambda: list(WORDS))
+
+
+def _price(rng):
+    return Decimal(rng.randint(199, 99999)) / Decimal("100")
+
+
+def seed_dataset(categories=20, products=2000, users=50, orders_per_user=5, items_per_order=3, seed=42):
+    rng = random.Random(seed)
+    User = get_user_model()
+
+    Category.objects.bulk_create(
+        [Category(name=f"Category {i:03d}", slug=f"category-{i:03d}", description=f"{rng.choice(WORDS)} goods")
+         for i in range(categories)],
+        batch_size=500,
+    )
+    category_ids = list(Category.objects.order_by("id").values_list("id", flat=True))
+
+    Product.objects.bulk_create(
+        [
+            Product(
+                category_id=category_ids[i % len(category_ids)],
+                sku=f"SKU{i:07d}",
+                title=f"{rng.choice(WORDS).title()} {rng.choice(WORDS)} {i}",
+                slug=f"product-{i:07d}",
+                description=" ".join(rng.choice(WORDS) for _ in range(12)),
+                price=_price(rng),
+                currency="USD",
+                stock_qty=10_000_000 if rng.random() > 0.1 else 0,
+                is_active=rng.random() > 0.02,
+            )
+            for i in range(products)
+        ],
+        batch_size=1000,
+    )
+    in_stock = list(
+        Product.objects.filter(is_active=True, stock_qty__gt=0).order_by("id").values_list("id", "price")
+    )
+
+    # One hash for everyone: hashing K passwords would dominate seeding time.
+    password = make_password(BENCH_PASSWORD)
+    User.objects.bulk_create(
+        [User(email=f"bench{i:05d}@example.com", password=password) for i in range(users)],
+        batch_size=1000,
+    )
+    user_list = list(User.objects.filter(email__startswith="bench").order_by("id"))
+
+    Cart.objects.bulk_create([Cart(user=u, status=Cart.STATUS_OPEN) for u in user_list], batch_size=1000)
+    carts = Cart.objects.filter(user__in=user_list, status=Cart.STATUS_OPEN)
+    cart_items = []
+    for cart in carts:
+        for product_id, price in rng.sample(in_stock, k=min(2, len(in_stock))):
+            cart_items.append(CartItem(cart=cart, product_id=product_id, qty=1, unit_price=price))
+    CartItem.objects.bulk_create(cart_items, batch_size=1000)
+
+    seed_orders(user_list, orders_per_user, items_per_order=items_per_order, rng=rng, in_stock=in_stock)
+    return Dataset(category_ids=category_ids, product_ids=[pid for pid, _ in in_stock], users=user_list)
+
+
+def seed_orders(users, orders_per_user, items_per_order=3, rng=None, in_stock=None):
+    """Bulk-insert paid/pending orders (with items) for the given users."""
+    rng = rng or random.Random(0)
+    if in_stock is None:
+        in_stock = list(
+            Product.objects.filter(is_active=True, stock_qty__gt=0).order_by("id").values_list("id", "price")
+        )
+    statuses = (Order.STATUS_PAID, Order.STATUS_PAID, Order.STATUS_PENDING, Order.STATUS_FAILED)
+
+    orders, lines = [], []
+    for user in users:
+        for _ in range(orders_per_user):
+            picked = rng.sample(in_stock, k=min(items_per_order, len(in_stock)))
+            qtys = [rng.randint(1, 3) for _ in picked]
+            subtotal = sum((price * q for (_, price), q in zip(picked, qtys)), Decimal("0.00"))
+            orders.append(Order(
+                user=user, status=rng.choice(statuses), currency="USD",
+                subtotal_amount=subtotal, total_amount=subtotal,
+            ))
+            lines.append((picked, qtys))
+    Order.objects.bulk_create(orders, batch_size=1000)
+
+    items = []
+    for order, (picked, qtys) in zip(orders, lines):
+        for (product_id, price), q in zip(picked, qtys):
+            items.append(OrderItem(
+                order=order, product_id=product_id, sku=f"P{product_id}", title=f"Product {product_id}",
+                unit_price=price, qty=q, line_total=price * q,
+            ))
+    OrderItem.objects.bulk_create(items, batch_size=2000)
+    return orders
@@ -0,0 +1,57 @@
+# cart/management/commands/sweep_carts.py
+"""
+Clean up abandoned and finished carts (see cart/sweep.py).
+
+    python manage.py sweep_carts                      # cron, e.g. hourly
+    python manage.py sweep_carts --open-ttl-days 14 --batch-size 200 --sleep 0.1
+    python manage.py sweep_carts --dry-run
+    python manage.py sweep_carts --pushgateway pushgateway:9091
+    python manage.py sweep_carts --metrics-textfile /var/lib/node_exporter/textfile/sweep_carts.prom
+"""
+import logging
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from cart import sweep
+
+log = logging.getLogger("cart.sweep")
+
+
+class Command(BaseCommand):
+    help = "Delete/cancel idle open carts and delete old converted/canceled carts, in small batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--open-ttl-days", type=int, default=settings.CART_OPEN_TTL_DAYS,
+                            help="open carts idle this long are swept")
+        parser.add_argument("--closed-days", type=int, default=settings.CART_CLOSED_RETENTION_DAYS,
+                            help="converted/canceled carts older than this are deleted")
+        parser.add_argument("--batch-size", type=int, default=settings.CART_SWEEP_BATCH_SIZE)
+        parser.add_argument("--max-batches", type=int, default=None, help="stop after this many batches")
+        parser.add_argument("--sleep", type=float, default=0.0, help="pause between batches (s)")
+        parser.add_argument("--dry-run", action="store_true", help="only count what would be swept")
+        parser.add_argument("--pushgateway", default=settings.CART_SWEEP_PUSHGATEWAY,
+                            help="push metrics to this Prometheus Pushgateway (host:port) when done")
+        parser.add_argument("--metrics-textfile", default=settings.CART_SWEEP_METRICS_TEXTFILE,
+                            help="write metrics to this file for the node_exporter textfile collector")
+
+    def handle(self, *args, **options):
+        if options["dry_run"]:
+            now = timezone.now()
+            idle = sweep.idle_open_carts(sweep.cutoff_for(options["open_ttl_days"], now))
+            closed = sweep.expired_closed_carts(sweep.cutoff_for(options["closed_days"], now))
+            self.stdout.write(f"{idle.count()} idle open carts, {closed.count()} expired closed carts would be swept")
+            return
+        try:
+            stats = sweep.sweep(
+                open_ttl_days=options["open_ttl_days"], closed_days=options["closed_days"],
+                batch_size=options["batch_size"], max_batches=options["max_batches"], pause=options["sleep"],
+            )
+        finally:
+            # Also after a failed run: the batches done so far are committed
+            try:
+                sweep.export_metrics(options["pushgateway"], options["metrics_textfile"])
+            except Exception:
+                log.exception("Could not export cart sweep metrics")
+        self.stdout.write(self.style.SUCCESS(f"Cart sweep done: {stats}"))
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:33
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cart', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cart',
+            index=models.Index(condition=models.Q(('status', 'open')), fields=['updated_at', 'id'], name='cart_open_updated_idx'),
+        ),
+    ]
@@ -21,7 +21,11 @@ class Cart(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
-        indexes = [models.Index(fields=["user", "status"])]
+        indexes = [
+            models.Index(fields=["user", "status"]),
+            # sweep_carts walks idle open carts in (updated_at, id) order
+            models.Index(fields=["updated_at", "id"], condition=models.Q(status="open"), name="cart_open_updated_idx"),
+        ]
         constraints = [
             models.UniqueConstraint(fields=["user"], condition=models.Q(status="open"), name="uniq_open_cart_per_user")
         ]
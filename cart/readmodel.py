@@ -0,0 +1,68 @@
+# cart/readmodel.py
+"""
+Read model of a user's open cart, shared by GET /api/cart/ (CartSerializer)
+and the storefront cart page.
+
+open_cart() runs one query: the open cart LEFT JOIN its items and their
+products, with line totals and the subtotal computed by the database
+(Decimal, via a window SUM) — no per-item Python arithmetic, no second
+query for products. Any cart caching belongs here so both paths share it.
+"""
+from decimal import Decimal
+
+from django.db.models import DecimalField, ExpressionWrapper, F, Sum, Window
+
+from .models import Cart
+
+MONEY = DecimalField(max_digits=12, decimal_places=2)
+CENT = Decimal("0.01")
+ZERO = Decimal("0.00")
+
+_LINE_TOTAL = ExpressionWrapper(F("items__unit_price") * F("items__qty"), output_field=MONEY)
+_CART_COLUMNS = ("id", "status", "created_at", "updated_at")
+_ITEM_COLUMNS = (
+    ("id", "items__id"),
+    ("product_id", "items__product_id"),
+    ("title", "items__product__title"),
+    ("qty", "items__qty"),
+    ("unit_price", "items__unit_price"),
+    ("line_total", "line_total"),
+    ("created_at", "items__created_at"),
+    ("updated_at", "items__updated_at"),
+)
+
+
+def open_cart(user):
+    """
+    The user's open cart as a dict (id, status, created_at, updated_at,
+    items: [dicts of _ITEM_COLUMNS], subtotal), or None when there is none.
+    """
+    rows = list(
+        Cart.objects.filter(user=user, status=Cart.STATUS_OPEN)
+        .annotate(line_total=_LINE_TOTAL, subtotal=Window(Sum(_LINE_TOTAL)))
+        .order_by("items__id")
+        .values_list(*_CART_COLUMNS, *(lookup for _, lookup in _ITEM_COLUMNS), "subtotal")
+    )
+    if not rows:
+        return None
+    item_start = len(_CART_COLUMNS)
+    item_names = [name for name, _ in _ITEM_COLUMNS]
+    cart = dict(zip(_CART_COLUMNS, rows[0][:item_start]))
+    cart["items"] = [
+        dict(zip(item_names, row[item_start:-1]))
+        for row in rows
+        if row[item_start] is not None  # LEFT JOIN row of an empty cart
+    ]
+    # SQLite hands computed decimals back unscaled; PostgreSQL already has 2 places
+    for item in cart["items"]:
+        item["line_total"] = item["line_total"].quantize(CENT)
+    cart["subtotal"] = rows[0][-1].quantize(CENT) if cart["items"] else ZERO
+    return cart
+
+
+def empty_cart(cart):
+    """Read model of a cart just created (no items), without querying again."""
+    return {
+        "id": cart.id, "status": cart.status, "created_at": cart.created_at, "updated_at": cart.updated_at,
+        "items": [], "subtotal": ZERO,
+    }
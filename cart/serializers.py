@@ -1,6 +1,6 @@
 from decimal import Decimal
 from rest_framework import serializers
-from .models import Cart, CartItem
+from .models import CartItem
 from catalog.models import Product
 
 class CartItemSerializer(serializers.ModelSerializer):
@@ -28,14 +28,21 @@ class CartItemSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError({"qty": f"requested {qty} exceeds available stock {product.stock_qty}"})
         return data
 
-class CartSerializer(serializers.ModelSerializer):
-    items = CartItemSerializer(many=True, read_only=True)
-    subtotal = serializers.SerializerMethodField(read_only=True)
+class CartLineSerializer(serializers.Serializer):
+    """Read-only item of the cart read model (cart/readmodel.py); same output as CartItemSerializer."""
+    id = serializers.IntegerField()
+    product = serializers.IntegerField(source="product_id")
+    qty = serializers.IntegerField()
+    unit_price = serializers.DecimalField(max_digits=10, decimal_places=2)
+    line_total = serializers.DecimalField(max_digits=12, decimal_places=2)
+    created_at = serializers.DateTimeField()
+    updated_at = serializers.DateTimeField()
 
-    class Meta:
-        model = Cart
-        fields = ("id", "status", "items", "subtotal", "created_at", "updated_at")
-        read_only_fields = ("id", "status", "items", "subtotal", "created_at", "updated_at")
-
-    def get_subtotal(self, obj):
-        return f"{obj.subtotal:.2f}"
+class CartSerializer(serializers.Serializer):
+    """Serializes the dict returned by cart.readmodel.open_cart()."""
+    id = serializers.IntegerField(read_only=True)
+    status = serializers.CharField(read_only=True)
+    items = CartLineSerializer(many=True, read_only=True)
+    subtotal = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
+    created_at = serializers.DateTimeField(read_only=True)
+    updated_at = serializers.DateTimeField(read_only=True)
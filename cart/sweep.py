@@ -0,0 +1,169 @@
+# cart/sweep.py
+"""
+Abandoned cart cleanup (manage.py sweep_carts).
+
+- Open carts with no activity (cart or item updated_at) for CART_OPEN_TTL_DAYS
+  are deleted when empty (e.g. left behind by checkout) or marked canceled
+  when they still hold items.
+- Converted/canceled carts untouched for CART_CLOSED_RETENTION_DAYS are
+  deleted with their items.
+
+Both passes walk the table with keyset pagination ((updated_at, id) on the
+cart_open_updated_idx partial index for open carts, id for closed ones) and
+handle each batch in its own short transaction. Carts locked by a checkout
+are skipped (SKIP LOCKED) and picked up by the next run.
+
+sweep_carts is a short-lived process (cron), so nothing scrapes it: its
+metrics live in SWEEP_REGISTRY, which export_metrics() pushes to a
+Pushgateway (CART_SWEEP_PUSHGATEWAY) and/or writes for the node_exporter
+textfile collector (CART_SWEEP_METRICS_TEXTFILE) once the run ends.
+"""
+import datetime
+import logging
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, push_to_gateway, write_to_textfile
+
+from .models import Cart, CartItem
+
+log = logging.getLogger("cart.sweep")
+
+CLOSED_STATUSES = (Cart.STATUS_CONVERTED, Cart.STATUS_CANCELED)
+
+SWEEP_REGISTRY = CollectorRegistry()
+SWEPT_CARTS = Counter(
+    "ecom_cart_sweep_carts", "Carts handled by the cart sweeper", ["action"], registry=SWEEP_REGISTRY,
+)
+SWEEP_BATCH_SECONDS = Histogram(
+    "ecom_cart_sweep_batch_duration_seconds",
+    "Duration of one cart sweep batch",
+    ["phase"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+    registry=SWEEP_REGISTRY,
+)
+SWEEP_LAST_SUCCESS = Gauge(
+    "ecom_cart_sweep_last_success_timestamp_seconds",
+    "Unix time of the last completed cart sweep",
+    registry=SWEEP_REGISTRY,
+)
+
+
+class SweepStats:
+    __slots__ = ("batches", "canceled", "deleted_open", "deleted_closed")
+
+    def __init__(self):
+        self.batches = self.canceled = self.deleted_open = self.deleted_closed = 0
+
+    def __str__(self):
+        return (f"batches={self.batches} canceled={self.canceled} "
+                f"deleted_open={self.deleted_open} deleted_closed={self.deleted_closed}")
+
+
+def cutoff_for(days, now):
+    return now - datetime.timedelta(days=days)
+
+
+def idle_open_carts(cutoff):
+    """Open carts with neither the cart nor any of its items updated since `cutoff`."""
+    recent_items = CartItem.objects.filter(cart=OuterRef("pk"), updated_at__gte=cutoff)
+    return Cart.objects.filter(status=Cart.STATUS_OPEN, updated_at__lt=cutoff).filter(~Exists(recent_items))
+
+
+def expired_closed_carts(cutoff):
+    return Cart.objects.filter(status__in=CLOSED_STATUSES, updated_at__lt=cutoff)
+
+
+def sweep_open_batch(cutoff, after=None, batch_size=500, now=None):
+    """
+    One batch of idle open carts past the keyset `after` ((updated_at, id) or None).
+    Returns (next keyset or None when done, canceled, deleted).
+    """
+    qs = Cart.objects.filter(status=Cart.STATUS_OPEN, updated_at__lt=cutoff)
+    if after is not None:
+        qs = qs.filter(Q(updated_at__gt=after[0]) | Q(updated_at=after[0], id__gt=after[1]))
+    keys = list(qs.order_by("updated_at", "id").values_list("updated_at", "id")[:batch_size])
+    if not keys:
+        return None, 0, 0
+
+    with transaction.atomic():
+        # Re-check under lock: the cart may have been used since the keyset read
+        ids = list(
+            idle_open_carts(cutoff).select_for_update(skip_locked=True)
+            .filter(id__in=[pk for _, pk in keys]).values_list("id", flat=True)
+        )
+        with_items = set(CartItem.objects.filter(cart_id__in=ids).values_list("cart_id", flat=True).distinct())
+        empty = [pk for pk in ids if pk not in with_items]
+        deleted = Cart.objects.filter(id__in=empty).delete()[1].get(Cart._meta.label, 0) if empty else 0
+        canceled = Cart.objects.filter(id__in=with_items).update(
+            status=Cart.STATUS_CANCELED, updated_at=now or timezone.now(),
+        ) if with_items else 0
+    return keys[-1], canceled, deleted
+
+
+def sweep_closed_batch(cutoff, after_id=0, batch_size=500):
+    """One batch of expired converted/canceled carts with id > after_id. Returns (last id or None, deleted)."""
+    ids = list(
+        expired_closed_carts(cutoff).filter(id__gt=after_id).order_by("id").values_list("id", flat=True)[:batch_size]
+    )
+    if not ids:
+        return None, 0
+    # Closed carts never change again, so no re-check is needed
+    with transaction.atomic():
+        CartItem.objects.filter(cart_id__in=ids).delete()
+        deleted = Cart.objects.filter(id__in=ids).delete()[1].get(Cart._meta.label, 0)
+    return ids[-1], deleted
+
+
+def sweep(open_ttl_days=None, closed_days=None, batch_size=None, max_batches=None, pause=0.0, now=None):
+    """Run both passes to completion (or max_batches). Returns SweepStats."""
+    now = now or timezone.now()
+    open_cutoff = cutoff_for(settings.CART_OPEN_TTL_DAYS if open_ttl_days is None else open_ttl_days, now)
+    closed_cutoff = cutoff_for(settings.CART_CLOSED_RETENTION_DAYS if closed_days is None else closed_days, now)
+    batch_size = batch_size or settings.CART_SWEEP_BATCH_SIZE
+    stats = SweepStats()
+
+    def budget_left():
+        return max_batches is None or stats.batches < max_batches
+
+    key = None
+    while budget_left():
+        with SWEEP_BATCH_SECONDS.labels(phase="open").time():
+            key, canceled, deleted = sweep_open_batch(open_cutoff, key, batch_size, now)
+        if key is None:
+            break
+        stats.batches += 1
+        stats.canceled += canceled
+        stats.deleted_open += deleted
+        SWEPT_CARTS.labels(action="canceled").inc(canceled)
+        SWEPT_CARTS.labels(action="deleted_open").inc(deleted)
+        if pause:
+            time.sleep(pause)
+
+    last_id = 0
+    while budget_left():
+        with SWEEP_BATCH_SECONDS.labels(phase="closed").time():
+            last_id, deleted = sweep_closed_batch(closed_cutoff, last_id, batch_size)
+        if last_id is None:
+            break
+        stats.batches += 1
+        stats.deleted_closed += deleted
+        SWEPT_CARTS.labels(action="deleted_closed").inc(deleted)
+        if pause:
+            time.sleep(pause)
+
+    if budget_left():
+        SWEEP_LAST_SUCCESS.set(time.time())
+    log.info("Cart sweep %s", stats)
+    return stats
+
+
+def export_metrics(pushgateway=None, textfile=None):
+    """Push this run's metrics to a Pushgateway and/or write them to a textfile-collector file."""
+    if pushgateway:
+        push_to_gateway(pushgateway, job="sweep_carts", registry=SWEEP_REGISTRY)
+    if textfile:
+        write_to_textfile(textfile, SWEEP_REGISTRY)  # written to a temp file, then renamed
@@ -0,0 +1,52 @@
+# cart/tests/test_readmodel.py
+"""Cart read model: one query for items + DB-computed Decimal subtotal, shared by the API and the storefront."""
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from cart import readmodel
+from cart.models import Cart, CartItem
+from catalog.models import Category, Product
+
+User = get_user_model()
+
+
+class CartReadModelTests(TestCase):
+    def setUp(self):
+        category = Category.objects.create(name="Kitchen", slug="kitchen")
+        self.user = User.objects.create_user(email="erin@example.com", password="E-secure-pass1")
+        self.cart = Cart.objects.create(user=self.user)
+        for n, (price, qty) in enumerate((("0.10", 3), ("19.99", 2))):
+            product = Product.objects.create(
+                category=category, sku=f"K-{n}", title=f"Spoon {n}", price=Decimal(price), stock_qty=10,
+            )
+            CartItem.objects.create(cart=self.cart, product=product, qty=qty, unit_price=Decimal(price))
+
+    def test_single_query_with_decimal_totals(self):
+        with self.assertNumQueries(1):
+            cart = readmodel.open_cart(self.user)
+        self.assertEqual([i["line_total"] for i in cart["items"]], [Decimal("0.30"), Decimal("39.98")])
+        self.assertEqual(cart["subtotal"], Decimal("40.28"))
+        self.assertEqual(cart["items"][0]["title"], "Spoon 0")
+
+    def test_empty_and_missing_cart(self):
+        CartItem.objects.all().delete()
+        cart = readmodel.open_cart(self.user)
+        self.assertEqual((cart["id"], cart["items"], cart["subtotal"]), (self.cart.id, [], Decimal("0.00")))
+        self.cart.delete()
+        self.assertIsNone(readmodel.open_cart(self.user))
+
+    def test_api_and_storefront(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        data = client.get("/api/cart/").json()
+        self.assertEqual(data["subtotal"], "40.28")
+        self.assertEqual(data["items"][1]["line_total"], "39.98")
+        self.assertEqual(set(data["items"][0]), {"id", "product", "qty", "unit_price", "line_total", "created_at", "updated_at"})
+
+        self.client.force_login(self.user)
+        resp = self.client.get("/cart/")
+        self.assertContains(resp, "<td>39.98</td>", html=False)
+        self.assertContains(resp, "40.28")
@@ -0,0 +1,79 @@
+# cart/tests/test_sweep.py
+"""sweep_carts: idle open carts are deleted (empty) or canceled, old closed carts deleted."""
+import datetime
+import io
+import os
+import tempfile
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from prometheus_client.parser import text_string_to_metric_families
+
+from cart import sweep
+from cart.models import Cart, CartItem
+from catalog.models import Category, Product
+
+User = get_user_model()
+
+
+class CartSweepTests(TestCase):
+    def setUp(self):
+        category = Category.objects.create(name="Tools", slug="tools")
+        self.product = Product.objects.create(
+            category=category, sku="SW-1", title="Wrench", slug="wrench", price=Decimal("5.00"), stock_qty=10,
+        )
+        self.old = timezone.now() - datetime.timedelta(days=60)
+
+    def _cart(self, email, status=Cart.STATUS_OPEN, items=0, age=None, item_age=None):
+        user = User.objects.create_user(email=email, password="X-secure-pass1")
+        cart = Cart.objects.create(user=user, status=status)
+        for _ in range(items):
+            item = CartItem.objects.create(cart=cart, product=self.product, qty=1, unit_price=self.product.price)
+            if item_age is not None:
+                CartItem.objects.filter(pk=item.pk).update(updated_at=item_age)
+        Cart.objects.filter(pk=cart.pk).update(updated_at=age or timezone.now())
+        return cart
+
+    def test_sweep(self):
+        empty = self._cart("a@example.com", age=self.old)
+        abandoned = self._cart("b@example.com", items=1, age=self.old, item_age=self.old)
+        active_items = self._cart("c@example.com", items=1, age=self.old)  # item touched recently
+        fresh = self._cart("d@example.com")
+        converted = self._cart("e@example.com", status=Cart.STATUS_CONVERTED, age=self.old)
+
+        stats = sweep.sweep(open_ttl_days=30, closed_days=7, batch_size=1)
+        self.assertEqual((stats.deleted_open, stats.canceled, stats.deleted_closed), (1, 1, 1))
+        self.assertFalse(Cart.objects.filter(pk__in=[empty.pk, converted.pk]).exists())
+        self.assertEqual(Cart.objects.get(pk=abandoned.pk).status, Cart.STATUS_CANCELED)
+        self.assertEqual(Cart.objects.get(pk=active_items.pk).status, Cart.STATUS_OPEN)
+        self.assertEqual(Cart.objects.get(pk=fresh.pk).status, Cart.STATUS_OPEN)
+
+        # the canceled cart is kept for the retention period, then deleted
+        later = timezone.now() + datetime.timedelta(days=8)
+        stats = sweep.sweep(open_ttl_days=30, closed_days=7, now=later)
+        self.assertEqual(stats.deleted_closed, 1)
+        self.assertFalse(CartItem.objects.filter(cart_id=abandoned.pk).exists())
+
+    def test_command_dry_run(self):
+        self._cart("a@example.com", age=self.old)
+        out = io.StringIO()
+        call_command("sweep_carts", "--dry-run", stdout=out)
+        self.assertIn("1 idle open carts", out.getvalue())
+        self.assertEqual(Cart.objects.count(), 1)
+
+    def test_command_writes_metrics_textfile(self):
+        self._cart("a@example.com", age=self.old)
+        self._cart("b@example.com", items=1, age=self.old, item_age=self.old)
+        before = sweep.SWEEP_REGISTRY.get_sample_value("ecom_cart_sweep_carts_total", {"action": "canceled"}) or 0
+        path = os.path.join(tempfile.mkdtemp(), "sweep_carts.prom")
+        self.addCleanup(os.rmdir, os.path.dirname(path))
+        self.addCleanup(os.remove, path)
+        call_command("sweep_carts", "--metrics-textfile", path, stdout=io.StringIO())
+        with open(path) as f:
+            samples = {(s.name, s.labels.get("action")): s.value
+                       for family in text_string_to_metric_families(f.read()) for s in family.samples}
+        self.assertEqual(samples[("ecom_cart_sweep_carts_total", "canceled")], before + 1)
+        self.assertGreater(samples[("ecom_cart_sweep_last_success_timestamp_seconds", None)], 0)
@@ -5,6 +5,7 @@ from rest_framework import permissions, status, viewsets
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from . import readmodel
 from .models import Cart, CartItem
 from .serializers import CartSerializer, CartItemSerializer
 from catalog.models import Product
@@ -24,8 +25,10 @@ class CartView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
-        cart = _get_or_create_open_cart(request.user)
-        log.debug("Fetch cart user=%s cart_id=%s", request.user.id, cart.id)
+        cart = readmodel.open_cart(request.user)
+        if cart is None:
+            cart = readmodel.empty_cart(_get_or_create_open_cart(request.user))
+        log.debug("Fetch cart user=%s cart_id=%s", request.user.id, cart["id"])
         return Response(CartSerializer(cart).data)
 
 class CartItemViewSet(viewsets.ModelViewSet):
@@ -1,7 +1,14 @@
 # catalog/admin.py
 from django.contrib import admin
+
+from ecom.admin import LargeTableAdmin, RelatedIdFilter
 from .models import Category, Product
 
+
+class CategoryIdFilter(RelatedIdFilter):
+    title = "category id"
+    parameter_name = field_name = "category"
+
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
     list_display = ("id", "name", "slug", "is_active")
@@ -11,9 +18,10 @@ class CategoryAdmin(admin.ModelAdmin):
     ordering = ("name",)
 
 @admin.register(Product)
-class ProductAdmin(admin.ModelAdmin):
+class ProductAdmin(LargeTableAdmin, admin.ModelAdmin):
     list_display = ("id", "title", "sku", "price", "currency", "stock_qty", "is_active", "category")
-    list_filter = ("is_active", "currency", "category")
-    search_fields = ("title", "sku", "description")
+    list_select_related = ("category",)
+    list_filter = ("is_active", "currency", CategoryIdFilter)
+    search_fields = ("sku", "title")  # prefix matches (LargeTableAdmin)
     autocomplete_fields = ("category",)
     ordering = ("title",)
@@ -1,4 +1,15 @@
 from django.apps import AppConfig
+from django.conf import settings
+
+
 class CatalogConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "catalog"
+
+    def ready(self):
+        # Warm the cached template loader (prod sets TEMPLATE_PRELOAD)
+        names = getattr(settings, "TEMPLATE_PRELOAD", ())
+        if names:
+            from django.template.loader import get_template
+            for name in names:
+                get_template(name)
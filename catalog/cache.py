@@ -0,0 +1,125 @@
+# catalog/cache.py
+"""
+Storefront caching (catalog.views_frontend).
+
+- catalog_version(): counter bumped after every product or category change.
+  It is part of every catalog list key (storefront page rows and template
+  fragments, API lists in catalog.views), so one bump
+  invalidates them all without deleting keys. It is read on every storefront
+  request, so it lives in the "hot" cache (per-process copy in front of the
+  shared cache): other processes pick up a bump within HOT_CACHE_LOCAL_TIMEOUT.
+- storefront_page(): the rows of one product list page, per catalog version.
+  A hit costs no queries; a miss costs one COUNT plus one page-sized SELECT.
+- get_product(): detail lookups, cached as slug -> id and id -> product.
+  products_changed() drops the product entries; a slug that no longer
+  matches the cached product is treated as a miss.
+
+Page rows, products and API lists go through ecom.caching.get_or_compute, so
+after a bump or an eviction one process recomputes a key while the others
+wait for it or serve the stale value.
+
+Every Product write calls products_changed(), every Category write
+bump_catalog_version(), once the transaction commits: model save()/delete()
+and the bulk queryset paths alike (catalog/changes.py).
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.paginator import Paginator
+
+from ecom.caching import get_or_compute, set_computed
+from ecom.metrics import observe_cache
+
+VERSION_KEY = "catalog:version"
+PAGE_FIELDS = ("id", "slug", "title", "sku", "price", "currency")
+
+
+def _timeout():
+    return getattr(settings, "CATALOG_CACHE_TIMEOUT", 600)
+
+
+def _initial_version():
+    # Seeded from the clock so an evicted counter never reuses an old value
+    return time.time_ns() // 1000
+
+
+def catalog_version():
+    hot = caches["hot"]
+    version = hot.get(VERSION_KEY)
+    observe_cache("catalog:version", "miss" if version is None else "hit")
+    if version is None:
+        hot.add(VERSION_KEY, _initial_version(), timeout=None)
+        version = hot.get(VERSION_KEY)
+    return version
+
+
+def bump_catalog_version():
+    hot = caches["hot"]
+    try:
+        hot.incr(VERSION_KEY)
+    except ValueError:
+        hot.add(VERSION_KEY, _initial_version(), timeout=None)
+
+
+def _slug_key(slug):
+    return f"catalog:slug:{slug}"
+
+
+def _product_key(product_id):
+    return f"catalog:product:{product_id}"
+
+
+def products_changed(product_ids):
+    cache.delete_many([_product_key(product_id) for product_id in product_ids])
+    bump_catalog_version()
+
+
+def product_changed(product_id):
+    products_changed([product_id])
+
+
+def get_product(slug):
+    """Product with this slug (active or not) or None."""
+    from .models import Product
+
+    product_id = cache.get(_slug_key(slug))
+    if product_id is not None:
+        product = get_or_compute(
+            _product_key(product_id), lambda: Product.objects.filter(pk=product_id).first(), _timeout(),
+        )
+        if product is not None and product.slug == slug:
+            observe_cache("catalog:slug", "hit")
+            return product
+    observe_cache("catalog:slug", "miss")
+    product = Product.objects.filter(slug=slug).first()
+    if product is not None:
+        cache.set(_slug_key(slug), product.id, _timeout())
+        set_computed(_product_key(product.id), product, _timeout())
+    return product
+
+
+def storefront_page(number, per_page):
+    """(catalog version, page dict) for page `number` of the active products (clamped like get_page)."""
+    from .models import Product
+
+    def compute():
+        paginator = Paginator(Product.objects.filter(is_active=True).order_by("id").values(*PAGE_FIELDS), per_page)
+        current = paginator.get_page(number)
+        return {
+            "products": list(current.object_list),
+            "number": current.number,
+            "num_pages": paginator.num_pages,
+            "previous": current.previous_page_number() if current.has_previous() else None,
+            "next": current.next_page_number() if current.has_next() else None,
+        }
+
+    version = catalog_version()
+    return version, get_or_compute(f"catalog:page:{version}:{per_page}:{number}", compute, _timeout())
+
+
+def api_list(view_key, compute):
+    """Cached compute() result for one API list request (view_key: viewset, URL, format), per catalog version."""
+    digest = hashlib.sha1(view_key.encode("utf-8")).hexdigest()
+    return get_or_compute(f"catalog:api:{catalog_version()}:{digest}", compute, _timeout())
@@ -0,0 +1,138 @@
+# catalog/changes.py
+"""
+Change data capture for Product and Category (the catalog_change outbox).
+
+Every write adds CatalogChange rows (entity, object id, op, changed fields)
+in the writing transaction:
+- Model.save()/delete() of Product and Category
+- their querysets' update(), delete(), bulk_update() and bulk_create()
+  (ChangeLoggedQuerySet, the default manager of both models)
+Rows carry no snapshot: consumers read the current row (or see it is gone).
+After logging, the model's on_catalog_change() schedules its own cache
+invalidation for after the commit.
+
+Consumers follow the log by increasing id:
+- read_changes(after_id, limit): the next batch past a position
+- consume(name, handler): at-least-once processing with the position stored
+  in CatalogChangeConsumer (handler(batch) runs in the transaction that
+  advances it; one runner per name at a time)
+- manage.py tail_catalog_changes, GET /api/catalog/changes/ (staff)
+
+Ids are allocated at insert and transactions commit out of order, so a row
+is only handed out once CATALOG_CHANGE_SETTLE_SECONDS old: a transaction
+that writes the log and runs longer than that can be missed by consumers.
+"""
+import datetime
+
+from django.conf import settings
+from django.db import models, transaction
+from django.utils import timezone
+
+OP_CREATE = "create"
+OP_UPDATE = "update"
+OP_DELETE = "delete"
+
+
+def log_changes(model, ids, op, fields=None, objs=None):
+    """Log `op` on rows `ids` of `model` in the current transaction, then call model.on_catalog_change()."""
+    from .models import CatalogChange
+
+    ids = [pk for pk in ids if pk is not None]
+    if not ids:
+        return
+    entity = model._meta.concrete_model._meta.model_name
+    fields = sorted(fields) if fields is not None else None
+    CatalogChange.objects.bulk_create([
+        CatalogChange(entity=entity, object_id=pk, op=op, fields=fields) for pk in ids
+    ])
+    model.on_catalog_change(ids, op, fields, objs)
+
+
+class ChangeLoggedQuerySet(models.QuerySet):
+    """Bulk writes that log to catalog_change like Model.save()/delete() do."""
+
+    def update(self, **kwargs):
+        if self.query.is_sliced:
+            raise TypeError("Cannot update a query once a slice has been taken.")
+        with transaction.atomic(using=self.db):
+            # Lock the matched rows so the log names exactly the updated ones
+            ids = list(self.select_for_update().order_by().values_list("pk", flat=True))
+            count = models.QuerySet(self.model, using=self.db).filter(pk__in=ids).update(**kwargs)
+            log_changes(self.model, ids, OP_UPDATE, kwargs)
+        return count
+
+    update.alters_data = True
+
+    def delete(self):
+        with transaction.atomic(using=self.db):
+            ids = list(self.order_by().values_list("pk", flat=True))
+            result = super().delete()
+            log_changes(self.model, ids, OP_DELETE)
+        return result
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+    def bulk_update(self, objs, fields, batch_size=None):
+        objs = list(objs)
+        with transaction.atomic(using=self.db):
+            # Plain queryset: Django's bulk_update() runs update(), logged here per object instead
+            count = models.QuerySet(self.model, using=self.db).bulk_update(objs, fields, batch_size=batch_size)
+            log_changes(self.model, [obj.pk for obj in objs], OP_UPDATE, fields, objs)
+        return count
+
+    bulk_update.alters_data = True
+
+    def bulk_create(self, objs, *args, **kwargs):
+        with transaction.atomic(using=self.db):
+            created = super().bulk_create(objs, *args, **kwargs)
+            # pks are unknown for some backends/options (e.g. ignore_conflicts); those rows are not logged
+            log_changes(self.model, [obj.pk for obj in created], OP_CREATE, objs=created)
+        return created
+
+    bulk_create.alters_data = True
+
+
+def _settled_before():
+    return timezone.now() - datetime.timedelta(seconds=getattr(settings, "CATALOG_CHANGE_SETTLE_SECONDS", 5))
+
+
+def read_changes(after_id=0, limit=500, entity=None):
+    """Up to `limit` settled changes with id > after_id, oldest first."""
+    from .models import CatalogChange
+
+    qs = CatalogChange.objects.filter(id__gt=after_id, created_at__lte=_settled_before())
+    if entity:
+        qs = qs.filter(entity=entity)
+    return list(qs.order_by("id")[:limit])
+
+
+def consume(name, handler, batch_size=500, entity=None):
+    """
+    Hand the next batch past consumer `name`'s position to handler(batch) and
+    advance the position. Returns the batch size (0: caught up). If handler
+    raises, the position is not moved and the batch is delivered again.
+    """
+    from .models import CatalogChangeConsumer
+
+    with transaction.atomic():
+        CatalogChangeConsumer.objects.get_or_create(name=name)
+        consumer = CatalogChangeConsumer.objects.select_for_update().get(name=name)
+        batch = read_changes(consumer.position, batch_size, entity)
+        if batch:
+            handler(batch)
+            consumer.position = batch[-1].id
+            consumer.updated_at = timezone.now()
+            consumer.save(update_fields=["position", "updated_at"])
+    return len(batch)
+
+
+def as_dict(change):
+    return {
+        "id": change.id,
+        "entity": change.entity,
+        "object_id": change.object_id,
+        "op": change.op,
+        "fields": change.fields,
+        "created_at": change.created_at.isoformat(),
+    }
@@ -0,0 +1,94 @@
+# catalog/facets.py
+"""
+Facet counts for GET /api/products/?facets=category,price,in_stock.
+
+Each facet is counted over the filtered products *except* its own filter
+(choosing a category does not zero the other categories' counts). All
+requested facets come from one query: the products matching the non-facet
+filters (search, is_active...) grouped by category, with one conditional
+COUNT per facet value whose FILTER applies the other facets' filters. The
+per-category rows are then summed for the price and stock facets.
+"""
+from decimal import Decimal
+
+from django.db.models import Count, Q
+from rest_framework.exceptions import ValidationError
+
+# Query parameters of ProductFilter owned by each facet
+FACET_PARAMS = {
+    "category": ("category", "category_slug"),
+    "price": ("price_min", "price_max"),
+    "in_stock": ("in_stock",),
+}
+# Lower bounds of the price buckets; the last one is open-ended
+PRICE_BUCKETS = (Decimal("0"), Decimal("10"), Decimal("25"), Decimal("50"), Decimal("100"), Decimal("250"))
+
+
+def requested_facets(request):
+    """Facet names from ?facets= (validated), in FACET_PARAMS order; empty when not asked for."""
+    raw = request.query_params.get("facets")
+    if not raw:
+        return []
+    names = {name.strip() for name in raw.split(",") if name.strip()}
+    unknown = names - FACET_PARAMS.keys()
+    if unknown:
+        raise ValidationError({"facets": f"unknown facets: {', '.join(sorted(unknown))}; "
+                                         f"choose from {', '.join(FACET_PARAMS)}"})
+    return [name for name in FACET_PARAMS if name in names]
+
+
+def facet_params():
+    return {param for params in FACET_PARAMS.values() for param in params}
+
+
+def _price_ranges():
+    bounds = list(PRICE_BUCKETS) + [None]
+    return list(zip(bounds, bounds[1:]))
+
+
+def _price_range_q(low, high):
+    return Q(price__gte=low) & Q(price__lt=high) if high is not None else Q(price__gte=low)
+
+
+def facet_counts(queryset, facet_q, facets):
+    """
+    queryset: products under the non-facet filters; facet_q: {facet: Q of its
+    active filter}; facets: the facets to count. Returns {facet: counts}.
+    """
+    def others(facet):
+        q = Q()
+        for name, condition in facet_q.items():
+            if name != facet:
+                q &= condition
+        return q
+
+    aggregates = {}
+    if "category" in facets:
+        aggregates["n_category"] = Count("pk", filter=others("category"))
+    if "price" in facets:
+        for index, (low, high) in enumerate(_price_ranges()):
+            aggregates[f"n_price_{index}"] = Count("pk", filter=others("price") & _price_range_q(low, high))
+    if "in_stock" in facets:
+        aggregates["n_in_stock"] = Count("pk", filter=others("in_stock") & Q(stock_qty__gt=0))
+        aggregates["n_out_of_stock"] = Count("pk", filter=others("in_stock") & Q(stock_qty=0))
+
+    rows = list(queryset.order_by().values("category_id").annotate(**aggregates))
+
+    counts = {}
+    if "category" in facets:
+        counts["category"] = [
+            {"id": row["category_id"], "count": row["n_category"]}
+            for row in sorted(rows, key=lambda row: row["category_id"]) if row["n_category"]
+        ]
+    if "price" in facets:
+        counts["price"] = [
+            {"min": f"{low:.2f}", "max": f"{high:.2f}" if high is not None else None,
+             "count": sum(row[f"n_price_{index}"] for row in rows)}
+            for index, (low, high) in enumerate(_price_ranges())
+        ]
+    if "in_stock" in facets:
+        counts["in_stock"] = {
+            "true": sum(row["n_in_stock"] for row in rows),
+            "false": sum(row["n_out_of_stock"] for row in rows),
+        }
+    return counts
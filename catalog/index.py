@@ -0,0 +1,264 @@
+# catalog/index.py
+"""
+In-process catalog index for the common product list pages, e.g.
+GET /api/products/?category=3&in_stock=true&ordering=price&limit=24&offset=48
+
+Per category (and for the whole catalog), and for all / in-stock products,
+the product ids ordered by (price, id) and by (created_at, id) are kept in
+typed arrays (array module, 8 bytes per value) next to their sort keys and
+prices. A page is then a bisect on the price range plus a slice (a scan when
+a price range is combined with created_at ordering), and only the page's rows
+are read from the database.
+
+The index follows the catalog_change log (catalog/changes.py: rows are
+written in the same transaction as every product write): refresh() re-reads
+the products logged past its watermark. Log rows younger than
+CATALOG_INDEX_CHANGE_LAG seconds are looked at again on every refresh, as
+ids of concurrent transactions can commit out of order.
+
+An index not refreshed for CATALOG_INDEX_RELOAD_SECONDS is reloaded from
+scratch instead (bounding any drift, and well within the log retention of
+manage.py prune_catalog_changes).
+
+Enabled with CATALOG_INDEX_ENABLED; catalog.views.ProductViewSet only uses it
+for requests it answers exactly (see ProductViewSet._index_page).
+"""
+import datetime
+import logging
+import math
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+
+from django.conf import settings
+from django.db.models import Max, Q
+from django.utils import timezone
+
+log = logging.getLogger("catalog.index")
+
+ORDERINGS = {
+    "price": ("price", False),
+    "-price": ("price", True),
+    "created_at": ("created_at", False),
+    "-created_at": ("created_at", True),
+}
+_EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+_ROW_FIELDS = ("id", "category_id", "price", "created_at", "stock_qty")
+
+
+def _cents(price):
+    return int(price * 100)
+
+
+def _micros(value):
+    return (value - _EPOCH) // datetime.timedelta(microseconds=1)
+
+
+def _row(values):
+    """(id, category id, price in cents, created_at in µs, in stock) from _ROW_FIELDS values."""
+    pk, category_id, price, created_at, stock_qty = values
+    return pk, category_id, _cents(price), _micros(created_at), stock_qty > 0
+
+
+def _lag_start():
+    return timezone.now() - datetime.timedelta(seconds=getattr(settings, "CATALOG_INDEX_CHANGE_LAG", 60))
+
+
+class _Sorted:
+    """Ids ordered by (key, id), with their keys (for bisect) and prices (for range scans)."""
+    __slots__ = ("keys", "ids", "prices")
+
+    def __init__(self, entries=()):
+        # entries: (key, id, price), already sorted
+        self.keys = array("q", (e[0] for e in entries))
+        self.ids = array("q", (e[1] for e in entries))
+        self.prices = array("q", (e[2] for e in entries))
+
+    def _position(self, key, pk):
+        lo, hi = bisect_left(self.keys, key), bisect_right(self.keys, key)
+        return lo + bisect_left(self.ids[lo:hi], pk), lo, hi
+
+    def insert(self, key, pk, price):
+        pos, _, _ = self._position(key, pk)
+        self.keys.insert(pos, key)
+        self.ids.insert(pos, pk)
+        self.prices.insert(pos, price)
+
+    def remove(self, key, pk):
+        pos, _, hi = self._position(key, pk)
+        if pos < hi and self.ids[pos] == pk:
+            del self.keys[pos], self.ids[pos], self.prices[pos]
+
+
+class _Bucket:
+    __slots__ = ("by_price", "by_created_at")
+
+    def __init__(self, rows=()):
+        rows = list(rows)
+        self.by_price = _Sorted(sorted((r[2], r[0], r[2]) for r in rows))
+        self.by_created_at = _Sorted(sorted((r[3], r[0], r[2]) for r in rows))
+
+    def add(self, row):
+        self.by_price.insert(row[2], row[0], row[2])
+        self.by_created_at.insert(row[3], row[0], row[2])
+
+    def remove(self, row):
+        self.by_price.remove(row[2], row[0])
+        self.by_created_at.remove(row[3], row[0])
+
+
+def _bucket_keys(row):
+    """Buckets a row belongs to: (category id or None for all, in-stock only)."""
+    keys = [(row[1], False), (None, False)]
+    if row[4]:
+        keys += [(row[1], True), (None, True)]
+    return keys
+
+
+class CatalogIndex:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._rows = {}  # id -> row (see _row)
+        self._buckets = {}
+        self._watermark = 0
+        self._recent = set()  # change ids inside the lag window already applied
+        self._refreshed = 0.0  # time.monotonic() of the last load/refresh
+
+    @property
+    def watermark(self):
+        """Last change log id applied."""
+        return self._watermark
+
+    def load(self):
+        from .models import CatalogChange, Product
+
+        with self._lock:
+            # Log first: changes committed while loading are replayed by refresh(),
+            # the ones visible now are reflected in the rows read below
+            watermark = CatalogChange.objects.aggregate(last=Max("id"))["last"] or 0
+            recent = set(
+                CatalogChange.objects.filter(entity="product", created_at__gte=_lag_start()).values_list("id", flat=True)
+            )
+            rows = {}
+            grouped = {}
+            for values in Product.objects.order_by().values_list(*_ROW_FIELDS).iterator(chunk_size=5000):
+                row = _row(values)
+                rows[row[0]] = row
+                for key in _bucket_keys(row):
+                    grouped.setdefault(key, []).append(row)
+            self._rows = rows
+            self._buckets = {key: _Bucket(bucket_rows) for key, bucket_rows in grouped.items()}
+            self._watermark = watermark
+            self._recent = recent
+            self._refreshed = time.monotonic()
+            log.info("Catalog index loaded products=%s buckets=%s", len(rows), len(self._buckets))
+
+    def refresh(self):
+        """Apply logged product changes; returns how many products were re-read."""
+        from .models import CatalogChange, Product
+
+        with self._lock:
+            if time.monotonic() - self._refreshed > getattr(settings, "CATALOG_INDEX_RELOAD_SECONDS", 3600):
+                self.load()
+                return len(self._rows)
+            self._refreshed = time.monotonic()
+            changes = list(
+                CatalogChange.objects
+                .filter(Q(id__gt=self._watermark) | Q(created_at__gte=_lag_start()), entity="product")
+                .values_list("id", "object_id")
+            )
+            changed = {pk for change_id, pk in changes if change_id not in self._recent}
+            if changed:
+                current = {
+                    values[0]: _row(values)
+                    for values in Product.objects.filter(id__in=changed).values_list(*_ROW_FIELDS)
+                }
+                for pk in changed:
+                    self._replace(pk, current.get(pk))
+            if changes:
+                self._watermark = max(self._watermark, max(change_id for change_id, _ in changes))
+            self._recent = {change_id for change_id, _ in changes}
+            return len(changed)
+
+    def _replace(self, pk, row):
+        old = self._rows.pop(pk, None)
+        if old is not None:
+            for key in _bucket_keys(old):
+                self._buckets[key].remove(old)
+        if row is not None:
+            self._rows[pk] = row
+            for key in _bucket_keys(row):
+                self._buckets.setdefault(key, _Bucket()).add(row)
+
+    def page(self, ordering, offset, limit, category=None, in_stock=False, price_min=None, price_max=None):
+        """
+        (matching count, ids of rows offset..offset+limit) for an ORDERINGS key;
+        price bounds are inclusive Decimals.
+        """
+        field, descending = ORDERINGS[ordering]
+        low = math.ceil(price_min * 100) if price_min is not None else None
+        high = math.floor(price_max * 100) if price_max is not None else None
+        with self._lock:
+            bucket = self._buckets.get((category, bool(in_stock)))
+            if bucket is None:
+                return 0, []
+            if field == "price":
+                ordered = bucket.by_price
+                start = bisect_left(ordered.keys, low) if low is not None else 0
+                stop = bisect_right(ordered.keys, high) if high is not None else len(ordered.keys)
+                positions = range(start, max(start, stop))
+            else:
+                ordered = bucket.by_created_at
+                positions = range(len(ordered.ids))
+                if low is not None or high is not None:
+                    prices = ordered.prices
+                    positions = [
+                        i for i in positions
+                        if (low is None or prices[i] >= low) and (high is None or prices[i] <= high)
+                    ]
+            if descending:
+                positions = positions[::-1]
+            return len(positions), [ordered.ids[i] for i in positions[offset:offset + limit]]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    """The process-wide index, loaded on first use and refreshed from the change log."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                index = CatalogIndex()
+                index.load()
+                _index = index
+                return _index
+    _index.refresh()
+    return _index
+
+
+class IndexPage:
+    """
+    Stand-in for a queryset in paginate_queryset(): count() is the index's,
+    slicing returns the page's products (ids from CatalogIndex.page) from `queryset`.
+    """
+
+    def __init__(self, count, ids, queryset):
+        self._count = count
+        self.ids = ids
+        self.queryset = queryset
+
+    def count(self):
+        return self._count
+
+    def __getitem__(self, item):
+        products = self.queryset.in_bulk(self.ids)
+        return [products[pk] for pk in self.ids if pk in products]
+
+
+def reset_index():
+    global _index
+    _index = None
@@ -0,0 +1,39 @@
+# catalog/management/commands/prune_catalog_changes.py
+"""
+Delete old catalog_change log rows (see catalog/changes.py), in batches.
+Rows not yet processed by every registered consumer (catalog_change_consumer)
+are kept; delete a consumer's row to stop tracking it.
+
+    python manage.py prune_catalog_changes            # cron, e.g. daily
+    python manage.py prune_catalog_changes --days 2 --batch-size 5000
+"""
+import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Min
+from django.utils import timezone
+
+from catalog.models import CatalogChange, CatalogChangeConsumer
+
+
+class Command(BaseCommand):
+    help = "Delete catalog_change rows older than the retention period."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=settings.CATALOG_CHANGE_RETENTION_DAYS)
+        parser.add_argument("--batch-size", type=int, default=10_000)
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - datetime.timedelta(days=options["days"])
+        old = CatalogChange.objects.filter(created_at__lt=cutoff)
+        slowest = CatalogChangeConsumer.objects.aggregate(position=Min("position"))["position"]
+        if slowest is not None:
+            old = old.filter(id__lte=slowest)
+        deleted = 0
+        while True:
+            ids = list(old.order_by("id").values_list("id", flat=True)[:options["batch_size"]])
+            if not ids:
+                break
+            deleted += CatalogChange.objects.filter(id__in=ids).delete()[0]
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} catalog changes older than {options['days']} days"))
@@ -0,0 +1,53 @@
+# catalog/management/commands/tail_catalog_changes.py
+"""
+Print catalog_change rows (see catalog/changes.py) as JSON lines, by id.
+
+    python manage.py tail_catalog_changes --after 1200 --batch-size 500
+    python manage.py tail_catalog_changes --consumer search-indexer --follow | indexer
+    python manage.py tail_catalog_changes --entity category --follow --interval 2
+
+With --consumer the position is stored (catalog_change_consumer) and
+advanced once a batch is written, so a restarted tail resumes after the last
+batch printed (at-least-once).
+"""
+import time
+
+import orjson
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from catalog import changes
+
+
+class Command(BaseCommand):
+    help = "Print catalog changes as JSON lines, optionally following the log."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--consumer", help="named consumer whose stored position to start from and advance")
+        parser.add_argument("--after", type=int, default=0, help="start after this change id (without --consumer)")
+        parser.add_argument("--batch-size", type=int, default=settings.CATALOG_CHANGE_BATCH_SIZE)
+        parser.add_argument("--entity", choices=["product", "category"])
+        parser.add_argument("--follow", action="store_true", help="keep polling for new changes")
+        parser.add_argument("--interval", type=float, default=1.0, help="poll interval with --follow (s)")
+
+    def handle(self, *args, **options):
+        position = options["after"]
+
+        def emit(batch):
+            for change in batch:
+                self.stdout.write(orjson.dumps(changes.as_dict(change)).decode())
+            self.stdout.flush()
+
+        while True:
+            if options["consumer"]:
+                count = changes.consume(options["consumer"], emit, options["batch_size"], options["entity"])
+            else:
+                batch = changes.read_changes(position, options["batch_size"], options["entity"])
+                emit(batch)
+                count = len(batch)
+                if batch:
+                    position = batch[-1].id
+            if count < options["batch_size"]:
+                if not options["follow"]:
+                    return
+                time.sleep(options["interval"])
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0002_alter_category_options_alter_product_options_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['sku'], name='product_sku_prefix', opclasses=['varchar_pattern_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['title'], name='product_title_prefix', opclasses=['varchar_pattern_ops']),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:02
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0004_catalog_change'),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name='catalogchange',
+            old_name='product_id',
+            new_name='object_id',
+        ),
+        migrations.AddField(
+            model_name='catalogchange',
+            name='entity',
+            field=models.CharField(default='product', max_length=32),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='catalogchange',
+            name='op',
+            field=models.CharField(choices=[('create', 'create'), ('update', 'update'), ('delete', 'delete')], default='update', max_length=8),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='catalogchange',
+            name='fields',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='catalogchange',
+            index=models.Index(fields=['entity', 'id'], name='catalog_change_entity_id'),
+        ),
+        migrations.CreateModel(
+            name='CatalogChangeConsumer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('position', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'db_table': 'catalog_change_consumer',
+            },
+        ),
+    ]
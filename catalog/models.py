@@ -1,8 +1,14 @@
 # catalog/models.py
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
 from django.utils.text import slugify
 
+from .changes import OP_CREATE, OP_DELETE, OP_UPDATE, ChangeLoggedQuerySet, log_changes
+
+# Product fields counted by the category nav snapshot (catalog/nav.py)
+NAV_FIELDS = {"category", "category_id", "is_active", "stock_qty"}
+
+
 class Category(models.Model):
     name = models.CharField(max_length=120, unique=True)
     slug = models.SlugField(max_length=140, unique=True, blank=True)
@@ -12,12 +18,33 @@ class Category(models.Model):
     created_at = models.DateTimeField(default=timezone.now, editable=False)
     updated_at = models.DateTimeField(default=timezone.now)
 
+    objects = ChangeLoggedQuerySet.as_manager()
+
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.name)
         # normal runtime saves will keep updated_at fresh
         self.updated_at = timezone.now()
-        return super().save(*args, **kwargs)
+        op = OP_CREATE if self._state.adding else OP_UPDATE
+        with transaction.atomic(using=kwargs.get("using")):
+            result = super().save(*args, **kwargs)
+            log_changes(Category, [self.pk], op, kwargs.get("update_fields"), [self])
+        return result
+
+    def delete(self, *args, **kwargs):
+        category_id = self.pk
+        with transaction.atomic(using=kwargs.get("using")):
+            result = super().delete(*args, **kwargs)
+            log_changes(Category, [category_id], OP_DELETE, objs=[self])
+        return result
+
+    @classmethod
+    def on_catalog_change(cls, ids, op, fields, objs):
+        # Categories are nested in product payloads (catalog/cache.py)
+        from . import nav
+        from .cache import bump_catalog_version
+        transaction.on_commit(bump_catalog_version)
+        transaction.on_commit(nav.invalidate)
 
     def __str__(self):
         return self.name
@@ -39,12 +66,101 @@ class Product(models.Model):
     created_at = models.DateTimeField(default=timezone.now, editable=False)
     updated_at = models.DateTimeField(default=timezone.now)
 
+    class Meta:
+        indexes = [
+            # admin prefix search (LIKE 'term%'); opclasses only apply on PostgreSQL
+            models.Index(fields=["sku"], name="product_sku_prefix", opclasses=["varchar_pattern_ops"]),
+            models.Index(fields=["title"], name="product_title_prefix", opclasses=["varchar_pattern_ops"]),
+        ]
+
+    objects = ChangeLoggedQuerySet.as_manager()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._nav_state = instance.nav_state()
+        return instance
+
+    def nav_state(self):
+        """(category, active, in stock) as counted by catalog.nav, UNKNOWN when fields are deferred."""
+        from .nav import UNKNOWN, nav_state
+        if self.get_deferred_fields() & {"category_id", "is_active", "stock_qty"}:
+            return UNKNOWN
+        return nav_state(self)
+
     def save(self, *args, **kwargs):
         if not self.slug:
             # include SKU to make unique slugs deterministic
             self.slug = slugify(f"{self.title}-{self.sku}")
         self.updated_at = timezone.now()
-        return super().save(*args, **kwargs)
+        op = OP_CREATE if self._state.adding else OP_UPDATE
+        with transaction.atomic(using=kwargs.get("using")):
+            result = super().save(*args, **kwargs)
+            log_changes(Product, [self.pk], op, kwargs.get("update_fields"), [self])
+        return result
+
+    def delete(self, *args, **kwargs):
+        product_id = self.pk
+        with transaction.atomic(using=kwargs.get("using")):
+            result = super().delete(*args, **kwargs)
+            log_changes(Product, [product_id], OP_DELETE, objs=[self])
+        return result
+
+    @classmethod
+    def on_catalog_change(cls, ids, op, fields, objs):
+        # After commit, so the next read re-caches the committed rows
+        from . import nav
+        from .cache import products_changed
+        transaction.on_commit(lambda: products_changed(ids))
+        if objs is None:
+            # Queryset update()/delete(): previous nav states are unknown
+            if op != OP_UPDATE or fields is None or NAV_FIELDS & set(fields):
+                transaction.on_commit(nav.invalidate)
+            return
+        transitions = []
+        for obj in objs:
+            # (state when loaded/last saved, current state); None for a new/deleted product
+            old = None if op == OP_CREATE else getattr(obj, "_nav_state", nav.UNKNOWN)
+            new = None if op == OP_DELETE else obj.nav_state()
+            obj._nav_state = new
+            if old != new:
+                transitions.append((old, new))
+        if transitions:
+            transaction.on_commit(lambda: nav.products_changed(transitions))
 
     def __str__(self):
         return f"{self.title} ({self.sku})"
+
+
+class CatalogChange(models.Model):
+    """
+    One row per Product/Category row written, in the writing transaction
+    (see catalog/changes.py). Consumers follow it by id.
+    """
+    OP_CHOICES = [(OP_CREATE, "create"), (OP_UPDATE, "update"), (OP_DELETE, "delete")]
+
+    entity = models.CharField(max_length=32)  # model name: "product" or "category"
+    object_id = models.BigIntegerField()  # no FK: deletes are logged too
+    op = models.CharField(max_length=8, choices=OP_CHOICES)
+    fields = models.JSONField(null=True, blank=True)  # names of the fields written; null: all / unknown
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        db_table = "catalog_change"
+        indexes = [models.Index(fields=["entity", "id"], name="catalog_change_entity_id")]
+
+    def __str__(self):
+        return f"change {self.id}: {self.op} {self.entity} {self.object_id}"
+
+
+class CatalogChangeConsumer(models.Model):
+    """Position (last CatalogChange id processed) of a named consumer (catalog.changes.consume)."""
+    name = models.CharField(max_length=100, unique=True)
+    position = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = "catalog_change_consumer"
+
+    def __str__(self):
+        return f"{self.name} @ {self.position}"
@@ -0,0 +1,104 @@
+# catalog/nav.py
+"""
+Category navigation snapshot (GET /api/categories/nav/).
+
+All active categories with their counts of active and of active in-stock
+products, built by one grouped aggregate and cached as a single JSON blob
+(served as is, no serializer run per request).
+
+The snapshot is kept current incrementally: product writes on model
+instances (save()/delete(), bulk_create()/bulk_update(), e.g. the stock
+decrement of Order.mark_paid()) report each product whose (category,
+is_active, in stock) state changed, and the counts are adjusted in place once
+the transaction commits (see Product.on_catalog_change). Category changes,
+queryset update()/delete() touching those fields, products whose previous
+state is unknown (deferred fields) and concurrent updates drop the snapshot
+instead, and it is rebuilt on the next read. Changes committed while a
+rebuild is running are missed; CATALOG_NAV_TIMEOUT bounds how long such
+drift can last.
+"""
+import orjson
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from ecom.caching import get_or_compute, update_computed
+from ecom.renderers import dumps
+
+NAV_KEY = "catalog:nav"
+UNKNOWN = object()
+
+
+def _timeout():
+    return getattr(settings, "CATALOG_NAV_TIMEOUT", 3600)
+
+
+def nav_state(product):
+    """What the snapshot counts of a product: (category id, active, in stock)."""
+    return product.category_id, product.is_active, product.stock_qty > 0
+
+
+def build_snapshot():
+    from .models import Category
+
+    categories = (
+        Category.objects.filter(is_active=True)
+        .annotate(
+            active_products=Count("products", filter=Q(products__is_active=True)),
+            in_stock_products=Count("products", filter=Q(products__is_active=True, products__stock_qty__gt=0)),
+        )
+        .order_by("name")
+        .values("id", "name", "slug", "active_products", "in_stock_products")
+    )
+    return dumps({"categories": list(categories)})
+
+
+def nav_snapshot():
+    """The snapshot as JSON bytes."""
+    return get_or_compute(NAV_KEY, build_snapshot, _timeout())
+
+
+def invalidate():
+    cache.delete(NAV_KEY)
+
+
+def _counts(state):
+    _, active, in_stock = state
+    return (1, 1) if active and in_stock else (1, 0) if active else (0, 0)
+
+
+def products_changed(transitions):
+    """Apply [(old state or None or UNKNOWN, new state or None)] to the cached snapshot."""
+    deltas = {}
+    for old, new in transitions:
+        if old is UNKNOWN:
+            invalidate()
+            return
+        for state, sign in ((old, -1), (new, 1)):
+            if state is None:
+                continue
+            active, in_stock = _counts(state)
+            delta = deltas.setdefault(state[0], [0, 0])
+            delta[0] += sign * active
+            delta[1] += sign * in_stock
+    deltas = {category_id: delta for category_id, delta in deltas.items() if any(delta)}
+    if not deltas:
+        return
+
+    def apply(blob):
+        snapshot = orjson.loads(blob)
+        for category in snapshot["categories"]:
+            delta = deltas.get(category["id"])
+            if delta:
+                category["active_products"] += delta[0]
+                category["in_stock_products"] += delta[1]
+        return dumps(snapshot)
+
+    lock = f"{NAV_KEY}:update"
+    if not cache.add(lock, 1, 5):
+        invalidate()  # another update is in flight; rebuilding is simpler than merging
+        return
+    try:
+        update_computed(NAV_KEY, apply)
+    finally:
+        cache.delete(lock)
@@ -0,0 +1,172 @@
+# catalog/tests/test_caching.py
+"""
+ecom.caching.get_or_compute under concurrency (a LocMemCache shared by the
+threads stands in for Redis: same add/get/set semantics), and the cached
+catalog API lists built on it.
+"""
+import threading
+import time
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from catalog.models import Category, Product
+from ecom.caching import STALE_FACTOR, get_or_compute, set_computed, update_computed
+
+
+def _run_threads(n, target):
+    barrier = threading.Barrier(n)
+    results = [None] * n
+
+    def run(i):
+        barrier.wait()
+        results[i] = target()
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(n)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+class DownCache:
+    """What django_redis with IGNORE_EXCEPTIONS does while Redis is unreachable."""
+
+    def get(self, key, default=None):
+        return None
+
+    def add(self, key, value, timeout=None):
+        return None
+
+    def set(self, key, value, timeout=None):
+        return None
+
+    def delete(self, key):
+        return None
+
+
+class TimeoutRecordingCache(LocMemCache):
+    def __init__(self):
+        super().__init__("timeout-recording-tests", {})
+        self.timeouts = []
+
+    def set(self, key, value, timeout=None, version=None):
+        self.timeouts.append(timeout)
+        super().set(key, value, timeout, version)
+
+
+class GetOrComputeTests(SimpleTestCase):
+    def setUp(self):
+        self.cache = LocMemCache("get-or-compute-tests", {})
+        self.cache.clear()
+        self.calls = 0
+        self.calls_lock = threading.Lock()
+
+    def _compute(self, value, delay=0.1):
+        def compute():
+            with self.calls_lock:
+                self.calls += 1
+            time.sleep(delay)
+            return value
+        return compute
+
+    def test_cold_key_is_computed_once(self):
+        results = _run_threads(8, lambda: get_or_compute("k", self._compute("fresh"), 60, cache=self.cache))
+        self.assertEqual(results, ["fresh"] * 8)
+        self.assertEqual(self.calls, 1)
+
+    def test_expired_key_serves_stale_while_one_thread_refreshes(self):
+        self.cache.set("k", ("stale", 0.0, time.time() - 1), 60)  # logically expired, still stored
+        results = _run_threads(8, lambda: get_or_compute("k", self._compute("fresh", 0.3), 60, cache=self.cache))
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(results.count("fresh"), 1)
+        self.assertEqual(results.count("stale"), 7)
+        self.assertEqual(get_or_compute("k", self._compute("again"), 60, cache=self.cache), "fresh")
+
+    def test_unavailable_cache_computes_without_waiting(self):
+        start = time.monotonic()
+        results = [get_or_compute("k", self._compute("db", 0), 60, cache=DownCache()) for _ in range(3)]
+        self.assertLess(time.monotonic() - start, 0.5)
+        self.assertEqual((results, self.calls), (["db"] * 3, 3))
+
+    def test_updates_keep_the_stale_window(self):
+        cache = TimeoutRecordingCache()
+        cache.clear()
+        set_computed("k", 1, 60, cache=cache)
+        entry = cache.get("k")
+        cache.set("k", entry[:2] + (time.time() + 5,) + entry[3:], 120)  # 5s before logical expiry
+        for _ in range(3):
+            self.assertTrue(update_computed("k", lambda n: n + 1, cache=cache))
+        self.assertEqual(cache.get("k")[0], 4)
+        for timeout in cache.timeouts[2:]:
+            self.assertAlmostEqual(timeout, 5 + 60 * (STALE_FACTOR - 1), delta=1)
+
+    def test_early_recompute_probability_rises_near_expiry(self):
+        # 1s compute cost: half a second before expiry XFetch usually refreshes, an hour before never
+        near = 0
+        for _ in range(50):
+            set_computed("near", "old", 0.5, delta=1.0, cache=self.cache)
+            near += get_or_compute("near", lambda: "new", 60, cache=self.cache) == "new"
+        set_computed("far", "old", 3600, delta=1.0, cache=self.cache)
+        far = {get_or_compute("far", lambda: "new", 3600, cache=self.cache) for _ in range(50)}
+        self.assertGreater(near, 10)
+        self.assertEqual(far, {"old"})
+
+
+class CatalogApiCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.category = Category.objects.create(name="Garden")
+        Product.objects.create(category=self.category, sku="G-1", title="Rake", price=Decimal("9.50"))
+
+    def test_list_is_served_from_cache_until_category_changes(self):
+        first = self.client.get("/api/products/")
+        with CaptureQueriesContext(connection) as ctx:
+            again = self.client.get("/api/products/")
+        self.assertEqual(ctx.captured_queries, [])
+        self.assertEqual(again.content, first.content)
+        self.assertEqual(again["ETag"], first["ETag"])
+        self.assertEqual(self.client.get("/api/products/", HTTP_IF_NONE_MATCH=first["ETag"]).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.category.name = "Yard"
+            self.category.save()
+        self.assertEqual(self.client.get("/api/products/").json()[0]["category"]["name"], "Yard")
+
+
+# The prod cache options (ecom/settings/prod.py) against a Redis that refuses connections
+UNREACHABLE_REDIS = {
+    "BACKEND": "django_redis.cache.RedisCache",
+    "LOCATION": "redis://127.0.0.1:1/0",
+    "OPTIONS": {
+        "CLIENT_CLASS": "django_redis.client.DefaultClient",
+        "SOCKET_CONNECT_TIMEOUT": 0.5,
+        "SOCKET_TIMEOUT": 0.5,
+        "IGNORE_EXCEPTIONS": True,
+    },
+}
+
+
+@override_settings(CACHES={
+    "default": UNREACHABLE_REDIS,
+    "local": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "down-local"},
+    "hot": {"BACKEND": "ecom.cache_backends.TieredCache", "OPTIONS": {"LOCAL": "local", "REMOTE": "default"}},
+})
+class CacheOutageTests(TestCase):
+    def test_catalog_is_served_from_the_database(self):
+        category = Category.objects.create(name="Garden")
+        product = Product.objects.create(category=category, sku="G-1", title="Rake", price=Decimal("9.50"))
+        self.client.force_login(get_user_model().objects.create_user(email="s@example.com", password="S-secure-pass1"))
+        for url in ("/api/products/", f"/api/products/{product.id}/", "/api/categories/nav/",
+                    "/store/", f"/store/p/{product.slug}/"):
+            start = time.monotonic()
+            resp = self.client.get(url)
+            self.assertEqual(resp.status_code, 200, url)
+            self.assertLess(time.monotonic() - start, 1.0, url)
+        self.assertEqual(self.client.get("/api/products/").json()[0]["title"], "Rake")
@@ -0,0 +1,105 @@
+# catalog/tests/test_changes.py
+"""catalog_change: every product/category write is logged (bulk paths too), consumers follow it by id."""
+from decimal import Decimal
+from io import StringIO
+
+import orjson
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from catalog import changes
+from catalog.models import CatalogChange, CatalogChangeConsumer, Category, Product
+
+
+@override_settings(CATALOG_CHANGE_SETTLE_SECONDS=0)
+class CatalogChangeTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.garden = Category.objects.create(name="Garden")
+        self.rake = Product.objects.create(category=self.garden, sku="G-1", title="Rake", price=Decimal("9.50"), stock_qty=3)
+        self.hoe = Product.objects.create(category=self.garden, sku="G-2", title="Hoe", price=Decimal("7.00"), stock_qty=1)
+        self.start = CatalogChange.objects.latest("id").id
+
+    def _logged(self):
+        return list(CatalogChange.objects.filter(id__gt=self.start).order_by("id")
+                    .values_list("entity", "object_id", "op", "fields"))
+
+    def test_model_and_bulk_writes_are_logged(self):
+        self.rake.price = Decimal("8.00")
+        self.rake.save(update_fields=["price", "updated_at"])
+        Product.objects.filter(stock_qty__lt=2).update(is_active=False)
+        self.hoe.stock_qty = 5
+        Product.objects.bulk_update([self.hoe], ["stock_qty"])
+        (shovel,) = Product.objects.bulk_create([
+            Product(category=self.garden, sku="G-3", title="Shovel", slug="shovel", price=Decimal("15.00")),
+        ])
+        Product.objects.filter(pk=shovel.pk).delete()
+        self.garden.products.update(currency="EUR")
+        self.assertEqual(self._logged(), [
+            ("product", self.rake.id, "update", ["price", "updated_at"]),
+            ("product", self.hoe.id, "update", ["is_active"]),
+            ("product", self.hoe.id, "update", ["stock_qty"]),
+            ("product", shovel.id, "create", None),
+            ("product", shovel.id, "delete", None),
+            ("product", self.rake.id, "update", ["currency"]),
+            ("product", self.hoe.id, "update", ["currency"]),
+        ])
+
+    def test_category_writes_are_logged(self):
+        Category.objects.filter(pk=self.garden.pk).update(description="Outdoor")
+        tools = Category.objects.create(name="Tools")
+        tools_id = tools.id
+        tools.delete()
+        self.assertEqual([row[:3] for row in self._logged()], [
+            ("category", self.garden.id, "update"), ("category", tools_id, "create"), ("category", tools_id, "delete"),
+        ])
+
+    def test_bulk_update_invalidates_caches_after_commit(self):
+        self.assertEqual(self.client.get("/api/categories/nav/").json()["categories"][0]["in_stock_products"], 2)
+        product = Product.objects.get(pk=self.hoe.pk)
+        product.stock_qty = 0
+        with self.captureOnCommitCallbacks(execute=True):
+            Product.objects.bulk_update([product], ["stock_qty"])
+        self.assertEqual(self.client.get("/api/categories/nav/").json()["categories"][0]["in_stock_products"], 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            Product.objects.filter(pk=self.rake.pk).update(stock_qty=0)
+        self.assertEqual(self.client.get("/api/categories/nav/").json()["categories"][0]["in_stock_products"], 0)
+
+    def test_consume_is_at_least_once(self):
+        Product.objects.filter(pk__in=[self.rake.pk, self.hoe.pk]).update(title="Tool")
+
+        def fail(batch):
+            raise RuntimeError("downstream is down")
+
+        CatalogChangeConsumer.objects.create(name="search", position=self.start)
+        with self.assertRaises(RuntimeError):
+            changes.consume("search", fail)
+        self.assertEqual(CatalogChangeConsumer.objects.get(name="search").position, self.start)
+
+        seen = []
+        self.assertEqual(changes.consume("search", lambda batch: seen.extend(batch), batch_size=1), 1)
+        self.assertEqual(changes.consume("search", lambda batch: seen.extend(batch), batch_size=1), 1)
+        self.assertEqual(changes.consume("search", lambda batch: seen.extend(batch)), 0)
+        self.assertEqual([c.object_id for c in seen], [self.rake.id, self.hoe.id])
+
+    @override_settings(CATALOG_CHANGE_SETTLE_SECONDS=60)
+    def test_unsettled_changes_are_held_back(self):
+        self.assertEqual(changes.read_changes(0), [])
+
+    def test_tail_command_and_api(self):
+        Product.objects.filter(pk=self.rake.pk).update(title="Big rake")
+        out = StringIO()
+        call_command("tail_catalog_changes", after=self.start, stdout=out)
+        lines = [orjson.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual([(c["object_id"], c["op"]) for c in lines], [(self.rake.id, "update")])
+
+        self.assertEqual(self.client.get("/api/catalog/changes/").status_code, 401)
+        admin = get_user_model().objects.create_user(email="staff@example.com", password="S-secure-pass1", is_staff=True)
+        client = APIClient()
+        client.force_authenticate(admin)
+        body = client.get("/api/catalog/changes/", {"after": 0, "limit": 2, "entity": "product"}).json()
+        self.assertEqual([c["object_id"] for c in body["results"]], [self.rake.id, self.hoe.id])
+        self.assertEqual(body["next"], body["results"][-1]["id"])
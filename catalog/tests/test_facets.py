@@ -0,0 +1,53 @@
+# catalog/tests/test_facets.py
+"""?facets= on the product list: one aggregate query, each facet ignoring its own filter."""
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from catalog.models import Category, Product
+
+
+class ProductFacetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.garden = Category.objects.create(name="Garden")
+        self.kitchen = Category.objects.create(name="Kitchen")
+        for sku, category, price, stock in (
+            ("G-1", self.garden, "5.00", 1),
+            ("G-2", self.garden, "30.00", 0),
+            ("K-1", self.kitchen, "12.00", 4),
+            ("K-2", self.kitchen, "300.00", 2),
+        ):
+            Product.objects.create(category=category, sku=sku, title=sku, price=Decimal(price), stock_qty=stock)
+
+    def test_facets_exclude_their_own_filter(self):
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get("/api/products/", {
+                "facets": "category,price,in_stock", "category": self.kitchen.id, "in_stock": "true",
+            })
+        self.assertEqual(resp.status_code, 200)
+        body = resp.json()
+        self.assertEqual(sorted(p["sku"] for p in body["results"]), ["K-1", "K-2"])
+        facets = body["facets"]
+        # category: in-stock products of every category
+        self.assertEqual(facets["category"], [{"id": self.garden.id, "count": 1}, {"id": self.kitchen.id, "count": 2}])
+        # in_stock: kitchen products in or out of stock
+        self.assertEqual(facets["in_stock"], {"true": 2, "false": 0})
+        # price: in-stock kitchen products
+        self.assertEqual({b["min"]: b["count"] for b in facets["price"] if b["count"]}, {"10.00": 1, "250.00": 1})
+        facet_queries = [q for q in ctx.captured_queries if "GROUP BY" in q["sql"]]
+        self.assertEqual(len(facet_queries), 1)
+
+        with CaptureQueriesContext(connection) as ctx:
+            again = self.client.get("/api/products/", {
+                "facets": "category,price,in_stock", "category": self.kitchen.id, "in_stock": "true",
+            })
+        self.assertEqual(ctx.captured_queries, [])
+        self.assertEqual(again.json(), body)
+
+    def test_plain_list_and_unknown_facet(self):
+        self.assertIsInstance(self.client.get("/api/products/").json(), list)
+        self.assertEqual(self.client.get("/api/products/", {"facets": "colour"}).status_code, 400)
@@ -0,0 +1,75 @@
+# catalog/tests/test_index.py
+"""catalog.index pages must match the database path, and follow the catalog_change log."""
+import datetime
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from catalog import index as catalog_index
+from catalog.models import CatalogChange, Category, Product
+
+
+@override_settings(CATALOG_INDEX_ENABLED=True)
+class CatalogIndexTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        catalog_index.reset_index()
+        self.addCleanup(catalog_index.reset_index)
+        self.garden = Category.objects.create(name="Garden")
+        self.kitchen = Category.objects.create(name="Kitchen")
+        start = timezone.now() - datetime.timedelta(days=1)
+        self.products = [
+            Product.objects.create(
+                category=self.garden if n % 3 else self.kitchen, sku=f"P-{n}", title=f"Item {n}",
+                price=Decimal(n * 7 % 23) + Decimal("0.99"), stock_qty=n % 4,
+                created_at=start + datetime.timedelta(minutes=n),
+            )
+            for n in range(20)
+        ]
+
+    def _get(self, params, indexed):
+        cache.clear()
+        with override_settings(CATALOG_INDEX_ENABLED=indexed):
+            resp = self.client.get("/api/products/", params)
+        self.assertEqual(resp.status_code, 200)
+        return resp.json()
+
+    def test_pages_match_database(self):
+        for params in (
+            {"limit": 5},
+            {"limit": 4, "offset": 3, "ordering": "price", "category": self.garden.id, "in_stock": "true"},
+            {"limit": 6, "ordering": "-price", "price_min": "3", "price_max": "15.99"},
+            {"limit": 3, "offset": 2, "ordering": "created_at", "price_min": "5", "category": self.kitchen.id},
+            {"limit": 5, "offset": 50},
+        ):
+            self.assertEqual(self._get(params, True), self._get(params, False), params)
+
+    def test_only_page_rows_are_read(self):
+        self._get({"limit": 2}, True)  # load
+        cache.clear()
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get("/api/products/", {"limit": 2, "ordering": "price"})
+        product_queries = [q["sql"] for q in ctx.captured_queries if 'FROM "catalog_product"' in q["sql"]]
+        self.assertEqual(len(product_queries), 1)
+        self.assertIn("IN (", product_queries[0])
+
+    def test_follows_change_log(self):
+        params = {"limit": 3, "ordering": "price", "category": self.kitchen.id}
+        self._get(params, True)
+        cheapest = self.products[1]
+        cheapest.category = self.kitchen
+        cheapest.price = Decimal("0.10")
+        cheapest.save()
+        self.products[3].delete()
+        self.assertEqual(CatalogChange.objects.filter(entity="product", object_id__in=[cheapest.id, self.products[3].id]).count(), 2)
+        self.assertEqual(self._get(params, True), self._get(params, False))
+        self.assertEqual(self._get(params, True)["results"][0]["id"], cheapest.id)
+
+    def test_unsupported_queries_use_database(self):
+        self.assertIsInstance(self._get({"search": "Item"}, True), list)
+        page = self._get({"limit": 2, "ordering": "title"}, True)
+        self.assertEqual(page["count"], 20)
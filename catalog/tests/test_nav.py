@@ -0,0 +1,59 @@
+# catalog/tests/test_nav.py
+"""Category nav snapshot: one aggregate to build, adjusted in place on product changes."""
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from catalog.models import Category, Product
+
+
+class NavSnapshotTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.garden = Category.objects.create(name="Garden")
+        self.kitchen = Category.objects.create(name="Kitchen")
+        Category.objects.create(name="Retired", is_active=False)
+        self.rake = Product.objects.create(category=self.garden, sku="G-1", title="Rake", price=Decimal("9.50"), stock_qty=1)
+        Product.objects.create(category=self.garden, sku="G-2", title="Hoe", price=Decimal("7.00"))
+        Product.objects.create(category=self.kitchen, sku="K-1", title="Pan", price=Decimal("20.00"), is_active=False)
+
+    def _counts(self):
+        resp = self.client.get("/api/categories/nav/")
+        self.assertEqual(resp.status_code, 200)
+        return {c["name"]: (c["active_products"], c["in_stock_products"]) for c in resp.json()["categories"]}
+
+    def test_built_with_one_query_then_served_from_cache(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self._counts(), {"Garden": (2, 1), "Kitchen": (0, 0)})
+        self.assertEqual(len(ctx.captured_queries), 1)
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get("/api/categories/nav/")
+        self.assertEqual(ctx.captured_queries, [])
+        self.assertEqual(self.client.get("/api/categories/nav/", HTTP_IF_NONE_MATCH=resp["ETag"]).status_code, 304)
+
+    def test_product_changes_adjust_counts_without_rebuild(self):
+        self._counts()
+        rake = Product.objects.get(pk=self.rake.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            rake.category = self.kitchen
+            rake.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            Product.objects.create(category=self.kitchen, sku="K-2", title="Pot", price=Decimal("15.00"), stock_qty=3)
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self._counts(), {"Garden": (1, 0), "Kitchen": (2, 2)})
+        self.assertEqual(ctx.captured_queries, [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            rake.stock_qty = 0
+            rake.save()
+        self.assertEqual(self._counts(), {"Garden": (1, 0), "Kitchen": (2, 1)})
+
+    def test_category_change_rebuilds(self):
+        self._counts()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.kitchen.is_active = False
+            self.kitchen.save()
+        self.assertEqual(self._counts(), {"Garden": (2, 1)})
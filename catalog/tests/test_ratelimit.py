@@ -0,0 +1,72 @@
+# catalog/tests/test_ratelimit.py
+"""Rate limits (ecom/ratelimit.py) on the catalog and login endpoints, in-process backend."""
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework_simplejwt.tokens import AccessToken
+
+from ecom import ratelimit
+from ecom.ratelimit import LocalLimiter, Limiter, parse_rate
+
+User = get_user_model()
+
+
+@override_settings(RATELIMIT_ENABLED=True, RATELIMIT_REDIS_URL=None, RATELIMIT_IP_HEADER=None)
+class RateLimitTests(TestCase):
+    def setUp(self):
+        ratelimit.reset_limiter()
+        self.addCleanup(ratelimit.reset_limiter)
+
+    def test_parse_rate(self):
+        self.assertEqual(parse_rate("10/m"), (10, 60_000))
+        self.assertEqual(parse_rate("5/30s"), (5, 30_000))
+        with self.assertRaises(ValueError):
+            parse_rate("10 per minute")
+
+    def test_login_rejected_with_retry_after_before_db_work(self):
+        for _ in range(5):
+            resp = self.client.post("/api/auth/login", {"email": "x@example.com", "password": "nope"})
+            self.assertEqual(resp.status_code, 401)
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.post("/api/auth/login", {"email": "x@example.com", "password": "nope"})
+        self.assertEqual(resp.status_code, 429)
+        self.assertGreaterEqual(int(resp["Retry-After"]), 1)
+        self.assertEqual(ctx.captured_queries, [])
+        # Another client IP has its own budget
+        resp = self.client.post(
+            "/api/auth/login", {"email": "x@example.com", "password": "nope"}, REMOTE_ADDR="10.0.0.2",
+        )
+        self.assertEqual(resp.status_code, 401)
+
+    def test_search_scope_and_per_user_keys(self):
+        for _ in range(30):
+            self.assertEqual(self.client.get("/api/products/", {"search": "rake"}).status_code, 200)
+        self.assertEqual(self.client.get("/api/products/", {"search": "rake"}).status_code, 429)
+        # Plain listing is under the wider route policy
+        self.assertEqual(self.client.get("/api/products/").status_code, 200)
+        # A signed-in user is counted on their own key, not the shared IP
+        user = User.objects.create_user(email="shopper@example.com", password="S-secure-pass1")
+        token = AccessToken.for_user(user)
+        resp = self.client.get("/api/products/", {"search": "rake"}, HTTP_AUTHORIZATION=f"Bearer {token}")
+        self.assertEqual(resp.status_code, 200)
+
+    def test_redis_failure_falls_back_to_local(self):
+        limiter = Limiter()
+        limiter.redis = mock.Mock(hit=mock.Mock(side_effect=ConnectionError("down")))
+        checks = [("t:ip:1", 2, 60_000)]
+        self.assertEqual([bool(limiter.hit(checks)) for _ in range(3)], [False, False, True])
+        # Redis is skipped until the retry delay passes
+        self.assertEqual(limiter.redis.hit.call_count, 1)
+
+    def test_sliding_window_weights_previous_window(self):
+        limiter = LocalLimiter()
+        checks = [("t:ip:1", 4, 1000)]
+        for _ in range(4):
+            self.assertEqual(limiter.hit(checks, 10_500), 0)
+        # Halfway through the next window half of the previous count still applies
+        self.assertEqual(limiter.hit(checks, 11_500), 0)
+        self.assertEqual(limiter.hit(checks, 11_500), 0)
+        self.assertGreater(limiter.hit(checks, 11_500), 0)
@@ -0,0 +1,86 @@
+# catalog/tests/test_storefront.py
+"""Storefront: paginated list and detail served from cache, invalidated by Product.save."""
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from catalog.cache import bump_catalog_version, catalog_version
+from catalog.models import Category, Product
+
+User = get_user_model()
+
+
+def _product_queries(ctx):
+    return [q["sql"] for q in ctx.captured_queries if "catalog_product" in q["sql"]]
+
+
+@override_settings(STOREFRONT_PAGE_SIZE=2)
+class StorefrontCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        category = Category.objects.create(name="Garden", slug="garden")
+        self.products = [
+            Product.objects.create(category=category, sku=f"G-{n}", title=f"Rake {n}", price=Decimal("9.50"))
+            for n in range(5)
+        ]
+        user = User.objects.create_user(email="shopper@example.com", password="S-secure-pass1")
+        self.client.force_login(user)
+
+    def test_list_is_paginated_and_cached(self):
+        resp = self.client.get("/store/", {"page": 2})
+        self.assertContains(resp, "Rake 2")
+        self.assertNotContains(resp, "Rake 4")
+        self.assertContains(resp, "Page 2 of 3")
+        with CaptureQueriesContext(connection) as ctx:
+            again = self.client.get("/store/", {"page": 2})
+        self.assertEqual(_product_queries(ctx), [])
+        self.assertContains(again, "Rake 2")
+        # CSRF tokens are rendered per request, outside the cached fragments
+        self.assertContains(again, "csrfmiddlewaretoken", count=2)
+
+    def test_save_invalidates_list_and_detail(self):
+        product = self.products[0]
+        self.assertContains(self.client.get(f"/store/p/{product.slug}/"), "Rake 0")
+        self.client.get("/store/")
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(f"/store/p/{product.slug}/")
+        self.assertEqual(_product_queries(ctx), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            product.title = "Leaf rake"
+            product.save()
+        self.assertContains(self.client.get("/store/"), "Leaf rake")
+        self.assertContains(self.client.get(f"/store/p/{product.slug}/"), "Leaf rake")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            product.is_active = False
+            product.save()
+        self.assertEqual(self.client.get(f"/store/p/{product.slug}/").status_code, 404)
+        self.assertNotContains(self.client.get("/store/"), "Leaf rake")
+
+
+class HotCacheTests(TestCase):
+    """The "hot" alias (ecom.cache_backends.TieredCache) used for the catalog version."""
+
+    def setUp(self):
+        cache.clear()
+        caches["hot"].clear()
+
+    def test_reads_are_served_locally_and_writes_go_through(self):
+        hot = caches["hot"]
+        cache.set("k", 1)
+        self.assertEqual(hot.get("k"), 1)
+        cache.set("k", 2)  # another process writing the shared tier
+        self.assertEqual(hot.get("k"), 1)
+        hot.set("k", 3)
+        self.assertEqual((hot.get("k"), cache.get("k")), (3, 3))
+
+    def test_bump_is_visible_in_process_after_shared_cache_loss(self):
+        version = catalog_version()
+        cache.clear()  # shared tier evicted; the local copy remains
+        bump_catalog_version()
+        self.assertNotEqual(catalog_version(), version)
@@ -1,7 +1,21 @@
+import hashlib
 import logging
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
 from django_filters import rest_framework as filters
+from django.db.models import Q
 from rest_framework import permissions, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.filters import SearchFilter, OrderingFilter
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from ecom.conditional import ConditionalGetMixin
+from ecom.fastserializers import FastListMixin
+from ecom.ratelimit import RateLimit
+from . import cache as catalog_cache, changes as catalog_changes, facets as catalog_facets, index as catalog_index, nav as catalog_nav
 from .models import Category, Product
 from .serializers import CategorySerializer, ProductSerializer
 
@@ -30,15 +44,87 @@ class ProductFilter(filters.FilterSet):
     def filter_in_stock(self, queryset, name, value):
         return queryset.filter(stock_qty__gt=0) if value else queryset
 
-class CategoryViewSet(viewsets.ModelViewSet):
+    def facet_q(self):
+        """{facet: Q of its active filter} (see catalog/facets.py); call after validation."""
+        data = self.form.cleaned_data
+        q = {}
+        if data.get("category") is not None:
+            q["category"] = Q(category__id=data["category"])
+        if data.get("category_slug"):
+            q["category"] = q.get("category", Q()) & Q(category__slug__iexact=data["category_slug"])
+        if data.get("price_min") is not None:
+            q["price"] = Q(price__gte=data["price_min"])
+        if data.get("price_max") is not None:
+            q["price"] = q.get("price", Q()) & Q(price__lte=data["price_max"])
+        if data.get("in_stock"):
+            q["in_stock"] = Q(stock_qty__gt=0)
+        return q
+
+class ProductPagination(LimitOffsetPagination):
+    # No default_limit: lists are only paginated when ?limit= is given
+    max_limit = 200
+
+# Query parameters catalog.index answers on its own
+INDEX_PARAMS = {"category", "in_stock", "price_min", "price_max", "ordering", "limit", "offset", "format"}
+
+def _is_search(request):
+    return bool(request.GET.get("search") or request.GET.get("q"))
+
+# Public catalog: shared caches/CDNs may keep it briefly, then revalidate via ETag
+CATALOG_CACHE_CONTROL = {"public": True, "max_age": 60, "stale_while_revalidate": 30}
+
+class CachedCatalogListMixin:
+    """
+    List validators and rows cached per catalog version and request URL
+    (catalog/cache.py), so a hit answers (or 304s) without queries.
+    Streamed lists are not cached.
+    """
+
+    def list(self, request, *args, **kwargs):
+        # Settings that shape the response are part of the key, so switching them takes effect at once
+        view_key = "|".join(str(part) for part in (
+            self.basename, request.accepted_renderer.format, request.get_full_path(),
+            getattr(settings, "FAST_SERIALIZERS_ENABLED", True), getattr(settings, "JSON_STREAM_THRESHOLD", None),
+        ))
+        entry = catalog_cache.api_list(view_key, lambda: self._compute_list(request))
+        if entry is None:
+            return super().list(request, *args, **kwargs)
+        etag, data = entry
+        cached = self._not_modified(request, etag, None)
+        if cached is not None:
+            return self._finalize_conditional(cached, etag, None)
+        return self._finalize_conditional(Response(data), etag, None)
+
+    def _compute_list(self, request):
+        queryset = self.filter_queryset(self.get_queryset())
+        last_modified, count = self._list_validators(queryset)
+        if self._should_stream(request, count):
+            return None
+        etag = self._etag(self.basename, "list", request.get_full_path(), last_modified, count)
+        return etag, self._list_response(request, queryset, count).data
+
+class CategoryViewSet(CachedCatalogListMixin, FastListMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = [IsAdminOrReadOnly]
+    cache_control = CATALOG_CACHE_CONTROL
     filter_backends = [SearchFilter, OrderingFilter, filters.DjangoFilterBackend]
     search_fields = ["name", "description"]
     ordering_fields = ["name"]
     ordering = ["name"]
 
+    @action(detail=False, methods=["get"])
+    def nav(self, request):
+        """Active categories with active/in-stock product counts, from the cached snapshot (catalog/nav.py)."""
+        blob = catalog_nav.nav_snapshot()
+        etag = f'"{hashlib.sha1(blob).hexdigest()}"'
+        response = get_conditional_response(request._request, etag=etag)
+        if response is None:
+            response = HttpResponse(blob, content_type="application/json")
+        response["ETag"] = etag
+        patch_cache_control(response, **CATALOG_CACHE_CONTROL)
+        return response
+
     def perform_create(self, serializer):
         obj = serializer.save()
         log.info("Category created id=%s name=%s", obj.id, obj.name)
@@ -51,22 +137,88 @@ class CategoryViewSet(viewsets.ModelViewSet):
         log.warning("Category deleted id=%s name=%s", instance.id, instance.name)
         return super().perform_destroy(instance)
 
-class ProductViewSet(viewsets.ModelViewSet):
+class ProductViewSet(CachedCatalogListMixin, FastListMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Product.objects.select_related("category").all()
     serializer_class = ProductSerializer
     permission_classes = [IsAdminOrReadOnly]
+    cache_control = CATALOG_CACHE_CONTROL
+    conditional_fields = ("updated_at", "category__updated_at")  # category is nested in the payload
     filter_backends = [SearchFilter, OrderingFilter, filters.DjangoFilterBackend]
     search_fields = ["title", "description", "sku"]
     ordering_fields = ["price", "created_at", "title"]
     ordering = ["-created_at"]
     filterset_class = ProductFilter
+    pagination_class = ProductPagination
+    # Searches (unindexed LIKE scans) get a tighter budget of their own
+    ratelimits = (
+        RateLimit("120/m", key="user_or_ip"),
+        RateLimit("30/m", key="user_or_ip", scope="catalog:search", methods=("GET",), when=_is_search),
+    )
 
     def list(self, request, *args, **kwargs):
+        """?facets=category,price,in_stock wraps the rows as {"results": [...], "facets": {...}}."""
         q = request.query_params.get("search") or request.query_params.get("q")
         if q:
             log.debug("List products q='%s'", q)
+        catalog_facets.requested_facets(request)  # 400 on unknown names
         return super().list(request, *args, **kwargs)
 
+    def _should_stream(self, request, count):
+        return not catalog_facets.requested_facets(request) and super()._should_stream(request, count)
+
+    def _compute_list(self, request):
+        entry = self._index_page(request)
+        if entry is not None:
+            return entry
+        entry = super()._compute_list(request)
+        facets = catalog_facets.requested_facets(request)
+        if entry is None or not facets:
+            return entry
+        etag, data = entry
+        counts = self._facet_counts(request, facets)
+        # Counts cover rows outside the filtered list, so they are part of the validator
+        etag = self._etag(etag, sorted(counts.items()))
+        return etag, {"results": data, "facets": counts}
+
+    def _index_page(self, request):
+        """Cache entry for a ?limit= page answered by catalog.index, or None when it cannot answer it."""
+        params = request.query_params
+        if not getattr(settings, "CATALOG_INDEX_ENABLED", False) or "limit" not in params:
+            return None
+        ordering = params.get("ordering", "-created_at")
+        if not set(params) <= INDEX_PARAMS or ordering not in catalog_index.ORDERINGS:
+            return None
+        filterset = ProductFilter(params, queryset=Product.objects.none(), request=request)
+        if not filterset.is_valid():
+            return None  # the regular path reports the errors
+        data = filterset.form.cleaned_data
+        category = data.get("category")
+        if category is not None and category != int(category):
+            return None
+
+        index = catalog_index.get_index()
+        count, ids = index.page(
+            ordering, self.paginator.get_offset(request), self.paginator.get_limit(request),
+            category=int(category) if category is not None else None, in_stock=bool(data.get("in_stock")),
+            price_min=data.get("price_min"), price_max=data.get("price_max"),
+        )
+        page = self.paginate_queryset(catalog_index.IndexPage(count, ids, self.get_queryset()))
+        data = self.get_paginated_response(self.get_serializer(page, many=True).data).data
+        etag = self._etag(self.basename, "index", request.get_full_path(), index.watermark)
+        return etag, data
+
+    def _facet_counts(self, request, facets):
+        # Same search and non-facet filters as the list; facet filters go into the aggregate
+        queryset = SearchFilter().filter_queryset(request, Product.objects.all(), self)
+        data = request.query_params.copy()
+        for param in catalog_facets.facet_params():
+            data.pop(param, None)
+        base = ProductFilter(data, queryset=queryset, request=request)
+        full = ProductFilter(request.query_params, queryset=queryset, request=request)
+        if not (base.is_valid() and full.is_valid()):
+            raise ValidationError(full.errors)
+        return catalog_facets.facet_counts(base.qs, full.facet_q(), facets)
+
     def perform_create(self, serializer):
         obj = serializer.save()
         log.info(
@@ -84,3 +236,28 @@ class ProductViewSet(viewsets.ModelViewSet):
     def perform_destroy(self, instance):
         log.warning("Product deleted id=%s sku=%s title=%s", instance.id, instance.sku, instance.title)
         return super().perform_destroy(instance)
+
+
+class CatalogChangesView(APIView):
+    """
+    GET /api/catalog/changes/?after=<id>&limit=500&entity=product|category (staff)
+    The next changes past `after`, oldest first; pass `next` as `after` to continue.
+    """
+    permission_classes = [permissions.IsAdminUser]
+    max_limit = 1000
+
+    def get(self, request):
+        params = request.query_params
+        try:
+            after = int(params.get("after", 0))
+            limit = max(1, min(int(params.get("limit", 500)), self.max_limit))
+        except ValueError:
+            raise ValidationError({"detail": "after and limit must be integers"})
+        entity = params.get("entity") or None
+        if entity not in (None, "product", "category"):
+            raise ValidationError({"entity": "Expected 'product' or 'category'"})
+        batch = catalog_changes.read_changes(after, limit, entity)
+        return Response({
+            "results": [catalog_changes.as_dict(change) for change in batch],
+            "next": batch[-1].id if batch else after,
+        })
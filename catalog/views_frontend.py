@@ -1,19 +1,34 @@
 # catalog/views_frontend.py
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
-from django.shortcuts import render, get_object_or_404, redirect
+from django.http import Http404
+from django.shortcuts import render, redirect
 from django.views.decorators.http import require_POST
 from django.urls import reverse
+from catalog import cache as catalog_cache
 from catalog.models import Product
+from cart import readmodel
 from cart.models import Cart, CartItem
 
 @login_required
 def product_list(request):
-    products = Product.objects.filter(is_active=True).order_by("id")
-    return render(request, "catalog/products.html", {"products": products})
+    """Paginated; page rows and card fragments are cached per catalog version (catalog/cache.py)."""
+    try:
+        number = max(1, int(request.GET.get("page", 1)))
+    except ValueError:
+        number = 1
+    version, page = catalog_cache.storefront_page(number, settings.STOREFRONT_PAGE_SIZE)
+    return render(request, "catalog/products.html", {
+        "page": page,
+        "catalog_version": version,
+        "fragment_timeout": settings.CATALOG_CACHE_TIMEOUT,
+    })
 
 @login_required
 def product_detail(request, slug):
-    product = get_object_or_404(Product, slug=slug, is_active=True)
+    product = catalog_cache.get_product(slug)
+    if product is None or not product.is_active:
+        raise Http404("No Product matches the given query.")
     return render(request, "catalog/product_detail.html", {"product": product})
 
 @login_required
@@ -35,13 +50,9 @@ def add_to_cart(request, product_id):
 
 @login_required
 def view_cart(request):
-    cart = Cart.objects.filter(user=request.user, status=Cart.STATUS_OPEN).first()
-    items = []
-    subtotal = 0
-    if cart:
-        items = list(CartItem.objects.select_related("product").filter(cart=cart).order_by("id"))
-        for it in items:
-            subtotal += float(it.unit_price) * it.qty
+    cart = readmodel.open_cart(request.user)
+    items = cart["items"] if cart else []
+    subtotal = cart["subtotal"] if cart else readmodel.ZERO
     return render(request, "cart/cart.html", {"cart": cart, "items": items, "subtotal": subtotal})
 
 @login_required
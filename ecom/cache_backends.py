@@ -0,0 +1,111 @@
+# ecom/cache_backends.py
+"""
+TieredCache: a per-process cache (locmem) in front of a shared one (Redis).
+
+For a few ultra-hot keys read on most requests (e.g. the catalog version),
+where a network round trip per read is the main cost:
+
+    CACHES["hot"] = {
+        "BACKEND": "ecom.cache_backends.TieredCache",
+        "OPTIONS": {"LOCAL": "local", "REMOTE": "default", "LOCAL_TIMEOUT": 2},
+    }
+
+Reads hit the local tier first; a miss reads the remote tier and keeps the
+value locally for at most LOCAL_TIMEOUT seconds. Writes go to the remote
+tier and drop/refresh the local copy of this process, so other processes
+may serve the previous value for up to LOCAL_TIMEOUT seconds. Counters
+(incr/decr) always run on the remote tier. None values are not kept locally.
+
+Key prefixes/versions are applied by the two tiers, not by this backend.
+"""
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+
+class TieredCache(BaseCache):
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get("OPTIONS", {})
+        self._local_alias = options.get("LOCAL", "local")
+        self._remote_alias = options.get("REMOTE", "default")
+        self.local_timeout = options.get("LOCAL_TIMEOUT", 2)
+
+    @property
+    def local(self):
+        return caches[self._local_alias]
+
+    @property
+    def remote(self):
+        return caches[self._remote_alias]
+
+    def _local_ttl(self, timeout):
+        if timeout is DEFAULT_TIMEOUT or timeout is None:
+            return self.local_timeout
+        return min(timeout, self.local_timeout)
+
+    def get(self, key, default=None, version=None):
+        value = self.local.get(key, version=version)
+        if value is not None:
+            return value
+        value = self.remote.get(key, version=version)
+        if value is None:
+            return default
+        self.local.set(key, value, self.local_timeout, version=version)
+        return value
+
+    def get_many(self, keys, version=None):
+        found = self.local.get_many(keys, version=version)
+        missing = [key for key in keys if key not in found]
+        if missing:
+            fetched = self.remote.get_many(missing, version=version)
+            if fetched:
+                self.local.set_many(fetched, self.local_timeout, version=version)
+            found.update(fetched)
+        return found
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.remote.set(key, value, timeout, version=version)
+        if value is None:
+            self.local.delete(key, version=version)
+        else:
+            self.local.set(key, value, self._local_ttl(timeout), version=version)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        failed = self.remote.set_many(data, timeout, version=version)
+        self.local.delete_many(data, version=version)
+        return failed
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        added = self.remote.add(key, value, timeout, version=version)
+        self.local.delete(key, version=version)
+        return added
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.remote.touch(key, timeout, version=version)
+
+    def delete(self, key, version=None):
+        self.local.delete(key, version=version)
+        return self.remote.delete(key, version=version)
+
+    def delete_many(self, keys, version=None):
+        self.local.delete_many(keys, version=version)
+        self.remote.delete_many(keys, version=version)
+
+    def has_key(self, key, version=None):
+        return self.local.has_key(key, version=version) or self.remote.has_key(key, version=version)
+
+    def incr(self, key, delta=1, version=None):
+        try:
+            return self.remote.incr(key, delta, version=version)
+        finally:
+            self.local.delete(key, version=version)
+
+    def decr(self, key, delta=1, version=None):
+        return self.incr(key, -delta, version=version)
+
+    def clear(self):
+        """Clears this process's local tier only; the remote tier is shared with other aliases."""
+        self.local.clear()
+
+    def close(self, **kwargs):
+        pass
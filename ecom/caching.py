@@ -0,0 +1,111 @@
+# ecom/caching.py
+"""
+Stampede-safe cache reads.
+
+get_or_compute(key, compute, timeout) returns the cached value or stores
+compute()'s. Entries are stored as (value, compute seconds, logical expiry,
+timeout) and kept STALE_FACTOR times longer than `timeout`, so that:
+- XFetch (probabilistic early expiration): each read recomputes early with a
+  probability that rises towards the expiry and with the cost of compute(),
+  so one reader usually refreshes the entry before it expires.
+- A short lock (cache.add, i.e. SET NX EX on Redis) lets only one process
+  recompute a key; the others serve the stale value meanwhile or, when there
+  is none yet, wait up to `wait` seconds for the winner's value.
+- Only an explicit False from cache.add means another process holds the
+  lock. When the cache is down (django_redis with IGNORE_EXCEPTIONS returns
+  None, other backends raise) nobody can win it, so every caller computes
+  at once: requests fall through to the database instead of waiting.
+"""
+import logging
+import math
+import random
+import time
+
+from django.core.cache import cache as default_cache
+
+from .metrics import observe_cache
+
+log = logging.getLogger("ecom.caching")
+
+STALE_FACTOR = 2
+LOCK_TIMEOUT = 10
+WAIT = 2.0
+POLL_INTERVAL = 0.02
+
+
+def _lock_key(key):
+    return f"{key}:lock"
+
+
+def _metric_name(key):
+    # "catalog:page:<version>:24:1" -> "catalog:page", keeping the label set small
+    return ":".join(key.split(":", 2)[:2])
+
+
+def set_computed(key, value, timeout, delta=0.0, cache=None):
+    """Store a value computed elsewhere in get_or_compute's format."""
+    cache = cache or default_cache
+    cache.set(key, (value, delta, time.time() + timeout, timeout), timeout * STALE_FACTOR)
+
+
+def update_computed(key, update, cache=None):
+    """
+    Replace a stored value with update(value), keeping its logical expiry and
+    the full stale window after it. Returns False (and drops the entry) when
+    the key is missing or expired; the next get_or_compute() then recomputes it.
+    """
+    cache = cache or default_cache
+    entry = cache.get(key)
+    remaining = entry[2] - time.time() if entry is not None else 0
+    if remaining <= 0:
+        cache.delete(key)
+        return False
+    value, delta, expires = entry[:3]
+    timeout = entry[3] if len(entry) > 3 else remaining  # stored before entries carried their timeout
+    cache.set(key, (update(value), delta, expires, timeout), remaining + timeout * (STALE_FACTOR - 1))
+    return True
+
+
+def _compute_and_store(cache, key, compute, timeout):
+    start = time.monotonic()
+    value = compute()
+    set_computed(key, value, timeout, time.monotonic() - start, cache)
+    return value
+
+
+def get_or_compute(key, compute, timeout, cache=None, beta=1.0, lock_timeout=LOCK_TIMEOUT, wait=WAIT):
+    cache = cache or default_cache
+    name = _metric_name(key)
+    entry = cache.get(key)
+    if entry is not None:
+        value, delta, expires = entry[:3]
+        # XFetch: log() of (0, 1] is <= 0, so this moves "now" forward by a random amount
+        if time.time() - delta * beta * math.log(1.0 - random.random()) < expires:
+            observe_cache(name, "hit")
+            return value
+
+    try:
+        locked = cache.add(_lock_key(key), 1, lock_timeout)
+    except Exception as e:
+        log.warning("Cache unavailable for %s, computing without it: %r", key, e)
+        locked = None
+    if locked is False and entry is not None:
+        observe_cache(name, "stale")
+        return entry[0]  # being refreshed elsewhere
+    observe_cache(name, "miss")
+    if locked is None:
+        return compute()  # cache down
+    if locked:
+        try:
+            return _compute_and_store(cache, key, compute, timeout)
+        finally:
+            cache.delete(_lock_key(key))
+
+    deadline = time.monotonic() + wait
+    while time.monotonic() < deadline:
+        time.sleep(POLL_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry[0]
+    log.warning("Gave up waiting for %s to be computed elsewhere", key)
+    return _compute_and_store(cache, key, compute, timeout)
@@ -0,0 +1,310 @@
+# ecom/fastserializers.py
+"""
+Fast read-only serialization for hot list endpoints.
+
+FastSerializer compiles a DRF ModelSerializer once into a plan of
+(key, values_list lookup, mapper) and then builds plain dicts straight from
+`values_list()` rows, skipping per-object model instantiation and per-field
+serializer dispatch. Output is identical to the DRF serializer:
+- field order, nested FK serializers and reverse `many=True` serializers
+  (one extra IN query per relation, like prefetch_related)
+- Decimal -> quantized string, datetime -> ISO 8601 with "Z", UUID -> str
+Field types without a fast mapper fall back to the DRF field's own
+to_representation; SerializerMethodField and source="*" are rejected.
+
+FastListMixin swaps the fast path (and streaming of long lists) into
+ConditionalGetMixin's list response.
+"""
+import decimal
+from collections import defaultdict
+from functools import lru_cache
+from itertools import chain, islice
+from operator import itemgetter
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from .renderers import ORJSONRenderer, stream_json_array
+
+# Reverse relations are fetched with chunked IN (...) lists
+IN_BATCH = 2000
+
+_PASSTHROUGH = (
+    serializers.CharField,  # also Slug/URL/Email/Regex: str(str) is a no-op
+    serializers.IntegerField,
+    serializers.BooleanField,
+    serializers.ReadOnlyField,
+)
+
+
+def _decimal_mapper(field):
+    coerce = getattr(field, "coerce_to_string", api_settings.COERCE_DECIMAL_TO_STRING)
+    if field.decimal_places is None or field.normalize_output or field.localize or not coerce:
+        return None
+    quantum = decimal.Decimal(".1") ** field.decimal_places
+    context = decimal.getcontext().copy()
+    if field.max_digits is not None:
+        context.prec = field.max_digits
+    rounding = field.rounding
+
+    def to_str(value):
+        return f"{value.quantize(quantum, rounding=rounding, context=context):f}"
+    return to_str
+
+
+def _datetime_mapper(field, tz):
+    output_format = getattr(field, "format", api_settings.DATETIME_FORMAT)
+    if output_format is None or output_format.lower() != ISO_8601:
+        return None
+    field_tz = field.timezone if hasattr(field, "timezone") else tz
+    if field_tz is None:
+        return None
+    slow = field.to_representation
+
+    def to_iso(value):
+        if value.tzinfo is None:
+            return slow(value)
+        text = value.astimezone(field_tz).isoformat()
+        return text[:-6] + "Z" if text.endswith("+00:00") else text
+    return to_iso
+
+
+class _Plan:
+    """Compiled form of one (possibly nested) serializer."""
+
+    def __init__(self, serializer, model, prefix, lookups, fields=None):
+        self.entries = []  # (key, kind, index or nested plan, drf field)
+        self.model = model
+        opts = model._meta
+
+        for name, field in serializer.fields.items():
+            if field.write_only or (fields is not None and name not in fields):
+                continue
+            if isinstance(field, serializers.SerializerMethodField) or field.source == "*":
+                raise ImproperlyConfigured(f"{type(serializer).__name__}.{name} has no fast path")
+            path = "__".join(field.source_attrs)
+
+            if isinstance(field, serializers.ListSerializer):
+                rel = opts.get_field(path)
+                if not (rel.one_to_many and rel.auto_created):
+                    raise ImproperlyConfigured(f"{type(serializer).__name__}.{name}: only reverse FKs are supported")
+                self.entries.append((name, "many", _ManyPlan(field.child, rel), field))
+            elif isinstance(field, serializers.BaseSerializer):
+                related = opts.get_field(path).related_model
+                nested = _Plan(field, related, f"{prefix}{path}__", lookups)
+                self.entries.append((name, "one", nested, field))
+            else:
+                lookups.append(prefix + path)
+                self.entries.append((name, "value", len(lookups) - 1, field))
+
+        # pk: NULL check for nested FKs, join key for reverse relations
+        lookups.append(prefix + "pk")
+        self.pk_index = len(lookups) - 1
+
+    def bind(self, tz, row_sets):
+        """Per-call list of (key, fn(row)) with mappers resolved for the active timezone."""
+        bound = []
+        for key, kind, target, field in self.entries:
+            if kind == "value":
+                bound.append((key, _value_getter(target, field, tz)))
+            elif kind == "one":
+                bound.append((key, _one_getter(target.bind(tz, row_sets), target.pk_index)))
+            else:
+                bound.append((key, _many_getter(row_sets[id(target)], self.pk_index)))
+        return bound
+
+    def many_plans(self):
+        for _, kind, target, _ in self.entries:
+            if kind == "many":
+                yield target
+            elif kind == "one":
+                yield from target.many_plans()
+
+
+class _ManyPlan:
+    """Reverse FK (e.g. Order.items): child rows grouped by parent pk."""
+
+    def __init__(self, child, rel):
+        self.lookups = []
+        self.fk_name = rel.field.name
+        self.plan = _Plan(child, rel.related_model, "", self.lookups)
+        if any(True for _ in self.plan.many_plans()):
+            raise ImproperlyConfigured(f"{type(child).__name__}: nested reverse relations are not supported")
+        self.lookups.append(rel.field.attname)
+        self.fk_index = len(self.lookups) - 1
+
+    def fetch(self, parent_ids, tz):
+        manager = self.plan.model._default_manager
+        bound = self.plan.bind(tz, {})
+        fk = itemgetter(self.fk_index)
+        grouped = defaultdict(list)
+        for start in range(0, len(parent_ids), IN_BATCH):
+            rows = (
+                manager.filter(**{f"{self.fk_name}__in": parent_ids[start:start + IN_BATCH]})
+                .order_by("pk")
+                .values_list(*self.lookups)
+            )
+            for row in rows:
+                grouped[fk(row)].append({key: fn(row) for key, fn in bound})
+        return grouped
+
+
+def _value_getter(index, field, tz):
+    if isinstance(field, serializers.DecimalField):
+        mapper = _decimal_mapper(field)
+    elif isinstance(field, serializers.DateTimeField):
+        mapper = _datetime_mapper(field, tz)
+    elif isinstance(field, serializers.UUIDField):
+        mapper = str if field.uuid_format == "hex_verbose" else None
+    elif isinstance(field, serializers.ChoiceField):
+        # identity as long as every choice value is its own string form
+        mapper = False if all(k == v for k, v in field.choice_strings_to_values.items()) else None
+    elif isinstance(field, _PASSTHROUGH):
+        mapper = False
+    else:
+        mapper = None
+    if mapper is False:
+        return itemgetter(index)
+    if mapper is None:
+        mapper = field.to_representation
+
+    def get(row):
+        value = row[index]
+        return None if value is None else mapper(value)
+    return get
+
+
+def _one_getter(bound, pk_index):
+    def get(row):
+        if row[pk_index] is None:
+            return None
+        return {key: fn(row) for key, fn in bound}
+    return get
+
+
+def _many_getter(grouped, pk_index):
+    def get(row):
+        return grouped.get(row[pk_index], [])
+    return get
+
+
+class FastSerializer:
+    """
+    Compiled, read-only equivalent of `serializer_class` for querysets.
+
+        FastSerializer(ProductSerializer).serialize(Product.objects.filter(...))
+    """
+
+    def __init__(self, serializer_class, fields=None):
+        self.serializer_class = serializer_class
+        self.lookups = []
+        self.plan = _Plan(serializer_class(), serializer_class.Meta.model, "", self.lookups, fields)
+
+    def serialize(self, queryset):
+        tz = timezone.get_current_timezone() if settings.USE_TZ else None
+        return self._serialize_rows(list(queryset.prefetch_related(None).values_list(*self.lookups)), tz)
+
+    def iter_chunks(self, queryset, chunk_size=500):
+        """Yield lists of up to chunk_size dicts; rows are read with a server-side iterator."""
+        tz = timezone.get_current_timezone() if settings.USE_TZ else None
+        rows = queryset.prefetch_related(None).values_list(*self.lookups).iterator(chunk_size=chunk_size)
+        while True:
+            batch = list(islice(rows, chunk_size))
+            if not batch:
+                return
+            yield self._serialize_rows(batch, tz)
+
+    def _serialize_rows(self, rows, tz):
+        row_sets = {}
+        many = list(self.plan.many_plans())
+        if many:
+            pk = itemgetter(self.plan.pk_index)
+            parent_ids = [pk(row) for row in rows]
+            for target in many:
+                row_sets[id(target)] = target.fetch(parent_ids, tz) if parent_ids else {}
+        bound = self.plan.bind(tz, row_sets)
+        return [{key: fn(row) for key, fn in bound} for row in rows]
+
+
+@lru_cache(maxsize=64)
+def fast_serializer_for(serializer_class, fields=None):
+    """Cached FastSerializer; `fields` must be hashable (tuple) or None."""
+    return FastSerializer(serializer_class, fields)
+
+
+class FastListMixin:
+    """
+    Serve list responses through FastSerializer (place before
+    ConditionalGetMixin). FAST_SERIALIZERS_ENABLED=False serializes with the
+    DRF serializers instead; paginated lists keep the regular DRF path
+    (LimitOffsetPagination without default_limit: only when ?limit= is given).
+
+    Lists longer than JSON_STREAM_THRESHOLD rendered as compact JSON by
+    ORJSONRenderer are streamed in JSON_STREAM_CHUNK_SIZE chunks instead of
+    being built in memory.
+
+    get_list_sources() may return several (queryset, serializer class) pairs
+    whose rows are emitted one after another (e.g. live + archived orders).
+    """
+
+    def get_list_sources(self, queryset):
+        return [(queryset, self.get_serializer_class())]
+
+    def get_fast_serializer(self, serializer_class=None):
+        return fast_serializer_for(serializer_class or self.get_serializer_class())
+
+    def get_serializer(self, *args, serializer_class=None, **kwargs):
+        if serializer_class is None:
+            return super().get_serializer(*args, **kwargs)
+        kwargs.setdefault("context", self.get_serializer_context())
+        return serializer_class(*args, **kwargs)
+
+    def _list_response(self, request, queryset, count=None):
+        if self._is_paginated(request):
+            return super()._list_response(request, queryset, count)
+        fast = getattr(settings, "FAST_SERIALIZERS_ENABLED", True)
+        sources = self.get_list_sources(queryset)
+        if count is not None and self._should_stream(request, count):
+            chunks = chain.from_iterable(self._iter_chunks(qs, cls, fast) for qs, cls in sources)
+            return StreamingHttpResponse(stream_json_array(chunks), content_type=request.accepted_renderer.media_type)
+        data = []
+        for qs, cls in sources:
+            if fast:
+                data.extend(self.get_fast_serializer(cls).serialize(qs))
+            else:
+                data.extend(self.get_serializer(qs, many=True, serializer_class=cls).data)
+        return Response(data)
+
+    def _is_paginated(self, request):
+        paginator = self.paginator
+        if isinstance(paginator, LimitOffsetPagination):
+            # without default_limit, only requests with ?limit= are paginated
+            return paginator.get_limit(request) is not None
+        return paginator is not None
+
+    def _should_stream(self, request, count):
+        threshold = getattr(settings, "JSON_STREAM_THRESHOLD", None)
+        renderer = getattr(request, "accepted_renderer", None)
+        return (
+            threshold is not None and count > threshold
+            and isinstance(renderer, ORJSONRenderer)
+            and not renderer.get_indent(request.accepted_media_type, {})
+        )
+
+    def _iter_chunks(self, queryset, serializer_class, fast):
+        chunk_size = getattr(settings, "JSON_STREAM_CHUNK_SIZE", 500)
+        if fast:
+            yield from self.get_fast_serializer(serializer_class).iter_chunks(queryset, chunk_size)
+            return
+        objects = queryset.iterator(chunk_size=chunk_size)
+        while True:
+            batch = list(islice(objects, chunk_size))
+            if not batch:
+                return
+            yield self.get_serializer(batch, many=True, serializer_class=serializer_class).data
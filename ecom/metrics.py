@@ -0,0 +1,189 @@
+# ecom/metrics.py
+"""
+Request-level performance instrumentation (Prometheus).
+
+- MetricsMiddleware records, per resolved URL name (e.g. "product-list"):
+  latency, DB query count/time (via connection.execute_wrapper),
+  cache hits/misses (observe_cache) and response size.
+- metrics_view exports everything at /api/metrics in Prometheus text format.
+- When PROMETHEUS_MULTIPROC_DIR is set (see entrypoint.sh / gunicorn.conf.py),
+  samples from all gunicorn workers are aggregated from that directory.
+"""
+import os
+import time
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+UNRESOLVED = "<unresolved>"
+
+REQUEST_LATENCY = Histogram(
+    "ecom_http_request_duration_seconds",
+    "Request latency by URL name",
+    ["view", "method", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+REQUEST_DB_QUERIES = Histogram(
+    "ecom_http_request_db_queries",
+    "DB queries executed per request",
+    ["view"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100, 250),
+)
+DB_QUERY_SECONDS = Counter(
+    "ecom_db_query_seconds",
+    "Time spent in DB queries",
+    ["view"],
+)
+CACHE_REQUESTS = Counter(
+    "ecom_cache_requests",
+    "Cache lookups by result",
+    ["view", "cache", "result"],
+)
+RESPONSE_SIZE = Histogram(
+    "ecom_http_response_size_bytes",
+    "Response body size (non-streaming responses)",
+    ["view"],
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304),
+)
+
+
+class RequestStats:
+    """Per-request counters, reachable from anywhere via current_stats()."""
+    __slots__ = ("request", "queries", "db_seconds")
+
+    def __init__(self, request):
+        self.request = request
+        self.queries = 0
+        self.db_seconds = 0.0
+
+    @property
+    def view(self):
+        # resolver_match is set once URL routing ran (before any view code)
+        return _view_name(self.request)
+
+
+_current = ContextVar("ecom_request_stats", default=None)
+
+
+def current_stats():
+    """Stats of the request being processed on this thread/task (or None)."""
+    return _current.get()
+
+
+def observe_cache(cache_name: str, result: str):
+    """
+    Record a cache lookup ("hit", "miss", or "stale": an expired value served
+    while another process refreshes it). Called by the code that reads a cache
+    (ecom.caching, catalog.cache) so that hit ratios show up per endpoint.
+    """
+    stats = _current.get()
+    view = stats.view if stats else UNRESOLVED
+    CACHE_REQUESTS.labels(view=view, cache=cache_name, result=result).inc()
+
+
+def _db_timer(stats):
+    def wrapper(execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            stats.queries += 1
+            stats.db_seconds += time.perf_counter() - start
+    return wrapper
+
+
+def _view_name(request):
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return UNRESOLVED
+    return match.view_name or match.route or UNRESOLVED
+
+
+class MetricsMiddleware:
+    """
+    Should be first in MIDDLEWARE so the timing covers the whole stack.
+    Disabled (pass-through) when settings.METRICS_ENABLED is False.
+    Under ASGI (async views) DB work runs on other threads, so only latency and
+    response size are recorded there.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, "METRICS_ENABLED", True)
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not self.enabled:
+            return self.get_response(request)
+
+        stats = RequestStats(request)
+        token = _current.set(stats)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                timer = _db_timer(stats)
+                for conn in connections.all():
+                    stack.enter_context(conn.execute_wrapper(timer))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+
+        self._record(request, response, time.perf_counter() - start, stats)
+        view = stats.view
+        REQUEST_DB_QUERIES.labels(view=view).observe(stats.queries)
+        DB_QUERY_SECONDS.labels(view=view).inc(stats.db_seconds)
+        return response
+
+    async def __acall__(self, request):
+        if not self.enabled:
+            return await self.get_response(request)
+        stats = RequestStats(request)
+        token = _current.set(stats)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        self._record(request, response, time.perf_counter() - start, stats)
+        return response
+
+    def _record(self, request, response, elapsed, stats):
+        view = stats.view
+        REQUEST_LATENCY.labels(view=view, method=request.method, status=str(response.status_code)).observe(elapsed)
+        if not response.streaming:
+            RESPONSE_SIZE.labels(view=view).observe(len(response.content))
+
+
+def _registry():
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def metrics_view(_request):
+    """
+    GET /api/metrics -> Prometheus text exposition.
+    Not exposed publicly by nginx; scrape web:8000 from inside the network.
+    """
+    return HttpResponse(generate_latest(_registry()), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,159 @@
+# ecom/query_inspector.py
+"""
+Slow-query and N+1 detector built on connection.execute_wrapper.
+
+- Every statement is fingerprinted (literals and IN-lists normalized away).
+- A fingerprint executed >= QUERY_INSPECTOR_REPEAT_THRESHOLD times in one
+  request is reported as a probable N+1; statements slower than
+  QUERY_INSPECTOR_SLOW_MS are reported as slow.
+- Dev: every request is inspected and a Server-Timing summary is attached.
+- Prod: only QUERY_INSPECTOR_SAMPLE_RATE of requests are inspected; offending
+  call sites are logged with their (project-only) stack traces.
+"""
+import hashlib
+import logging
+import random
+import re
+import time
+import traceback
+from collections import Counter
+from contextlib import ExitStack
+from functools import lru_cache
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+
+log = logging.getLogger("ecom.queries")
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST_RE = re.compile(r"\(\s*(?:\?|%s)(?:\s*,\s*(?:\?|%s))*\s*\)")
+_SPACE_RE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def normalize_sql(sql: str) -> str:
+    """Strip literals so that statements differing only by parameters compare equal."""
+    sql = _STRING_RE.sub("?", sql)
+    sql = _NUMBER_RE.sub("?", sql)
+    sql = _IN_LIST_RE.sub("(...)", sql)
+    return _SPACE_RE.sub(" ", sql).strip()
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(sql: str) -> str:
+    return hashlib.sha1(normalize_sql(sql).encode("utf-8")).hexdigest()[:12]
+
+
+def _call_site(depth):
+    """Innermost project frames (skips stdlib, site-packages and this module)."""
+    base = str(settings.BASE_DIR)
+    frames = [
+        f for f in traceback.extract_stack()[:-2]
+        if f.filename.startswith(base) and "site-packages" not in f.filename
+        and f.filename != __file__
+    ]
+    return "".join(traceback.format_list(frames[-depth:]))
+
+
+class Inspection:
+    """Statements seen during one request."""
+
+    def __init__(self, repeat_threshold, slow_ms, capture_stacks=True, stack_depth=8):
+        self.repeat_threshold = repeat_threshold
+        self.slow_ms = slow_ms
+        self.capture_stacks = capture_stacks
+        self.stack_depth = stack_depth
+        self.counts = Counter()
+        self.statements = {}   # fingerprint -> normalized sql
+        self.repeat_sites = {}  # fingerprint -> stack at the threshold-crossing call
+        self.slow = []          # (ms, normalized sql, stack)
+        self.total = 0
+        self.db_ms = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            ms = (time.perf_counter() - start) * 1000
+            fp = fingerprint(sql)
+            self.total += 1
+            self.db_ms += ms
+            self.counts[fp] += 1
+            if fp not in self.statements:
+                self.statements[fp] = normalize_sql(sql)
+            if self.counts[fp] == self.repeat_threshold and self.capture_stacks:
+                self.repeat_sites[fp] = _call_site(self.stack_depth)
+            if ms >= self.slow_ms:
+                stack = _call_site(self.stack_depth) if self.capture_stacks else ""
+                self.slow.append((ms, self.statements[fp], stack))
+
+    @property
+    def repeated(self):
+        return [(fp, n) for fp, n in self.counts.most_common() if n >= self.repeat_threshold]
+
+    @property
+    def has_issues(self):
+        return bool(self.slow or self.repeated)
+
+    def server_timing(self):
+        parts = [f'db;dur={self.db_ms:.1f};desc="{self.total} queries"']
+        repeated = self.repeated
+        if repeated:
+            worst = max(n for _, n in repeated)
+            parts.append(f'nplus1;desc="{len(repeated)} repeated fingerprints (max x{worst})"')
+        if self.slow:
+            parts.append(f'slowq;dur={max(ms for ms, _, _ in self.slow):.1f};desc="{len(self.slow)} slow"')
+        return ", ".join(parts)
+
+    def report(self, request):
+        for fp, n in self.repeated:
+            log.warning(
+                "Repeated query x%s fp=%s %s %s\n  sql=%s\n%s",
+                n, fp, request.method, request.path, self.statements[fp], self.repeat_sites.get(fp, ""),
+            )
+        for ms, sql, stack in self.slow:
+            log.warning(
+                "Slow query %.1fms %s %s\n  sql=%s\n%s",
+                ms, request.method, request.path, sql, stack,
+            )
+
+
+class QueryInspectorMiddleware:
+    """
+    Sampled per request; a request that is not sampled costs one random() call.
+    Async requests pass straight through: their queries run on worker threads
+    that the per-request wrapper cannot see.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        self.sample_rate = getattr(settings, "QUERY_INSPECTOR_SAMPLE_RATE", 0.0)
+        self.repeat_threshold = getattr(settings, "QUERY_INSPECTOR_REPEAT_THRESHOLD", 5)
+        self.slow_ms = getattr(settings, "QUERY_INSPECTOR_SLOW_MS", 100)
+        self.server_timing = getattr(settings, "QUERY_INSPECTOR_SERVER_TIMING", False)
+        self.stack_depth = getattr(settings, "QUERY_INSPECTOR_STACK_DEPTH", 8)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.get_response(request)
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        inspection = Inspection(self.repeat_threshold, self.slow_ms, stack_depth=self.stack_depth)
+        with ExitStack() as stack:
+            for conn in connections.all():
+                stack.enter_context(conn.execute_wrapper(inspection))
+            response = self.get_response(request)
+
+        if inspection.has_issues:
+            inspection.report(request)
+        if self.server_timing:
+            response["Server-Timing"] = inspection.server_timing()
+        return response
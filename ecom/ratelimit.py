@@ -0,0 +1,299 @@
+# ecom/ratelimit.py
+"""
+Request rate limiting with sliding windows.
+
+Policies are declared on views:
+
+    class LoginView(TokenObtainPairView):
+        ratelimits = (RateLimit("5/m", key="ip", methods=("POST",)),)
+
+    @ratelimit("30/m", key="user_or_ip")
+    def product_list(request): ...
+
+- rate: "<count>/<period>", period s|m|h|d optionally prefixed with a number
+  ("100/h", "10/30s").
+- key: "ip", "user" (authenticated requests only) or "user_or_ip". Users
+  are identified from the JWT bearer token's claims (signature and expiry
+  checked, no DB lookup) or an already loaded session user.
+- scope: counter namespace; defaults to the URL name, so limits are per
+  route. Views sharing a scope share the counters.
+- methods / when(request): restrict which requests count.
+
+RateLimitMiddleware checks the policies in process_view, i.e. before the
+view (and its authentication, queries...) runs, and answers 429 with
+Retry-After when any of them is exceeded.
+
+Counters live in Redis (RATELIMIT_REDIS_URL, the REDIS_DB_RATELIMIT DB in
+prod): every request is one EVALSHA of SLIDING_WINDOW_LUA, which checks and
+increments all of the request's policies atomically. When Redis is not
+configured or fails, an in-process limiter with the same algorithm takes
+over (limits are then per worker) and Redis is retried after
+RATELIMIT_REDIS_RETRY seconds.
+
+Sliding window counter: count = previous window * (unelapsed fraction of
+the current window) + current window.
+"""
+import logging
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.http import JsonResponse
+from prometheus_client import Counter
+
+log = logging.getLogger("ecom.ratelimit")
+
+KEY_PREFIX = "rl"
+_PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+_RATE_RE = re.compile(r"^(\d+)/(\d*)([smhd])$")
+
+RATELIMIT_REJECTIONS = Counter("ecom_ratelimit_rejections", "Requests rejected by rate limits", ["route"])
+RATELIMIT_BACKEND_ERRORS = Counter("ecom_ratelimit_backend_errors", "Redis rate limiter failures (fell back to local)")
+
+# KEYS: current/previous window counter per policy (2 per policy)
+# ARGV: now_ms, then limit and window_ms per policy
+# Returns {1, 0} (allowed, counted) or {0, retry_after_ms}
+SLIDING_WINDOW_LUA = """
+local now = tonumber(ARGV[1])
+local retry = 0
+for i = 1, #KEYS / 2 do
+  local limit = tonumber(ARGV[i * 2])
+  local window = tonumber(ARGV[i * 2 + 1])
+  local cur = tonumber(redis.call('GET', KEYS[i * 2 - 1]) or '0')
+  local prev = tonumber(redis.call('GET', KEYS[i * 2]) or '0')
+  local elapsed = now % window
+  if prev * (window - elapsed) / window + cur + 1 > limit then
+    local wait = window - elapsed
+    if cur + 1 <= limit and prev > 0 then
+      wait = math.ceil(window * (1 - (limit - cur - 1) / prev)) - elapsed
+    end
+    if wait > retry then retry = wait end
+  end
+end
+if retry > 0 then return {0, retry} end
+for i = 1, #KEYS / 2 do
+  local window = tonumber(ARGV[i * 2 + 1])
+  redis.call('INCR', KEYS[i * 2 - 1])
+  redis.call('PEXPIRE', KEYS[i * 2 - 1], window * 2)
+end
+return {1, 0}
+"""
+
+
+def parse_rate(rate):
+    """"10/m" -> (10, 60000) (limit, window in ms)."""
+    match = _RATE_RE.match(rate.replace(" ", ""))
+    if not match:
+        raise ValueError(f"Invalid rate {rate!r}; expected e.g. '10/m', '100/h' or '5/30s'")
+    count, multiplier, unit = match.groups()
+    return int(count), int(multiplier or 1) * _PERIODS[unit] * 1000
+
+
+class RateLimit:
+    KEYS = ("ip", "user", "user_or_ip")
+
+    def __init__(self, rate, key="user_or_ip", scope=None, methods=None, when=None):
+        if key not in self.KEYS:
+            raise ValueError(f"Unknown rate limit key {key!r}")
+        self.rate = rate
+        self.limit, self.window_ms = parse_rate(rate)
+        self.key = key
+        self.scope = scope
+        self.methods = {m.upper() for m in methods} if methods else None
+        self.when = when
+
+    def __repr__(self):
+        return f"RateLimit({self.rate!r}, key={self.key!r}, scope={self.scope!r})"
+
+    def applies(self, request):
+        if self.methods is not None and request.method not in self.methods:
+            return False
+        return self.when is None or bool(self.when(request))
+
+    def identity(self, request):
+        """Counter identity for this request, or None when the policy does not apply (e.g. anonymous for "user")."""
+        if self.key != "ip":
+            user_id = request_user_id(request)
+            if user_id is not None:
+                return f"u:{user_id}"
+            if self.key == "user":
+                return None
+        return f"ip:{client_ip(request)}"
+
+
+def ratelimit(rate, **kwargs):
+    """Decorator declaring a policy on a function view (stackable)."""
+    def decorator(view):
+        view.ratelimits = (*getattr(view, "ratelimits", ()), RateLimit(rate, **kwargs))
+        return view
+    return decorator
+
+
+def client_ip(request):
+    header = getattr(settings, "RATELIMIT_IP_HEADER", None)
+    if header:
+        value = request.META.get(header, "")
+        if value:
+            # X-Forwarded-For style lists: the proxy appends the real peer last
+            return value.split(",")[-1].strip()
+    return request.META.get("REMOTE_ADDR", "")
+
+
+def request_user_id(request):
+    auth = request.META.get("HTTP_AUTHORIZATION", "")
+    if auth.startswith("Bearer "):
+        from rest_framework_simplejwt.exceptions import TokenError
+        from rest_framework_simplejwt.settings import api_settings
+        from rest_framework_simplejwt.tokens import AccessToken
+        try:
+            return AccessToken(auth[7:].strip())[api_settings.USER_ID_CLAIM]
+        except (TokenError, KeyError):
+            return None
+    # Only if already loaded: resolving a session user costs queries
+    user = getattr(request, "_cached_user", None)
+    if user is not None and user.is_authenticated:
+        return user.pk
+    return None
+
+
+class LocalLimiter:
+    """In-process sliding windows (same algorithm as the Lua script)."""
+
+    def __init__(self, max_keys=100_000):
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._counts = OrderedDict()  # (key, window index) -> count
+
+    def hit(self, checks, now_ms):
+        """checks: [(key, limit, window_ms)]. Returns 0 (allowed) or retry-after in ms."""
+        with self._lock:
+            retry = 0
+            for key, limit, window in checks:
+                index, elapsed = divmod(now_ms, window)
+                cur = self._counts.get((key, index), 0)
+                prev = self._counts.get((key, index - 1), 0)
+                if prev * (window - elapsed) / window + cur + 1 > limit:
+                    wait = window - elapsed
+                    if cur + 1 <= limit and prev > 0:
+                        wait = math.ceil(window * (1 - (limit - cur - 1) / prev)) - elapsed
+                    retry = max(retry, wait)
+            if retry:
+                return retry
+            for key, limit, window in checks:
+                slot = (key, now_ms // window)
+                self._counts[slot] = self._counts.get(slot, 0) + 1
+                self._counts.move_to_end(slot)
+            while len(self._counts) > self.max_keys:
+                self._counts.popitem(last=False)
+            return 0
+
+
+class RedisLimiter:
+    def __init__(self, url):
+        import redis
+        timeout = getattr(settings, "RATELIMIT_REDIS_TIMEOUT", 0.05)
+        self._redis = redis.Redis.from_url(url, socket_connect_timeout=timeout, socket_timeout=timeout)
+        self._script = self._redis.register_script(SLIDING_WINDOW_LUA)
+
+    def hit(self, checks, now_ms):
+        keys, args = [], [now_ms]
+        for key, limit, window in checks:
+            index = now_ms // window
+            keys += [f"{KEY_PREFIX}:{key}:{window}:{index}", f"{KEY_PREFIX}:{key}:{window}:{index - 1}"]
+            args += [limit, window]
+        allowed, retry = self._script(keys=keys, args=args)
+        return 0 if allowed else int(retry)
+
+
+class Limiter:
+    """Redis when configured and reachable, else the local fallback."""
+
+    def __init__(self, url=None):
+        self.local = LocalLimiter()
+        self.redis = RedisLimiter(url) if url else None
+        self._redis_down_until = 0.0
+
+    def hit(self, checks):
+        now_ms = int(time.time() * 1000)
+        if self.redis is not None and time.monotonic() >= self._redis_down_until:
+            try:
+                return self.redis.hit(checks, now_ms)
+            except Exception as e:
+                RATELIMIT_BACKEND_ERRORS.inc()
+                retry_in = getattr(settings, "RATELIMIT_REDIS_RETRY", 5)
+                log.warning("Rate limiter Redis error, local limits for %ss: %s", retry_in, e)
+                self._redis_down_until = time.monotonic() + retry_in
+        return self.local.hit(checks, now_ms)
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_limiter():
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = Limiter(getattr(settings, "RATELIMIT_REDIS_URL", None))
+    return _limiter
+
+
+def reset_limiter():
+    """Drop the process limiter (tests, settings changes)."""
+    global _limiter
+    _limiter = None
+
+
+def view_policies(view_func):
+    policies = getattr(view_func, "ratelimits", None)
+    if policies is None:
+        # DRF: as_view() keeps the class on .cls
+        policies = getattr(getattr(view_func, "cls", None), "ratelimits", None)
+    return policies or ()
+
+
+class RateLimitMiddleware:
+    """Enforces view rate limit policies (see module docstring). RATELIMIT_ENABLED=False disables it."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not getattr(settings, "RATELIMIT_ENABLED", True):
+            return None
+        policies = view_policies(view_func)
+        if not policies:
+            return None
+        route = request.resolver_match.view_name if request.resolver_match else request.path
+        checks = []
+        scopes = []
+        for policy in policies:
+            if not policy.applies(request):
+                continue
+            identity = policy.identity(request)
+            if identity is None:
+                continue
+            scope = policy.scope or route
+            checks.append((f"{scope}:{identity}", policy.limit, policy.window_ms))
+            scopes.append(scope)
+        if not checks:
+            return None
+
+        retry_ms = get_limiter().hit(checks)
+        if not retry_ms:
+            return None
+        retry_after = max(1, math.ceil(retry_ms / 1000))
+        RATELIMIT_REJECTIONS.labels(route=route).inc()
+        log.info("Rate limited %s %s scopes=%s retry_after=%ss", request.method, request.path, scopes, retry_after)
+        response = JsonResponse(
+            {"detail": f"Request was throttled. Expected available in {retry_after} seconds."}, status=429,
+        )
+        response["Retry-After"] = str(retry_after)
+        return response
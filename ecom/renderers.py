@@ -0,0 +1,54 @@
+# ecom/renderers.py
+"""
+orjson-based JSON rendering.
+
+- ORJSONRenderer: drop-in for DRF's JSONRenderer (set in REST_FRAMEWORK).
+  Everything orjson does not encode natively (datetime, Decimal, lazy strings,
+  querysets...) goes through DRF's JSONEncoder.default, so output matches the
+  stdlib path. Indented output (?format=api, "; indent=4") and non-default
+  UNICODE_JSON/COMPACT_JSON settings fall back to DRF's renderer.
+- stream_json_array: yields a JSON array chunk by chunk for
+  StreamingHttpResponse (see ecom.fastserializers.FastListMixin).
+"""
+import orjson
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_NON_STR_KEYS
+_default = JSONEncoder().default
+
+
+def dumps(data):
+    """orjson.dumps with DRF's encoding rules; returns bytes."""
+    ret = orjson.dumps(data, default=_default, option=_OPTIONS)
+    # Same as DRF: keep the output a strict JavaScript subset
+    if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+        ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+    return ret
+
+
+class ORJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        renderer_context = renderer_context or {}
+        if self.ensure_ascii or not self.compact or self.get_indent(accepted_media_type, renderer_context):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            return dumps(data)
+        except orjson.JSONEncodeError:
+            # e.g. integers beyond 64 bits; let the stdlib path decide
+            return super().render(data, accepted_media_type, renderer_context)
+
+
+def stream_json_array(chunks):
+    """Yield `[`, the items of each list in `chunks` (one bytes piece per list), `]`."""
+    yield b"["
+    first = True
+    for chunk in chunks:
+        if not chunk:
+            continue
+        body = dumps(chunk)[1:-1]
+        yield body if first else b"," + body
+        first = False
+    yield b"]"
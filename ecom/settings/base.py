@@ -5,6 +5,7 @@ Base settings shared by dev/prod.
 - DRF + SimpleJWT
 - Spectacular OpenAPI
 - Structured logging with LOG_LEVEL
+- Prometheus request metrics
 """
 from datetime import timedelta
 from pathlib import Path
@@ -48,12 +49,17 @@ INSTALLED_APPS = [
     "cart",
     "orders",
     "payments",
+    "analytics",
+    "jobs",
 ]
 
 MIDDLEWARE = [
+    "ecom.metrics.MetricsMiddleware",  # first, so timings cover the whole stack
+    "ecom.query_inspector.QueryInspectorMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
+    "ecom.ratelimit.RateLimitMiddleware",  # before CSRF/auth and the view: rejections cost no DB work
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
@@ -123,6 +129,10 @@ REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.IsAuthenticated",
     ),
+    "DEFAULT_RENDERER_CLASSES": (
+        "ecom.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_FILTER_BACKENDS": (
         "django_filters.rest_framework.DjangoFilterBackend",
@@ -165,11 +175,147 @@ LOGGING = {
     "root": {"handlers": ["console"], "level": LOG_LEVEL},
 }
 
+# -----------------------------------------------------------------------------
+# Metrics (Prometheus, exported at /api/metrics)
+# -----------------------------------------------------------------------------
+# Multi-worker aggregation is enabled by setting PROMETHEUS_MULTIPROC_DIR
+# in the environment (entrypoint.sh does this for gunicorn).
+METRICS_ENABLED = env.bool("METRICS_ENABLED", default=True)
+
+# Query inspector (N+1 / slow statements). Fraction of requests inspected;
+# 0 disables it. Dev inspects everything and adds a Server-Timing header.
+QUERY_INSPECTOR_SAMPLE_RATE = env.float("QUERY_INSPECTOR_SAMPLE_RATE", default=0.0)
+QUERY_INSPECTOR_REPEAT_THRESHOLD = env.int("QUERY_INSPECTOR_REPEAT_THRESHOLD", default=5)
+QUERY_INSPECTOR_SLOW_MS = env.int("QUERY_INSPECTOR_SLOW_MS", default=100)
+QUERY_INSPECTOR_SERVER_TIMING = False
+
+# List endpoints (products, categories, orders) serialize straight from
+# values_list() rows (ecom/fastserializers.py); False restores the DRF path.
+FAST_SERIALIZERS_ENABLED = env.bool("FAST_SERIALIZERS_ENABLED", default=True)
+# JSON lists with more rows than this are streamed in chunks (None disables)
+JSON_STREAM_THRESHOLD = env.int("JSON_STREAM_THRESHOLD", default=1000)
+JSON_STREAM_CHUNK_SIZE = 500
+
 # -----------------------------------------------------------------------------
 # Stripe (loaded from .env at project root)
 # -----------------------------------------------------------------------------
 STRIPE_SECRET_KEY = env("STRIPE_SECRET_KEY", default=None)
 STRIPE_WEBHOOK_SECRET = env("STRIPE_WEBHOOK_SECRET", default=None)
 PAYMENTS_ALLOW_UNVERIFIED_WEBHOOKS = env.bool("PAYMENTS_ALLOW_UNVERIFIED_WEBHOOKS", default=False)
+# Order status push (SSE / long-poll). With a Redis URL, status changes fan out
+# across processes via pub/sub; otherwise only within the publishing process.
+ORDER_STATUS_REDIS_URL = env("ORDER_STATUS_REDIS_URL", default=None)
+ORDER_STATUS_LONGPOLL_MAX = env.int("ORDER_STATUS_LONGPOLL_MAX", default=30)
+ORDER_STATUS_STREAM_MAX = env.int("ORDER_STATUS_STREAM_MAX", default=300)
+ORDER_STATUS_STREAM_KEEPALIVE = 15
+# Order event outbox (orders/outbox.py), published by manage.py
+# relay_order_events to a sink: "file" (JSON lines, local testing), "redis"
+# (stream) or "webhook" (signed POST of each batch). Failing sinks are retried
+# with exponential backoff between BACKOFF_BASE and BACKOFF_MAX seconds.
+ORDER_EVENTS_SINK = env("ORDER_EVENTS_SINK", default="file")
+ORDER_EVENTS_FILE = env("ORDER_EVENTS_FILE", default=str(BASE_DIR / "order_events.jsonl"))
+ORDER_EVENTS_REDIS_URL = env("ORDER_EVENTS_REDIS_URL", default="redis://localhost:6379/0")
+ORDER_EVENTS_STREAM = env("ORDER_EVENTS_STREAM", default="orders:events")
+ORDER_EVENTS_STREAM_MAXLEN = env.int("ORDER_EVENTS_STREAM_MAXLEN", default=1_000_000)
+ORDER_EVENTS_WEBHOOK_URL = env("ORDER_EVENTS_WEBHOOK_URL", default=None)
+ORDER_EVENTS_WEBHOOK_SECRET = env("ORDER_EVENTS_WEBHOOK_SECRET", default=None)
+ORDER_EVENTS_WEBHOOK_TIMEOUT = 10
+ORDER_EVENTS_BATCH_SIZE = env.int("ORDER_EVENTS_BATCH_SIZE", default=200)
+ORDER_EVENTS_POLL_INTERVAL = 1.0
+ORDER_EVENTS_BACKOFF_BASE = 1.0
+ORDER_EVENTS_BACKOFF_MAX = 60.0
+ORDER_EVENTS_RETENTION_DAYS = env.int("ORDER_EVENTS_RETENTION_DAYS", default=7)
+# manage.py reconcile_refunds settles order.refunded events still held this long
+# (the refund request died between the Stripe call and releasing the event)
+REFUND_RECONCILE_AFTER_SECONDS = env.int("REFUND_RECONCILE_AFTER_SECONDS", default=300)
+
+# Background jobs (jobs app): "db" (Job table, SKIP LOCKED) or "redis" (lists)
+# backend, run by manage.py run_worker on a thread or process pool. Failed
+# jobs are retried after JOBS_RETRY_BACKOFF * 2**(attempt - 1) seconds; jobs
+# of a worker silent for JOBS_LOCK_TIMEOUT are requeued. JOBS_EAGER runs them
+# in-process on commit instead (tests, development without a worker).
+JOBS_BACKEND = env("JOBS_BACKEND", default="db")
+JOBS_REDIS_URL = env("JOBS_REDIS_URL", default="redis://localhost:6379/0")
+JOBS_REDIS_FAILED_MAX = 10_000
+JOBS_EAGER = env.bool("JOBS_EAGER", default=False)
+JOBS_POOL = env("JOBS_POOL", default="thread")
+JOBS_CONCURRENCY = env.int("JOBS_CONCURRENCY", default=4)
+JOBS_POLL_INTERVAL = 1.0
+JOBS_MAX_ATTEMPTS = 3
+JOBS_RETRY_BACKOFF = 10
+JOBS_RETRY_BACKOFF_MAX = 3600
+JOBS_LOCK_TIMEOUT = env.int("JOBS_LOCK_TIMEOUT", default=600)
+JOBS_MAINTENANCE_INTERVAL = 60
+JOBS_RETENTION_DAYS = env.int("JOBS_RETENTION_DAYS", default=7)
+
+# Sales rollups (analytics app): "batch" = manage.py rollup_sales folds paid
+# orders past a paid_at watermark (orders younger than the lag wait for the
+# next run); "inline" = counted inside the payment transaction.
+ANALYTICS_ROLLUP_MODE = env("ANALYTICS_ROLLUP_MODE", default="batch")
+ANALYTICS_ROLLUP_LAG_SECONDS = env.int("ANALYTICS_ROLLUP_LAG_SECONDS", default=120)
+ANALYTICS_ROLLUP_BATCH_SIZE = 1000
+
+# Caches: "default" is shared (Redis in prod); "hot" puts a per-process tier
+# ("local") in front of it for a few keys read on most requests, which other
+# processes may see up to HOT_CACHE_LOCAL_TIMEOUT seconds late
+# (ecom/cache_backends.py).
+HOT_CACHE_LOCAL_TIMEOUT = env.int("HOT_CACHE_LOCAL_TIMEOUT", default=2)
+CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "local": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "local",
+        "OPTIONS": {"MAX_ENTRIES": 1000},
+    },
+    "hot": {
+        "BACKEND": "ecom.cache_backends.TieredCache",
+        "OPTIONS": {"LOCAL": "local", "REMOTE": "default", "LOCAL_TIMEOUT": HOT_CACHE_LOCAL_TIMEOUT},
+    },
+}
+
+# Storefront (catalog/cache.py): products per page, and lifetime of cached
+# page rows / template fragments / product details (changes invalidate them
+# earlier through the catalog version).
+STOREFRONT_PAGE_SIZE = 24
+CATALOG_CACHE_TIMEOUT = env.int("CATALOG_CACHE_TIMEOUT", default=600)
+# In-process product list index (catalog/index.py), refreshed from the
+# catalog_change log; changes younger than the lag are re-checked (ids may
+# commit out of order). Log rows are kept CATALOG_CHANGE_RETENTION_DAYS
+# (manage.py prune_catalog_changes).
+CATALOG_INDEX_ENABLED = env.bool("CATALOG_INDEX_ENABLED", default=False)
+CATALOG_INDEX_CHANGE_LAG = 60
+CATALOG_INDEX_RELOAD_SECONDS = 3600
+CATALOG_CHANGE_RETENTION_DAYS = env.int("CATALOG_CHANGE_RETENTION_DAYS", default=7)
+# catalog_change consumers (catalog/changes.py): rows are handed out once
+# this old (earlier ids may still be uncommitted), in batches of this size
+CATALOG_CHANGE_SETTLE_SECONDS = env.int("CATALOG_CHANGE_SETTLE_SECONDS", default=5)
+CATALOG_CHANGE_BATCH_SIZE = 500
+# Category nav snapshot (catalog/nav.py): kept current incrementally, fully
+# rebuilt at least this often
+CATALOG_NAV_TIMEOUT = env.int("CATALOG_NAV_TIMEOUT", default=3600)
+
+# Cart sweeper (manage.py sweep_carts): open carts idle this long are deleted
+# (empty) or canceled (with items); converted/canceled carts are deleted after
+# the retention period.
+CART_OPEN_TTL_DAYS = env.int("CART_OPEN_TTL_DAYS", default=30)
+CART_CLOSED_RETENTION_DAYS = env.int("CART_CLOSED_RETENTION_DAYS", default=7)
+CART_SWEEP_BATCH_SIZE = 500
+# sweep_carts runs from cron, so its metrics are pushed or written to a file
+# (node_exporter textfile collector) at the end of each run; empty: neither.
+CART_SWEEP_PUSHGATEWAY = env("CART_SWEEP_PUSHGATEWAY", default="")
+CART_SWEEP_METRICS_TEXTFILE = env("CART_SWEEP_METRICS_TEXTFILE", default="")
+
+# Rate limits declared on views (ecom/ratelimit.py). Counters live in Redis
+# when RATELIMIT_REDIS_URL is set, else (or while Redis is failing) in process.
+# RATELIMIT_IP_HEADER: request.META key holding the client IP set by the proxy
+# (e.g. "HTTP_X_REAL_IP"); REMOTE_ADDR is used when unset.
+RATELIMIT_ENABLED = env.bool("RATELIMIT_ENABLED", default=True)
+RATELIMIT_REDIS_URL = env("RATELIMIT_REDIS_URL", default=None)
+RATELIMIT_REDIS_TIMEOUT = 0.05
+RATELIMIT_REDIS_RETRY = 5
+RATELIMIT_IP_HEADER = env("RATELIMIT_IP_HEADER", default=None)
+
+# Point stripe-python at another API host (load tests use loadtest.fake_stripe)
+STRIPE_API_BASE = env("STRIPE_API_BASE", default=None)
 
 STRIPE_PUBLISHABLE_KEY = env("STRIPE_PUBLISHABLE_KEY", default="pk_test_xxx")
@@ -2,3 +2,7 @@ from .base import *
 
 DEBUG = True
 ALLOWED_HOSTS = env.list("ALLOWED_HOSTS", default=["*"])
+
+# Inspect every request for N+1 / slow queries and expose a Server-Timing summary
+QUERY_INSPECTOR_SAMPLE_RATE = env.float("QUERY_INSPECTOR_SAMPLE_RATE", default=1.0)
+QUERY_INSPECTOR_SERVER_TIMING = True
@@ -56,20 +56,69 @@ REDIS_PORT = env.int("REDIS_PORT", default=6379)
 REDIS_DB_CACHE = env.int("REDIS_DB_CACHE", default=1)
 REDIS_DB_RATELIMIT = env.int("REDIS_DB_RATELIMIT", default=2)
 
-CACHES = {
-    'default': {
-        'BACKEND': 'django_redis.cache.RedisCache',  # Use RedisCache backend
-        'LOCATION': 'redis://127.0.0.1:6379/1',  # Redis server (change for your environment)
-        'OPTIONS': {
-            'CLIENT_CLASS': 'django_redis.client.DefaultClient',
-        },
-    }
+REDIS_CACHE_MAX_CONNECTIONS = env.int("REDIS_CACHE_MAX_CONNECTIONS", default=50)
+REDIS_CACHE_SOCKET_TIMEOUT = env.float("REDIS_CACHE_SOCKET_TIMEOUT", default=0.25)
+
+# Shared cache on its own Redis DB. Pool per worker process, short timeouts,
+# zlib-compressed pickles (highest protocol; catalog pages and product
+# objects are the big values). Cache errors are logged and treated as
+# misses (IGNORE_EXCEPTIONS), so requests fall through to the database while
+# Redis is unavailable; sessions are cached_db for the same reason.
+CACHES["default"] = {
+    "BACKEND": "django_redis.cache.RedisCache",
+    "LOCATION": env("REDIS_CACHE_URL", default=f"redis://{REDIS_HOST}:{REDIS_PORT}/{REDIS_DB_CACHE}"),
+    "OPTIONS": {
+        "CLIENT_CLASS": "django_redis.client.DefaultClient",
+        "CONNECTION_POOL_KWARGS": {"max_connections": REDIS_CACHE_MAX_CONNECTIONS},
+        "SOCKET_CONNECT_TIMEOUT": REDIS_CACHE_SOCKET_TIMEOUT,
+        "SOCKET_TIMEOUT": REDIS_CACHE_SOCKET_TIMEOUT,
+        "COMPRESSOR": "django_redis.compressors.zlib.ZlibCompressor",
+        "SERIALIZER": "django_redis.serializers.pickle.PickleSerializer",
+        "PICKLE_VERSION": -1,
+        "IGNORE_EXCEPTIONS": True,
+    },
+    "KEY_PREFIX": "ecom",
 }
+DJANGO_REDIS_LOG_IGNORED_EXCEPTIONS = True
+DJANGO_REDIS_LOGGER = "ecom.cache"
 
-# Use cache-backed sessions for faster session reads/writes (optional)
-SESSION_ENGINE = "django.contrib.sessions.backends.cache"
+# Order status pub/sub (webhook on the WSGI workers -> SSE clients on the ASGI app)
+ORDER_STATUS_REDIS_URL = env("ORDER_STATUS_REDIS_URL", default=f"redis://{REDIS_HOST}:{REDIS_PORT}/0")
+
+# Order events go to a Redis stream unless ORDER_EVENTS_SINK says otherwise
+ORDER_EVENTS_SINK = env("ORDER_EVENTS_SINK", default="redis")
+ORDER_EVENTS_REDIS_URL = env("ORDER_EVENTS_REDIS_URL", default=f"redis://{REDIS_HOST}:{REDIS_PORT}/0")
+
+# Used when JOBS_BACKEND=redis
+JOBS_REDIS_URL = env("JOBS_REDIS_URL", default=f"redis://{REDIS_HOST}:{REDIS_PORT}/0")
+
+# Rate limit counters on their own DB; nginx passes the client IP as X-Real-IP
+RATELIMIT_REDIS_URL = env("RATELIMIT_REDIS_URL", default=f"redis://{REDIS_HOST}:{REDIS_PORT}/{REDIS_DB_RATELIMIT}")
+RATELIMIT_IP_HEADER = env("RATELIMIT_IP_HEADER", default="HTTP_X_REAL_IP")
+
+# Sessions read from the cache, written through to the database (survive a Redis outage)
+SESSION_ENGINE = "django.contrib.sessions.backends.cached_db"
 SESSION_CACHE_ALIAS = "default"
 
+# -------------------------
+# Templates: compiled once per process by the cached loader (explicit, with
+# no app_directories auto-discovery), and the storefront templates are
+# compiled at startup (catalog.apps) instead of on the first request.
+# -------------------------
+TEMPLATES[0]["APP_DIRS"] = False
+TEMPLATES[0]["OPTIONS"]["loaders"] = [
+    ("django.template.loaders.cached.Loader", [
+        "django.template.loaders.filesystem.Loader",
+        "django.template.loaders.app_directories.Loader",
+    ]),
+]
+TEMPLATE_PRELOAD = [
+    "base.html",
+    "catalog/products.html",
+    "catalog/product_detail.html",
+    "cart/cart.html",
+]
+
 # -------------------------
 # Stripe & external service keys
 # -------------------------
@@ -105,6 +154,12 @@ LOGGING["loggers"].setdefault("django.request", {"handlers": ["console"], "level
 LOGGING["loggers"].setdefault("gunicorn.error", {"handlers": ["console"], "level": "INFO", "propagate": False})
 LOGGING["loggers"].setdefault("gunicorn.access", {"handlers": ["console"], "level": "INFO", "propagate": False})
 
+# -------------------------
+# Query inspector: log N+1 / slow statements (with call sites) for a sample
+# -------------------------
+QUERY_INSPECTOR_SAMPLE_RATE = env.float("QUERY_INSPECTOR_SAMPLE_RATE", default=0.01)
+LOGGING["loggers"].setdefault("ecom.queries", {"handlers": ["console"], "level": "WARNING", "propagate": False})
+
 # -------------------------
 # Other production niceties (optional)
 # -------------------------
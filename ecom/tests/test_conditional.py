@@ -0,0 +1,72 @@
+# ecom/tests/test_conditional.py
+"""ConditionalGetMixin: 304s for lists (ETag only) and details (ETag, Last-Modified), per-user validators."""
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils.http import http_date
+from rest_framework.test import APIClient
+
+from catalog.models import Category, Product
+from orders.models import Order
+
+User = get_user_model()
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        category = Category.objects.create(name="Garden")
+        self.products = [
+            Product.objects.create(category=category, sku=f"G-{n}", title=f"Rake {n}",
+                                   price=Decimal("9.50"), stock_qty=3)
+            for n in range(2)
+        ]
+
+    def test_list_revalidates_by_etag_only(self):
+        resp = self.client.get("/api/products/", {"in_stock": "true"})
+        self.assertEqual(len(resp.json()), 2)
+        self.assertNotIn("Last-Modified", resp)
+        etag = resp["ETag"]
+        self.assertEqual(self.client.get("/api/products/", {"in_stock": "true"}, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        # A row leaving the filtered list changes neither its max(updated_at) nor anything If-Modified-Since sees
+        since = http_date()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.products[0].stock_qty = 0
+            self.products[0].save()
+        resp = self.client.get("/api/products/", {"in_stock": "true"}, HTTP_IF_MODIFIED_SINCE=since)
+        self.assertEqual((resp.status_code, len(resp.json())), (200, 1))
+        resp = self.client.get("/api/products/", {"in_stock": "true"}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 200)
+        self.assertNotEqual(resp["ETag"], etag)
+
+    def test_detail_revalidates_by_etag_and_last_modified(self):
+        url = f"/api/products/{self.products[1].id}/"
+        resp = self.client.get(url)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=resp["ETag"]).status_code, 304)
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=resp["Last-Modified"]).status_code, 304)
+        self.products[1].title = "Leaf rake"
+        self.products[1].save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=resp["ETag"]).status_code, 200)
+
+    def test_order_validators_are_per_user(self):
+        alice = User.objects.create_user(email="alice@example.com", password="A-secure-pass1")
+        bob = User.objects.create_user(email="bob@example.com", password="B-secure-pass1")
+        order = Order.objects.create(user=alice, total_amount=Decimal("5.00"))
+        clients = {}
+        for user in (alice, bob):
+            clients[user] = APIClient()
+            clients[user].force_authenticate(user)
+
+        resp = clients[alice].get("/api/orders/")
+        self.assertIn("Authorization", resp["Vary"])
+        self.assertEqual(clients[alice].get("/api/orders/", HTTP_IF_NONE_MATCH=resp["ETag"]).status_code, 304)
+        self.assertNotEqual(clients[bob].get("/api/orders/")["ETag"], resp["ETag"])
+
+        detail = clients[alice].get(f"/api/orders/{order.id}/")
+        self.assertIn("Authorization", detail["Vary"])
+        self.assertEqual(
+            clients[alice].get(f"/api/orders/{order.id}/", HTTP_IF_NONE_MATCH=detail["ETag"]).status_code, 304,
+        )
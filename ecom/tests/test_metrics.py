@@ -0,0 +1,54 @@
+# ecom/tests/test_metrics.py
+"""MetricsMiddleware and /api/metrics: a request's latency, DB queries and cache lookups show up in the scrape."""
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase
+from prometheus_client.parser import text_string_to_metric_families
+
+from catalog.models import Category, Product
+
+
+class MetricsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        Product.objects.create(
+            category=Category.objects.create(name="Garden"), sku="G-1", title="Rake", price=Decimal("9.50"),
+        )
+
+    def _scrape(self):
+        resp = self.client.get("/api/metrics")
+        self.assertEqual(resp.status_code, 200)
+        return {
+            (sample.name, tuple(sorted(sample.labels.items()))): sample.value
+            for family in text_string_to_metric_families(resp.content.decode())
+            for sample in family.samples
+        }
+
+    def _delta(self, before, after, name, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        return after.get(key, 0.0) - before.get(key, 0.0)
+
+    def test_request_latency_and_queries_are_exported(self):
+        before = self._scrape()
+        self.assertEqual(self.client.get("/api/products/").status_code, 200)
+        after = self._scrape()
+        latency = {"view": "product-list", "method": "GET", "status": "200"}
+        self.assertEqual(self._delta(before, after, "ecom_http_request_duration_seconds_count", **latency), 1)
+        self.assertEqual(self._delta(before, after, "ecom_http_request_db_queries_count", view="product-list"), 1)
+        self.assertGreater(self._delta(before, after, "ecom_http_request_db_queries_sum", view="product-list"), 0)
+        self.assertGreater(self._delta(before, after, "ecom_db_query_seconds_total", view="product-list"), 0)
+        self.assertEqual(self._delta(before, after, "ecom_http_response_size_bytes_count", view="product-list"), 1)
+
+    def test_cache_lookups_are_counted_per_view(self):
+        before = self._scrape()
+        self.client.get("/api/products/")
+        self.client.get("/api/products/")
+        after = self._scrape()
+        lookups = {"view": "product-list", "cache": "catalog:api"}
+        self.assertEqual(self._delta(before, after, "ecom_cache_requests_total", result="miss", **lookups), 1)
+        self.assertEqual(self._delta(before, after, "ecom_cache_requests_total", result="hit", **lookups), 1)
+        version = {"view": "product-list", "cache": "catalog:version"}
+        self.assertEqual(sum(
+            self._delta(before, after, "ecom_cache_requests_total", result=result, **version) for result in ("hit", "miss")
+        ), 2)
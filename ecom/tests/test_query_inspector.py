@@ -0,0 +1,74 @@
+# ecom/tests/test_query_inspector.py
+"""QueryInspectorMiddleware: fingerprints, N+1 and slow-statement detection, Server-Timing, prod sampling."""
+import time
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from catalog.models import Category, Product
+from ecom.query_inspector import Inspection, fingerprint, normalize_sql
+
+
+def _execute(delay=0.0):
+    def execute(sql, params, many, context):
+        time.sleep(delay)
+    return execute
+
+
+class InspectionTests(SimpleTestCase):
+    def test_fingerprint_ignores_literals_and_in_lists(self):
+        a = "SELECT * FROM catalog_product WHERE id IN (1, 2, 3) AND title = 'Rake' LIMIT 21"
+        b = "SELECT *  FROM catalog_product\n WHERE id IN (%s, %s) AND title = 'it''s' LIMIT 5"
+        self.assertEqual(normalize_sql(a), "SELECT * FROM catalog_product WHERE id IN (...) AND title = ? LIMIT ?")
+        self.assertEqual(fingerprint(a), fingerprint(b))
+        self.assertNotEqual(fingerprint(a), fingerprint("SELECT * FROM catalog_category WHERE id IN (1)"))
+
+    def test_repeated_fingerprint_is_flagged_at_the_threshold(self):
+        inspection = Inspection(repeat_threshold=3, slow_ms=1000)
+        for product_id in range(2):
+            inspection(_execute(), f"SELECT * FROM catalog_product WHERE id = {product_id}", None, False, {})
+        self.assertEqual(inspection.repeated, [])
+        inspection(_execute(), "SELECT * FROM catalog_product WHERE id = 7", None, False, {})
+        inspection(_execute(), "SELECT * FROM catalog_category", None, False, {})
+        fp = fingerprint("SELECT * FROM catalog_product WHERE id = 1")
+        self.assertEqual(inspection.repeated, [(fp, 3)])
+        self.assertIn("test_query_inspector.py", inspection.repeat_sites[fp])
+        self.assertIn('nplus1;desc="1 repeated fingerprints (max x3)"', inspection.server_timing())
+
+    def test_slow_statements_are_flagged(self):
+        inspection = Inspection(repeat_threshold=5, slow_ms=20)
+        inspection(_execute(), "SELECT 1", None, False, {})
+        inspection(_execute(0.03), "SELECT * FROM catalog_product WHERE price > 10", None, False, {})
+        self.assertEqual([sql for _, sql, _ in inspection.slow], ["SELECT * FROM catalog_product WHERE price > ?"])
+        self.assertTrue(inspection.has_issues)
+        self.assertIn("slowq;dur=", inspection.server_timing())
+
+
+class QueryInspectorMiddlewareTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        Product.objects.create(
+            category=Category.objects.create(name="Garden"), sku="G-1", title="Rake", price=Decimal("9.50"),
+        )
+
+    @override_settings(QUERY_INSPECTOR_SAMPLE_RATE=1.0, QUERY_INSPECTOR_SERVER_TIMING=True)
+    def test_server_timing_in_dev(self):
+        resp = self.client.get("/api/products/")
+        self.assertRegex(resp["Server-Timing"], r'^db;dur=[\d.]+;desc="\d+ queries"')
+
+    @override_settings(QUERY_INSPECTOR_SAMPLE_RATE=0.0, QUERY_INSPECTOR_SERVER_TIMING=True)
+    def test_no_server_timing_when_disabled(self):
+        self.assertNotIn("Server-Timing", self.client.get("/api/products/"))
+
+    @override_settings(QUERY_INSPECTOR_REPEAT_THRESHOLD=1, QUERY_INSPECTOR_SERVER_TIMING=False)
+    def test_prod_sampling(self):
+        with override_settings(QUERY_INSPECTOR_SAMPLE_RATE=0.0), self.assertNoLogs("ecom.queries"):
+            self.client.get("/api/products/")
+        cache.clear()
+        self.client = self.client_class()  # middleware reads its settings when the handler loads
+        with override_settings(QUERY_INSPECTOR_SAMPLE_RATE=1.0), self.assertLogs("ecom.queries", "WARNING") as logs:
+            resp = self.client.get("/api/products/")
+        self.assertNotIn("Server-Timing", resp)
+        self.assertIn("Repeated query x1", logs.output[0])
+        self.assertIn('File "', logs.output[0])
@@ -3,6 +3,7 @@ from django.http import JsonResponse
 from django.urls import path, include
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
 from .views import checkout_page  # only the HTML demo view lives here
+from .metrics import metrics_view
 from catalog.views_frontend import product_list, product_detail, add_to_cart, view_cart, remove_from_cart
 
 def healthz(_request):
@@ -13,6 +14,7 @@ urlpatterns = [
 
     # API: health/schema/docs
     path("api/healthz/", healthz, name="healthz"),
+    path("api/metrics", metrics_view, name="metrics"),
     path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
     path("api/docs/", SpectacularSwaggerView.as_view(url_name="schema"), name="docs"),
 
@@ -22,6 +24,7 @@ urlpatterns = [
     path("api/", include("cart.urls")),
     path("api/", include("orders.urls")),
     path("api/", include("payments.urls")),  # Stripe endpoints are defined inside payments/urls.py
+    path("api/", include("analytics.urls")),
 
     # Minimal demo checkout page
     path("checkout/", checkout_page, name="checkout"),
@@ -21,7 +21,13 @@ python manage.py migrate --noinput
 # Collect static files
 python manage.py collectstatic --noinput
 
-# Start gunicorn
+# Prometheus multiprocess dir: every worker writes its samples here and
+# /api/metrics aggregates them. Must be emptied before workers start.
+export PROMETHEUS_MULTIPROC_DIR="${PROMETHEUS_MULTIPROC_DIR:-/tmp/prometheus}"
+rm -rf "${PROMETHEUS_MULTIPROC_DIR}"
+mkdir -p "${PROMETHEUS_MULTIPROC_DIR}"
+
+# Start gunicorn (hooks in gunicorn.conf.py are picked up from /app)
 exec gunicorn ecom.wsgi:application \
   --bind 0.0.0.0:8000 \
   --workers ${GUNICORN_WORKERS:-3} \
@@ -0,0 +1,13 @@
+# gunicorn.conf.py
+"""
+Gunicorn server hooks. Loaded automatically from the working directory (/app);
+CLI flags in entrypoint.sh still take precedence for bind/workers/logging.
+"""
+import os
+
+
+def child_exit(server, worker):
+    # Drop live-gauge files of dead workers from the Prometheus multiprocess dir
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,23 @@
+# jobs/admin.py
+from django.contrib import admin
+from django.utils import timezone
+
+from ecom.admin import LargeTableAdmin
+from .models import Job
+
+
+@admin.action(description="Run again now")
+def requeue(modeladmin, request, queryset):
+    queryset.filter(status__in=[Job.STATUS_FAILED, Job.STATUS_DONE]).update(
+        status=Job.STATUS_QUEUED, run_at=timezone.now(), attempts=0, finished_at=None,
+    )
+
+
+@admin.register(Job)
+class JobAdmin(LargeTableAdmin, admin.ModelAdmin):
+    list_display = ("id", "name", "queue", "status", "priority", "attempts", "max_attempts", "run_at", "finished_at")
+    list_filter = ("status", "queue")
+    search_fields = ("name",)  # prefix (LargeTableAdmin)
+    readonly_fields = ("created_at", "locked_by", "locked_at", "finished_at", "last_error")
+    ordering = ("-id",)
+    actions = [requeue]
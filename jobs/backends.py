@@ -0,0 +1,240 @@
+# jobs/backends.py
+"""
+Job queue storage, selected by JOBS_BACKEND.
+
+- DatabaseBackend ("db"): Job rows. Workers claim the ready rows of their
+  queues, highest priority first, with SELECT ... FOR UPDATE SKIP LOCKED,
+  so any number of workers share a queue without blocking each other. Jobs
+  enqueued inside a transaction exist only if it commits.
+- RedisBackend ("redis"): one Redis list per queue and priority class
+  (priority > 0, == 0, < 0), plus a sorted set of jobs scheduled for later
+  (run_at, retries). A claimed job is moved (LMOVE) to the worker's
+  processing list, and only removed from it once finished. Enqueueing waits
+  for the surrounding transaction to commit. Cheaper per job than the
+  database under high volume, but finished jobs leave no trace except the
+  last JOBS_REDIS_FAILED_MAX failures.
+
+Workers heartbeat every JOBS_MAINTENANCE_INTERVAL (locked_at of their jobs,
+or a Redis key); the jobs of a worker silent for JOBS_LOCK_TIMEOUT are queued
+again, or failed when that was their last attempt (a job that kills its
+worker, e.g. OOM in the process pool, must not be claimed forever). A worker
+only finishes jobs it still holds: one requeued and claimed elsewhere meanwhile
+is left to its new worker.
+"""
+import datetime
+import logging
+import time
+import uuid
+
+import orjson
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+log = logging.getLogger("jobs")
+
+LOST_WORKER_ERROR = "Worker stopped heartbeating during the last attempt"
+
+
+class DatabaseBackend:
+    name = "db"
+
+    def enqueue(self, name, args, kwargs, queue, priority, run_at, max_attempts):
+        from .models import Job
+        return Job.objects.create(
+            name=name, args=args, kwargs=kwargs, queue=queue, priority=priority,
+            run_at=run_at or timezone.now(), max_attempts=max_attempts,
+        ).id
+
+    def claim(self, queues, limit, worker_id):
+        from .models import Job
+        now = timezone.now()
+        with transaction.atomic():
+            jobs = list(
+                Job.objects.select_for_update(skip_locked=True)
+                .filter(status=Job.STATUS_QUEUED, queue__in=queues, run_at__lte=now)
+                .order_by("-priority", "run_at", "id")[:limit]
+            )
+            if jobs:
+                Job.objects.filter(id__in=[job.id for job in jobs]).update(
+                    status=Job.STATUS_RUNNING, locked_by=worker_id, locked_at=now, attempts=F("attempts") + 1,
+                )
+        for job in jobs:
+            job.attempts += 1
+            job.status, job.locked_by, job.locked_at = Job.STATUS_RUNNING, worker_id, now
+        return jobs
+
+    def _finish(self, job, **changes):
+        from .models import Job
+        held = Job.objects.filter(id=job.id, status=Job.STATUS_RUNNING, locked_by=job.locked_by)
+        if not held.update(**changes):
+            log.warning("Job %s %s was requeued while %s ran it; leaving it to its new worker",
+                        job.id, job.name, job.locked_by)
+
+    def complete(self, job):
+        from .models import Job
+        self._finish(job, status=Job.STATUS_DONE, finished_at=timezone.now(), last_error="")
+
+    def retry(self, job, error, run_at):
+        from .models import Job
+        self._finish(job, status=Job.STATUS_QUEUED, run_at=run_at, last_error=error, locked_by="", locked_at=None)
+
+    def fail(self, job, error):
+        from .models import Job
+        self._finish(job, status=Job.STATUS_FAILED, finished_at=timezone.now(), last_error=error)
+
+    def maintain(self, worker_id):
+        """Heartbeat this worker's jobs, requeue (or fail) those of dead workers, delete finished jobs past retention."""
+        from .models import Job
+        now = timezone.now()
+        Job.objects.filter(status=Job.STATUS_RUNNING, locked_by=worker_id).update(locked_at=now)
+        stale = Job.objects.filter(
+            status=Job.STATUS_RUNNING, locked_at__lt=now - datetime.timedelta(seconds=settings.JOBS_LOCK_TIMEOUT),
+        )
+        failed = stale.filter(attempts__gte=F("max_attempts")).update(
+            status=Job.STATUS_FAILED, finished_at=now, last_error=LOST_WORKER_ERROR,
+        )
+        if failed:
+            log.error("Failed %s jobs whose worker died during their last attempt", failed)
+        stale.update(status=Job.STATUS_QUEUED, locked_by="", locked_at=None)
+        old = Job.objects.filter(finished_at__lt=now - datetime.timedelta(days=settings.JOBS_RETENTION_DAYS))
+        ids = list(old.values_list("id", flat=True)[:10_000])
+        if ids:
+            Job.objects.filter(id__in=ids).delete()
+
+    def stop(self, worker_id):
+        pass
+
+
+class RedisJob:
+    FIELDS = ("id", "queue", "name", "args", "kwargs", "priority", "run_at", "attempts", "max_attempts")
+    __slots__ = FIELDS + ("raw", "worker_id")
+
+    def __init__(self, raw, worker_id=None):
+        data = orjson.loads(raw)
+        for field in self.FIELDS:
+            setattr(self, field, data[field])
+        self.run_at = datetime.datetime.fromtimestamp(self.run_at, datetime.timezone.utc)
+        self.raw = raw  # as stored in the processing list
+        self.worker_id = worker_id
+
+    def dumps(self, **changes):
+        data = {field: getattr(self, field) for field in self.FIELDS}
+        data["run_at"] = self.run_at.timestamp()
+        data.update(changes)
+        return _dumps(data)
+
+
+def _dumps(data):
+    # DjangoJSONEncoder for Decimal/UUID/date arguments, as in the database backend
+    return orjson.dumps(data, default=DjangoJSONEncoder().default)
+
+
+# Move due jobs from the schedule to their ready lists (members carry their list name)
+PROMOTE_LUA = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, tonumber(ARGV[2]))
+for _, member in ipairs(due) do
+    if redis.call('ZREM', KEYS[1], member) == 1 then
+        local sep = string.find(member, '|', 1, true)
+        redis.call('LPUSH', string.sub(member, 1, sep - 1), string.sub(member, sep + 1))
+    end
+end
+return #due
+"""
+
+
+class RedisBackend:
+    name = "redis"
+    prefix = "jobs"
+
+    def __init__(self, url=None):
+        import redis
+        self._redis = redis.Redis.from_url(url or settings.JOBS_REDIS_URL, socket_timeout=5)
+        self._promote = self._redis.register_script(PROMOTE_LUA)
+
+    def _ready_key(self, queue, priority):
+        level = "high" if priority > 0 else "low" if priority < 0 else "normal"
+        return f"{self.prefix}:{queue}:{level}"
+
+    def _schedule_key(self):
+        return f"{self.prefix}:scheduled"
+
+    def _processing_key(self, worker_id):
+        return f"{self.prefix}:processing:{worker_id}"
+
+    def _heartbeat_key(self, worker_id):
+        return f"{self.prefix}:worker:{worker_id}"
+
+    def _push(self, queue, priority, raw, run_at):
+        ready = self._ready_key(queue, priority)
+        if run_at > time.time():
+            self._redis.zadd(self._schedule_key(), {f"{ready}|".encode() + raw: run_at})
+        else:
+            self._redis.lpush(ready, raw)
+
+    def enqueue(self, name, args, kwargs, queue, priority, run_at, max_attempts):
+        job_id = uuid.uuid4().hex
+        run_at = (run_at or timezone.now()).timestamp()
+        raw = _dumps({
+            "id": job_id, "queue": queue, "name": name, "args": list(args), "kwargs": kwargs,
+            "priority": priority, "run_at": run_at, "attempts": 0, "max_attempts": max_attempts,
+        })
+        transaction.on_commit(lambda: self._push(queue, priority, raw, run_at))
+        return job_id
+
+    def claim(self, queues, limit, worker_id):
+        self._promote(keys=[self._schedule_key()], args=[time.time(), 1000])
+        processing = self._processing_key(worker_id)
+        jobs = []
+        for level in ("high", "normal", "low"):
+            for queue in queues:
+                while len(jobs) < limit:
+                    raw = self._redis.lmove(f"{self.prefix}:{queue}:{level}", processing, "RIGHT", "LEFT")
+                    if raw is None:
+                        break
+                    job = RedisJob(raw, worker_id)
+                    job.attempts += 1
+                    jobs.append(job)
+        return jobs
+
+    def complete(self, job):
+        self._redis.lrem(self._processing_key(job.worker_id), 1, job.raw)
+
+    def retry(self, job, error, run_at):
+        raw = job.dumps(attempts=job.attempts, last_error=error)
+        self._push(job.queue, job.priority, raw, run_at.timestamp())
+        self.complete(job)
+
+    def fail(self, job, error):
+        key = f"{self.prefix}:failed"
+        pipe = self._redis.pipeline()
+        pipe.lpush(key, job.dumps(attempts=job.attempts, last_error=error))
+        pipe.ltrim(key, 0, settings.JOBS_REDIS_FAILED_MAX - 1)
+        pipe.execute()
+        self.complete(job)
+
+    def maintain(self, worker_id):
+        """Refresh this worker's heartbeat; requeue the processing lists of workers without one."""
+        self._redis.set(self._heartbeat_key(worker_id), 1, ex=settings.JOBS_LOCK_TIMEOUT)
+        for key in self._redis.scan_iter(match=self._processing_key("*")):
+            dead = key.decode().rsplit(":", 1)[1]
+            if dead == worker_id or self._redis.exists(self._heartbeat_key(dead)):
+                continue
+            while (raw := self._redis.rpop(key)) is not None:
+                job = RedisJob(raw)
+                job.attempts += 1  # the attempt its worker died in (claim() counts it in memory only)
+                if job.attempts >= job.max_attempts:
+                    failed = f"{self.prefix}:failed"
+                    self._redis.lpush(failed, job.dumps(last_error=LOST_WORKER_ERROR))
+                    self._redis.ltrim(failed, 0, settings.JOBS_REDIS_FAILED_MAX - 1)
+                    log.error("Job %s %s failed: its worker died during the last attempt", job.id, job.name)
+                else:
+                    self._redis.lpush(self._ready_key(job.queue, job.priority), job.dumps())
+
+    def stop(self, worker_id):
+        self._redis.delete(self._heartbeat_key(worker_id))
+
+
+BACKENDS = {"db": DatabaseBackend, "redis": RedisBackend}
@@ -0,0 +1,42 @@
+# jobs/management/commands/run_worker.py
+"""
+Run queued jobs (see jobs/queue.py, jobs/worker.py).
+
+    python manage.py run_worker                                   # default queue, JOBS_POOL x JOBS_CONCURRENCY
+    python manage.py run_worker --queue mail --queue default --concurrency 8
+    python manage.py run_worker --pool process --concurrency 4 --metrics-port 9109
+    python manage.py run_worker --burst                           # drain the queues, then exit
+"""
+import signal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from jobs.worker import Worker
+
+
+class Command(BaseCommand):
+    help = "Run background jobs from the queue until stopped (SIGTERM finishes running jobs first)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--queue", action="append", dest="queues", help="queue to work (repeatable; default: default)")
+        parser.add_argument("--concurrency", type=int, default=settings.JOBS_CONCURRENCY)
+        parser.add_argument("--pool", choices=["thread", "process"], default=settings.JOBS_POOL)
+        parser.add_argument("--poll-interval", type=float, default=settings.JOBS_POLL_INTERVAL,
+                            help="sleep between polls of empty queues (s)")
+        parser.add_argument("--max-jobs", type=int, default=None, help="exit after this many jobs")
+        parser.add_argument("--burst", action="store_true", help="exit once the queues are empty")
+        parser.add_argument("--metrics-port", type=int, default=None, help="serve Prometheus metrics on this port")
+
+    def handle(self, *args, **options):
+        if options["metrics_port"]:
+            from prometheus_client import start_http_server
+            start_http_server(options["metrics_port"])
+        worker = Worker(
+            queues=options["queues"] or ["default"], concurrency=options["concurrency"],
+            pool=options["pool"], poll_interval=options["poll_interval"],
+        )
+        signal.signal(signal.SIGTERM, worker.stop)
+        signal.signal(signal.SIGINT, worker.stop)
+        processed = worker.run(max_jobs=options["max_jobs"], burst=options["burst"])
+        self.stdout.write(self.style.SUCCESS(f"Worker {worker.id} done: {processed} jobs"))
@@ -0,0 +1,46 @@
+# jobs/models.py
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """A deferred call of a @task function (jobs/queue.py), run by manage.py run_worker."""
+    STATUS_QUEUED = "queued"
+    STATUS_RUNNING = "running"
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, "Queued"),
+        (STATUS_RUNNING, "Running"),
+        (STATUS_DONE, "Done"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    queue = models.CharField(max_length=50, default="default")
+    name = models.CharField(max_length=200)  # dotted path of the task function
+    args = models.JSONField(default=list, encoder=DjangoJSONEncoder)
+    kwargs = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    priority = models.SmallIntegerField(default=0)  # higher runs first
+    run_at = models.DateTimeField(default=timezone.now)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    last_error = models.TextField(blank=True, default="")
+    locked_by = models.CharField(max_length=100, blank=True, default="")
+    locked_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # the workers' claim query; only queued rows are indexed
+            models.Index(fields=["queue", "-priority", "run_at", "id"], condition=Q(status="queued"), name="job_ready"),
+            # requeueing jobs of dead workers
+            models.Index(fields=["locked_at"], condition=Q(status="running"), name="job_running_locked_at"),
+            models.Index(fields=["finished_at"], name="job_finished_at"),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.status}, {self.id})"
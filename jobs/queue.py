@@ -0,0 +1,98 @@
+# jobs/queue.py
+"""
+Deferred work: views enqueue() a call and return, manage.py run_worker runs it.
+
+    from jobs.queue import task
+
+    @task(queue="mail", max_attempts=5)
+    def send_receipt(order_id):
+        ...
+
+    send_receipt.enqueue(order.id)                       # or enqueue(send_receipt, order.id)
+    send_receipt.enqueue(order.id, _priority=10)         # higher runs first
+    send_receipt.enqueue(order.id, _run_at=timezone.now() + timedelta(hours=1))
+
+Only module-level functions decorated with @task can be enqueued (workers
+refuse any other dotted path). Arguments are stored as JSON: pass ids, not
+model instances. A task may run more than once (retries, a worker dying
+mid-job), so make it idempotent. A task that raises is retried after
+JOBS_RETRY_BACKOFF * 2**(attempt - 1) seconds (capped at
+JOBS_RETRY_BACKOFF_MAX) until its max_attempts.
+
+With JOBS_EAGER the call runs in-process once the surrounding transaction
+commits (tests, or development without a worker).
+"""
+import functools
+import logging
+import threading
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+from .backends import BACKENDS
+
+log = logging.getLogger("jobs")
+
+
+def task(func=None, *, queue="default", priority=0, max_attempts=None):
+    """Mark a module-level function as a job, with its default queue, priority and attempts."""
+    if func is None:
+        return functools.partial(task, queue=queue, priority=priority, max_attempts=max_attempts)
+    func.job_options = {"queue": queue, "priority": priority, "max_attempts": max_attempts}
+    func.enqueue = functools.partial(enqueue, func)
+    return func
+
+
+def task_name(func):
+    return f"{func.__module__}.{func.__qualname__}"
+
+
+def resolve(name):
+    """The @task function for a dotted path (ValueError for anything else)."""
+    func = import_string(name)
+    if getattr(func, "job_options", None) is None:
+        raise ValueError(f"{name} is not a @task")
+    return func
+
+
+def enqueue(func, *args, _queue=None, _priority=None, _run_at=None, _max_attempts=None, **kwargs):
+    """
+    Queue func(*args, **kwargs) (func: a @task function or its dotted path);
+    returns the job id. _run_at (aware datetime) delays it; the other
+    _options override the task's defaults.
+    """
+    if isinstance(func, str):
+        func = resolve(func)
+    options = getattr(func, "job_options", None)
+    if options is None:
+        raise ValueError(f"{task_name(func)} is not a @task")
+    if getattr(settings, "JOBS_EAGER", False):
+        transaction.on_commit(lambda: func(*args, **kwargs))
+        return None
+    return get_backend().enqueue(
+        task_name(func), list(args), kwargs,
+        queue=_queue or options["queue"],
+        priority=options["priority"] if _priority is None else _priority,
+        run_at=_run_at,
+        max_attempts=_max_attempts or options["max_attempts"] or settings.JOBS_MAX_ATTEMPTS,
+    )
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                name = settings.JOBS_BACKEND
+                _backend = (BACKENDS.get(name) or import_string(name))()
+    return _backend
+
+
+def reset_backend():
+    global _backend
+    _backend = None
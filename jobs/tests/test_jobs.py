@@ -0,0 +1,100 @@
+# jobs/tests/test_jobs.py
+"""Database job queue: priority and run_at ordering, retries, eager mode, requeue of dead workers' jobs."""
+import datetime
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from jobs.models import Job
+from jobs.queue import enqueue, get_backend, reset_backend, task
+from jobs.worker import Worker
+
+calls = []
+
+
+@task
+def record(label):
+    calls.append(label)
+
+
+@task(max_attempts=2)
+def explode():
+    raise RuntimeError("boom")
+
+
+def not_a_task():
+    pass
+
+
+@override_settings(JOBS_BACKEND="db", JOBS_EAGER=False, JOBS_RETRY_BACKOFF=0)
+class JobQueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+        reset_backend()
+        self.addCleanup(reset_backend)
+
+    def _work(self, **kwargs):
+        return Worker(concurrency=1, poll_interval=0, **kwargs).run(burst=True)
+
+    def test_runs_by_priority_then_run_at(self):
+        now = timezone.now()
+        record.enqueue("late", _run_at=now - datetime.timedelta(seconds=1))
+        record.enqueue("early", _run_at=now - datetime.timedelta(seconds=2))
+        enqueue(record, "urgent", _priority=5)
+        record.enqueue("future", _run_at=now + datetime.timedelta(hours=1))
+        self.assertEqual(self._work(), 3)
+        self.assertEqual(calls, ["urgent", "early", "late"])
+        self.assertEqual(Job.objects.filter(status=Job.STATUS_DONE).count(), 3)
+        self.assertEqual(Job.objects.get(status=Job.STATUS_QUEUED).args, ["future"])
+
+    def test_failures_are_retried_then_failed(self):
+        explode.enqueue()
+        self.assertEqual(self._work(), 2)
+        job = Job.objects.get()
+        self.assertEqual((job.status, job.attempts), (Job.STATUS_FAILED, 2))
+        self.assertIn("RuntimeError: boom", job.last_error)
+
+    def test_only_tasks_can_be_enqueued(self):
+        with self.assertRaises(ValueError):
+            enqueue(not_a_task)
+        with self.assertRaises(ValueError):
+            enqueue("os.getcwd")
+
+    @override_settings(JOBS_EAGER=True)
+    def test_eager_runs_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            record.enqueue("now")
+            self.assertEqual(calls, [])
+        self.assertEqual(calls, ["now"])
+        self.assertFalse(Job.objects.exists())
+
+    @override_settings(JOBS_LOCK_TIMEOUT=60)
+    def test_jobs_of_dead_workers_are_requeued(self):
+        record.enqueue("orphan")
+        Job.objects.update(status=Job.STATUS_RUNNING, locked_by="gone", attempts=1,
+                           locked_at=timezone.now() - datetime.timedelta(minutes=5))
+        self.assertEqual(self._work(), 1)
+        self.assertEqual(calls, ["orphan"])
+        self.assertEqual(Job.objects.get().attempts, 2)
+
+    @override_settings(JOBS_LOCK_TIMEOUT=60)
+    def test_dead_workers_job_on_its_last_attempt_fails(self):
+        explode.enqueue()
+        Job.objects.update(status=Job.STATUS_RUNNING, locked_by="gone", attempts=2,
+                           locked_at=timezone.now() - datetime.timedelta(minutes=5))
+        self.assertEqual(self._work(), 0)
+        job = Job.objects.get()
+        self.assertEqual((job.status, job.attempts), (Job.STATUS_FAILED, 2))
+        self.assertIn("heartbeating", job.last_error)
+
+    def test_stale_worker_cannot_finish_a_requeued_job(self):
+        record.enqueue("twice")
+        backend = get_backend()
+        [slow] = backend.claim(["default"], 1, "slow")
+        Job.objects.update(status=Job.STATUS_QUEUED, locked_by="", locked_at=None)  # requeued by maintain()
+        [fast] = backend.claim(["default"], 1, "fast")
+        with self.assertLogs("jobs", "WARNING"):
+            backend.complete(slow)
+        self.assertEqual(Job.objects.get().status, Job.STATUS_RUNNING)
+        backend.complete(fast)
+        self.assertEqual(Job.objects.get().status, Job.STATUS_DONE)
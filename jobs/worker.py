@@ -0,0 +1,154 @@
+# jobs/worker.py
+"""
+Job worker (manage.py run_worker).
+
+The main thread claims up to `concurrency` jobs at a time from the backend
+and runs them on a thread pool (I/O-bound tasks: Stripe, email, cache
+warming) or a process pool (CPU-bound ones). Outcomes are recorded from the
+main thread, so pool threads/processes only run task code; process pool
+children are spawned and set Django up themselves. On stop() (SIGTERM/SIGINT
+in run_worker) no new jobs are claimed and the running ones are finished.
+"""
+import datetime
+import logging
+import multiprocessing
+import os
+import random
+import socket
+import time
+import traceback
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+from prometheus_client import Counter, Gauge, Histogram
+
+from .queue import get_backend, resolve
+
+log = logging.getLogger("jobs.worker")
+
+JOBS_PROCESSED = Counter("ecom_jobs_processed", "Jobs run by outcome", ["queue", "task", "outcome"])
+JOB_SECONDS = Histogram(
+    "ecom_job_duration_seconds",
+    "Job run time",
+    ["queue", "task"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0),
+)
+JOB_DELAY_SECONDS = Histogram(
+    "ecom_job_queue_delay_seconds",
+    "Time from a job's run_at to its start",
+    ["queue"],
+    buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 1800.0),
+)
+JOBS_RUNNING = Gauge("ecom_jobs_running", "Jobs running in this worker", multiprocess_mode="livesum")
+
+
+def execute(name, args, kwargs):
+    """Run one job (in a pool thread or process); returns its run time."""
+    close_old_connections()
+    start = time.perf_counter()
+    try:
+        resolve(name)(*args, **kwargs)
+    finally:
+        close_old_connections()
+    return time.perf_counter() - start
+
+
+def _init_process():
+    # Spawned (not forked: no inherited database connections), so set Django up
+    import django
+    django.setup()
+
+
+def retry_delay(attempts):
+    delay = min(settings.JOBS_RETRY_BACKOFF * 2 ** (attempts - 1), settings.JOBS_RETRY_BACKOFF_MAX)
+    return delay * random.uniform(0.8, 1.2)
+
+
+class Worker:
+    def __init__(self, queues=("default",), concurrency=None, pool=None, poll_interval=None, backend=None):
+        self.queues = list(queues)
+        self.concurrency = concurrency or settings.JOBS_CONCURRENCY
+        self.pool = pool or settings.JOBS_POOL
+        self.poll_interval = settings.JOBS_POLL_INTERVAL if poll_interval is None else poll_interval
+        self.backend = backend or get_backend()
+        self.id = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.processed = 0
+        self._stopping = False
+
+    def stop(self, *_):
+        self._stopping = True
+
+    def _executor(self):
+        if self.pool == "process":
+            return ProcessPoolExecutor(
+                self.concurrency, mp_context=multiprocessing.get_context("spawn"), initializer=_init_process,
+            )
+        if self.pool == "thread":
+            return ThreadPoolExecutor(self.concurrency, thread_name_prefix="job")
+        raise ValueError(f"unknown pool {self.pool!r} (thread or process)")
+
+    def run(self, max_jobs=None, burst=False):
+        """Work until stop(), `max_jobs` jobs finished, or (with `burst`) the queues are empty."""
+        log.info("Worker %s started queues=%s pool=%s concurrency=%s",
+                 self.id, ",".join(self.queues), self.pool, self.concurrency)
+        running = {}
+        last_maintenance = 0.0
+        with self._executor() as executor:
+            try:
+                while not self._stopping or running:
+                    if time.monotonic() - last_maintenance > settings.JOBS_MAINTENANCE_INTERVAL:
+                        self.backend.maintain(self.id)
+                        last_maintenance = time.monotonic()
+                    claimed = []
+                    free = self.concurrency - len(running)
+                    if max_jobs is not None:
+                        free = min(free, max_jobs - self.processed - len(running))
+                    if free > 0 and not self._stopping:
+                        claimed = self.backend.claim(self.queues, free, self.id)
+                        for job in claimed:
+                            self._observe_start(job)
+                            running[executor.submit(execute, job.name, job.args, job.kwargs)] = job
+                    JOBS_RUNNING.set(len(running))
+                    if not running:
+                        if burst or (max_jobs is not None and self.processed >= max_jobs):
+                            break
+                        time.sleep(self.poll_interval)
+                        continue
+                    # More work may be waiting when every free slot got a job
+                    timeout = 0 if claimed and len(claimed) == free else self.poll_interval
+                    done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        self._finish(running.pop(future), future)
+            finally:
+                JOBS_RUNNING.set(0)
+                self.backend.stop(self.id)
+        log.info("Worker %s stopped after %s jobs", self.id, self.processed)
+        return self.processed
+
+    def _observe_start(self, job):
+        delay = (timezone.now() - job.run_at).total_seconds()
+        JOB_DELAY_SECONDS.labels(queue=job.queue).observe(max(delay, 0.0))
+
+    def _finish(self, job, future):
+        self.processed += 1
+        labels = {"queue": job.queue, "task": job.name}
+        try:
+            JOB_SECONDS.labels(**labels).observe(future.result())
+        except Exception as e:
+            error = "".join(traceback.format_exception(e))[-4000:]
+            if job.attempts < job.max_attempts:
+                delay = retry_delay(job.attempts)
+                self.backend.retry(job, error, timezone.now() + datetime.timedelta(seconds=delay))
+                JOBS_PROCESSED.labels(outcome="retry", **labels).inc()
+                log.warning("Job %s %s failed (attempt %s/%s), retrying in %.0fs: %r",
+                            job.id, job.name, job.attempts, job.max_attempts, delay, e)
+            else:
+                self.backend.fail(job, error)
+                JOBS_PROCESSED.labels(outcome="failed", **labels).inc()
+                log.error("Job %s %s failed after %s attempts: %r", job.id, job.name, job.attempts, e)
+            return
+        self.backend.complete(job)
+        JOBS_PROCESSED.labels(outcome="success", **labels).inc()
@@ -0,0 +1,134 @@
+# loadtest/__main__.py
+"""
+HTTP load test for the real stack (nginx -> gunicorn -> Django).
+
+    # 1) start the stack with the load-test overrides (fake Stripe, signed webhooks)
+    docker compose -f docker-compose.yml -f docker-compose.loadtest.yml up -d
+    docker compose exec web python -m loadtest.seed --products 5000
+
+    # 2) drive journeys at several concurrency levels (fake Stripe runs in-process)
+    python -m loadtest --target http://localhost --concurrency 10,50 --duration 60
+
+Produces per-step throughput and p50/p95/p99 latency per concurrency level,
+printed and written as JSON (--output).
+"""
+import argparse
+import json
+import logging
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+
+from .client import HttpClient, Stats
+from .fake_stripe import start_server
+from .journeys import JourneyError, VirtualUser
+
+log = logging.getLogger("loadtest")
+
+
+def run_level(args, concurrency, stripe_url):
+    stats = Stats()
+    deadline = time.monotonic() + args.ramp_up + args.duration
+    counters = {"journeys": 0, "failed": 0}
+    lock = threading.Lock()
+
+    def worker(n):
+        time.sleep(args.ramp_up * n / max(concurrency, 1))
+        rng = random.Random(args.seed + n)
+        client = HttpClient(args.target)
+        user = VirtualUser(client, HttpClient(stripe_url), stats, rng, paid_timeout=args.paid_timeout)
+        try:
+            user.signup_and_login()
+        except Exception as e:
+            log.warning("vu=%s signup/login failed: %s", n, e)
+            return
+        while time.monotonic() < deadline:
+            try:
+                user.checkout()
+                ok = True
+            except JourneyError as e:
+                log.debug("vu=%s journey failed: %s", n, e)
+                ok = False
+                if "HTTP 401" in str(e):
+                    user.login()
+            except Exception as e:
+                log.warning("vu=%s transport error: %s", n, e)
+                client.close()
+                ok = False
+            with lock:
+                counters["journeys" if ok else "failed"] += 1
+            if args.think_time:
+                time.sleep(rng.uniform(0, args.think_time))
+
+    threads = [threading.Thread(target=worker, args=(n,), daemon=True) for n in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    report = stats.report()
+    report["concurrency"] = concurrency
+    report["journeys_completed"] = counters["journeys"]
+    report["journeys_failed"] = counters["failed"]
+    report["journeys_per_s"] = round(counters["journeys"] / max(report["elapsed_s"], 1e-9), 2)
+    return report
+
+
+def format_level(report):
+    lines = [
+        f"\n== concurrency {report['concurrency']}: {report['journeys_completed']} journeys "
+        f"({report['journeys_per_s']}/s), {report['journeys_failed']} failed, {report['elapsed_s']}s",
+        f"{'step':<18}{'count':>8}{'err':>6}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}",
+    ]
+    for step, r in report["steps"].items():
+        lines.append(f"{step:<18}{r['count']:>8}{r['errors']:>6}{r['rps']:>9.1f}"
+                     f"{r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}{r['p99_ms']:>10.1f}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(prog="python -m loadtest", description=__doc__,
+                                formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--target", default="http://localhost", help="base URL of nginx (or gunicorn)")
+    p.add_argument("--concurrency", default="10", help="comma-separated virtual user counts, run in order")
+    p.add_argument("--duration", type=float, default=60, help="seconds per level (after ramp-up)")
+    p.add_argument("--ramp-up", type=float, default=5)
+    p.add_argument("--think-time", type=float, default=0.0, help="max random pause between journeys (s)")
+    p.add_argument("--paid-timeout", type=float, default=30)
+    p.add_argument("--seed", type=int, default=1)
+    p.add_argument("--stripe-host", default="0.0.0.0", help="bind address of the fake Stripe API")
+    p.add_argument("--stripe-port", type=int, default=12111)
+    p.add_argument("--webhook-url", help="default: <target>/api/payments/webhook/")
+    p.add_argument("--webhook-secret", default="whsec_loadtest", help="must equal the app's STRIPE_WEBHOOK_SECRET")
+    p.add_argument("--fail-rate", type=float, default=0.0, help="fraction of payments that fail")
+    p.add_argument("--output", type=Path, default=Path("loadtest-report.json"))
+    p.add_argument("-v", "--verbose", action="store_true")
+    args = p.parse_args(argv)
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO, format="%(levelname)s %(message)s")
+
+    webhook_url = args.webhook_url or args.target.rstrip("/") + "/api/payments/webhook/"
+    server, fake = start_server(args.stripe_host, args.stripe_port, webhook_url, args.webhook_secret,
+                                fail_rate=args.fail_rate)
+    stripe_url = f"http://127.0.0.1:{server.server_port}"
+
+    levels = [int(c) for c in args.concurrency.split(",") if c.strip()]
+    reports = []
+    try:
+        for level in levels:
+            report = run_level(args, level, stripe_url)
+            report["webhooks_sent"] = fake.webhooks.sent
+            report["webhooks_failed"] = fake.webhooks.failed
+            reports.append(report)
+            print(format_level(report))
+    finally:
+        server.shutdown()
+
+    args.output.write_text(json.dumps({"target": args.target, "levels": reports}, indent=2))
+    print(f"\nreport written to {args.output}")
+    return 0 if all(r["journeys_completed"] for r in reports) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
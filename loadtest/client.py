@@ -0,0 +1,103 @@
+# loadtest/client.py
+"""
+Tiny keep-alive JSON HTTP client (stdlib only) plus a thread-safe stats sink.
+One HttpClient per virtual user, so connections are reused like a browser would.
+"""
+import http.client
+import json
+import math
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import urlencode, urlsplit
+
+
+class HttpClient:
+    def __init__(self, base_url, timeout=30):
+        parts = urlsplit(base_url)
+        self.scheme = parts.scheme or "http"
+        self.netloc = parts.netloc
+        self.prefix = parts.path.rstrip("/")
+        self.timeout = timeout
+        self.token = None
+        self._conn = None
+
+    def _connection(self):
+        if self._conn is None:
+            cls = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+            self._conn = cls(self.netloc, timeout=self.timeout)
+        return self._conn
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def request(self, method, path, body=None, params=None):
+        """Returns (status, parsed_json_or_None, elapsed_ms)."""
+        url = self.prefix + path + (f"?{urlencode(params)}" if params else "")
+        headers = {"Accept": "application/json"}
+        data = None
+        if body is not None:
+            data = json.dumps(body).encode("utf-8")
+            headers["Content-Type"] = "application/json"
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+
+        start = time.perf_counter()
+        for attempt in (1, 2):
+            try:
+                conn = self._connection()
+                conn.request(method, url, body=data, headers=headers)
+                resp = conn.getresponse()
+                raw = resp.read()
+                break
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                # server closed the kept-alive socket; retry once on a fresh one
+                self.close()
+                if attempt == 2:
+                    raise
+        elapsed = (time.perf_counter() - start) * 1000
+        try:
+            payload = json.loads(raw) if raw else None
+        except ValueError:
+            payload = None
+        return resp.status, payload, elapsed
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    k = math.ceil(pct / 100 * len(sorted_values)) - 1
+    return sorted_values[max(0, min(len(sorted_values) - 1, k))]
+
+
+class Stats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._timings = defaultdict(list)
+        self._errors = defaultdict(int)
+        self.started = time.monotonic()
+
+    def record(self, step, ms, ok=True):
+        with self._lock:
+            self._timings[step].append(ms)
+            if not ok:
+                self._errors[step] += 1
+
+    def report(self):
+        with self._lock:
+            elapsed = max(time.monotonic() - self.started, 1e-9)
+            out = {}
+            for step, values in sorted(self._timings.items()):
+                values = sorted(values)
+                out[step] = {
+                    "count": len(values),
+                    "errors": self._errors.get(step, 0),
+                    "rps": round(len(values) / elapsed, 2),
+                    "p50_ms": round(percentile(values, 50), 2),
+                    "p95_ms": round(percentile(values, 95), 2),
+                    "p99_ms": round(percentile(values, 99), 2),
+                    "max_ms": round(values[-1], 2),
+                }
+            return {"elapsed_s": round(elapsed, 2), "steps": out}
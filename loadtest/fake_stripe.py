@@ -0,0 +1,222 @@
+# loadtest/fake_stripe.py
+"""
+Minimal local stand-in for the Stripe API, enough for the checkout flow:
+
+    POST /v1/payment_intents               create (form-encoded, like stripe-python)
+    GET  /v1/payment_intents/{id}          retrieve
+    POST /v1/payment_intents/{id}/confirm  succeed (or fail) and deliver a signed webhook
+    POST /v1/refunds                       create refund
+
+Point the app at it with STRIPE_API_BASE=http://<host>:<port> and use the
+same STRIPE_WEBHOOK_SECRET on both sides so signatures verify for real.
+
+Run standalone:  python -m loadtest.fake_stripe --port 12111 --webhook-url http://localhost/api/payments/webhook/
+"""
+import argparse
+import hashlib
+import hmac
+import json
+import logging
+import queue
+import re
+import secrets
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl
+
+log = logging.getLogger("loadtest.fake_stripe")
+
+_PI_PATH = re.compile(r"^/v1/payment_intents/(?P<id>pi_[A-Za-z0-9_]+)(?P<confirm>/confirm)?$")
+_KEY_PART = re.compile(r"\[([^\]]*)\]")
+
+
+def sign_payload(payload: str, secret: str, timestamp=None) -> str:
+    """Stripe-Signature header value: t=<ts>,v1=HMAC_SHA256(secret, "<ts>.<payload>")."""
+    ts = int(timestamp if timestamp is not None else time.time())
+    mac = hmac.new(secret.encode("utf-8"), f"{ts}.{payload}".encode("utf-8"), hashlib.sha256).hexdigest()
+    return f"t={ts},v1={mac}"
+
+
+def parse_form(body: str) -> dict:
+    """Decode stripe-python's form encoding (metadata[order_id]=1, automatic_payment_methods[enabled]=true)."""
+    out = {}
+    for key, value in parse_qsl(body, keep_blank_values=True):
+        head = key.split("[", 1)[0]
+        parts = [head] + _KEY_PART.findall(key)
+        node = out
+        for part in parts[:-1]:
+            node = node.setdefault(part, {})
+        node[parts[-1]] = value
+    return out
+
+
+class WebhookSender:
+    """Delivers events on background threads so confirm() returns immediately."""
+
+    def __init__(self, url, secret, workers=4, delay=0.0):
+        self.url = url
+        self.secret = secret
+        self.delay = delay
+        self.sent = 0
+        self.failed = 0
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        for _ in range(workers):
+            threading.Thread(target=self._loop, daemon=True).start()
+
+    def send(self, event):
+        self._queue.put((time.monotonic() + self.delay, event))
+
+    def _loop(self):
+        while True:
+            due, event = self._queue.get()
+            wait = due - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            payload = json.dumps(event, separators=(",", ":"))
+            req = urllib.request.Request(
+                self.url, data=payload.encode("utf-8"), method="POST",
+                headers={"Content-Type": "application/json", "Stripe-Signature": sign_payload(payload, self.secret)},
+            )
+            try:
+                with urllib.request.urlopen(req, timeout=30) as resp:
+                    ok = 200 <= resp.status < 300
+            except Exception as e:
+                log.warning("webhook delivery failed event=%s err=%s", event["id"], e)
+                ok = False
+            with self._lock:
+                if ok:
+                    self.sent += 1
+                else:
+                    self.failed += 1
+
+
+class FakeStripe:
+    def __init__(self, webhook_url, webhook_secret, fail_rate=0.0, webhook_delay=0.0):
+        self.intents = {}
+        self.refunds = {}
+        self.fail_rate = fail_rate
+        self.webhooks = WebhookSender(webhook_url, webhook_secret, delay=webhook_delay)
+        self._lock = threading.Lock()
+
+    def create_intent(self, form):
+        pi_id = f"pi_{secrets.token_hex(12)}"
+        pi = {
+            "id": pi_id,
+            "object": "payment_intent",
+            "amount": int(form.get("amount", 0)),
+            "currency": form.get("currency", "usd"),
+            "metadata": form.get("metadata", {}),
+            "client_secret": f"{pi_id}_secret_{secrets.token_hex(8)}",
+            "status": "requires_payment_method",
+            "created": int(time.time()),
+        }
+        with self._lock:
+            self.intents[pi_id] = pi
+        return pi
+
+    def confirm(self, pi_id):
+        with self._lock:
+            pi = self.intents[pi_id]
+            failed = secrets.randbelow(10_000) < self.fail_rate * 10_000
+            pi["status"] = "requires_payment_method" if failed else "succeeded"
+            event = {
+                "id": f"evt_{secrets.token_hex(12)}",
+                "object": "event",
+                "type": "payment_intent.payment_failed" if failed else "payment_intent.succeeded",
+                "created": int(time.time()),
+                "data": {"object": dict(pi)},
+            }
+        self.webhooks.send(event)
+        return pi
+
+    def create_refund(self, form):
+        refund = {
+            "id": f"re_{secrets.token_hex(12)}",
+            "object": "refund",
+            "payment_intent": form.get("payment_intent"),
+            "amount": int(form.get("amount", 0)),
+            "status": "succeeded",
+        }
+        with self._lock:
+            self.refunds[refund["id"]] = refund
+        return refund
+
+
+def make_handler(stripe):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, fmt, *args):
+            log.debug(fmt, *args)
+
+        def _body(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            return self.rfile.read(length).decode("utf-8") if length else ""
+
+        def _reply(self, status, obj):
+            data = json.dumps(obj).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.send_header("Request-Id", f"req_{secrets.token_hex(6)}")
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _not_found(self):
+            self._reply(404, {"error": {"type": "invalid_request_error", "message": f"No such path: {self.path}"}})
+
+        def do_GET(self):
+            m = _PI_PATH.match(self.path.split("?", 1)[0])
+            if not m or m.group("confirm"):
+                return self._not_found()
+            pi = stripe.intents.get(m.group("id"))
+            if pi is None:
+                return self._not_found()
+            self._reply(200, pi)
+
+        def do_POST(self):
+            path = self.path.split("?", 1)[0]
+            form = parse_form(self._body())
+            if path == "/v1/payment_intents":
+                return self._reply(200, stripe.create_intent(form))
+            if path == "/v1/refunds":
+                return self._reply(200, stripe.create_refund(form))
+            m = _PI_PATH.match(path)
+            if m and m.group("confirm") and m.group("id") in stripe.intents:
+                return self._reply(200, stripe.confirm(m.group("id")))
+            self._not_found()
+
+    return Handler
+
+
+def start_server(host, port, webhook_url, webhook_secret, fail_rate=0.0, webhook_delay=0.0):
+    """Start the fake API on a daemon thread; returns (server, FakeStripe)."""
+    stripe = FakeStripe(webhook_url, webhook_secret, fail_rate=fail_rate, webhook_delay=webhook_delay)
+    server = ThreadingHTTPServer((host, port), make_handler(stripe))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    log.info("fake stripe listening on http://%s:%s -> webhooks %s", host, server.server_port, webhook_url)
+    return server, stripe
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Run the fake Stripe API")
+    p.add_argument("--host", default="0.0.0.0")
+    p.add_argument("--port", type=int, default=12111)
+    p.add_argument("--webhook-url", default="http://localhost/api/payments/webhook/")
+    p.add_argument("--webhook-secret", default="whsec_loadtest")
+    p.add_argument("--fail-rate", type=float, default=0.0)
+    args = p.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    server, _ = start_server(args.host, args.port, args.webhook_url, args.webhook_secret, args.fail_rate)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# loadtest/journeys.py
+"""
+Realistic user journeys against the running stack:
+
+    signup -> login -> browse categories/products -> add to cart -> view cart
+    -> create order -> create PaymentIntent -> pay (fake Stripe confirm)
+    -> wait until the signed webhook marks the order paid
+
+Every HTTP call is recorded under a step name; "payment_to_paid" measures
+confirm -> order visible as paid (webhook delivery + processing).
+"""
+import secrets
+import time
+
+
+class JourneyError(Exception):
+    pass
+
+
+class VirtualUser:
+    def __init__(self, client, stripe_client, stats, rng, paid_timeout=30.0, poll_every=0.25):
+        self.client = client
+        self.stripe = stripe_client
+        self.stats = stats
+        self.rng = rng
+        self.paid_timeout = paid_timeout
+        self.poll_every = poll_every
+        self.email = f"load-{secrets.token_hex(6)}@example.com"
+        self.password = f"Load-{secrets.token_hex(6)}!"
+
+    def _call(self, step, method, path, body=None, params=None, expect=(200,)):
+        status, data, ms = self.client.request(method, path, body=body, params=params)
+        ok = status in expect
+        self.stats.record(step, ms, ok)
+        if not ok:
+            raise JourneyError(f"{step}: HTTP {status} {str(data)[:200]}")
+        return data
+
+    def signup_and_login(self):
+        self._call("signup", "POST", "/api/auth/signup",
+                   {"email": self.email, "password": self.password, "first_name": "Load", "last_name": "Test"},
+                   expect=(201,))
+        self.login()
+
+    def login(self):
+        data = self._call("login", "POST", "/api/auth/login", {"email": self.email, "password": self.password})
+        self.client.token = data["access"]
+
+    def browse(self):
+        categories = self._call("list_categories", "GET", "/api/categories/") or []
+        params = {"in_stock": "true", "ordering": self.rng.choice(["price", "-price", "-created_at"])}
+        if categories:
+            params["category"] = self.rng.choice(categories)["id"]
+        products = self._call("list_products", "GET", "/api/products/", params=params) or []
+        if self.rng.random() < 0.3:
+            self._call("search_products", "GET", "/api/products/",
+                       params={"search": self.rng.choice(["pro", "mini", "max", "eco", "smart"])})
+        if not products:
+            raise JourneyError("browse: no products in stock")
+        product = self.rng.choice(products)
+        return self._call("product_detail", "GET", f"/api/products/{product['id']}/")
+
+    def checkout(self):
+        product = self.browse()
+        self._call("cart_add", "POST", "/api/cart/items/", {"product_id": product["id"], "qty": 1}, expect=(201,))
+        self._call("cart_get", "GET", "/api/cart/")
+        order = self._call("create_order", "POST", "/api/checkout/create-order/", {}, expect=(200, 201))
+        intent = self._call("create_intent", "POST", "/api/payments/create-intent/", {"order_id": order["id"]})
+        self.pay(order["id"], intent["payment_intent_id"])
+
+    def pay(self, order_id, payment_intent_id):
+        status, data, ms = self.stripe.request("POST", f"/v1/payment_intents/{payment_intent_id}/confirm")
+        self.stats.record("stripe_confirm", ms, status == 200)
+        if status != 200:
+            raise JourneyError(f"stripe_confirm: HTTP {status}")
+
+        started = time.perf_counter()
+        deadline = time.monotonic() + self.paid_timeout
+        while time.monotonic() < deadline:
+            order = self._call("poll_order", "GET", f"/api/orders/{order_id}/")
+            if order["status"] in ("paid", "failed"):
+                self.stats.record("payment_to_paid", (time.perf_counter() - started) * 1000, order["status"] == "paid")
+                return
+            time.sleep(self.poll_every)
+        self.stats.record("payment_to_paid", (time.perf_counter() - started) * 1000, ok=False)
+        raise JourneyError(f"order {order_id} not paid after {self.paid_timeout}s")
@@ -0,0 +1,38 @@
+# loadtest/seed.py
+"""
+Seed the *configured* database (not a test DB) with load-test data.
+Run inside the web container:  python -m loadtest.seed --products 5000
+"""
+import argparse
+import os
+import sys
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description=__doc__)
+    p.add_argument("--categories", type=int, default=20)
+    p.add_argument("--products", type=int, default=5000)
+    p.add_argument("--users", type=int, default=20)
+    p.add_argument("--seed", type=int, default=42)
+    args = p.parse_args(argv)
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ecom.settings.dev")
+    import django
+    django.setup()
+
+    from django.db import transaction
+    from benchmarks.seed import seed_dataset
+    from catalog.models import Category
+
+    if Category.objects.filter(slug="category-000").exists():
+        print("load-test data already present; nothing to do")
+        return 0
+    with transaction.atomic():
+        ds = seed_dataset(categories=args.categories, products=args.products, users=args.users,
+                          orders_per_user=1, seed=args.seed)
+    print(f"seeded {len(ds.category_ids)} categories, {len(ds.product_ids)} in-stock products, {len(ds.users)} users")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
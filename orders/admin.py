@@ -1,6 +1,8 @@
 # orders/admin.py
 from django.contrib import admin
-from .models import Order, OrderItem
+
+from ecom.admin import LargeTableAdmin
+from .models import ArchivedOrder, ArchivedOrderItem, Order, OrderItem
 
 
 class OrderItemInline(admin.TabularInline):
@@ -12,7 +14,7 @@ class OrderItemInline(admin.TabularInline):
 
 
 @admin.register(Order)
-class OrderAdmin(admin.ModelAdmin):
+class OrderAdmin(LargeTableAdmin, admin.ModelAdmin):
     list_display = (
         "id",
         "public_id",
@@ -23,15 +25,16 @@ class OrderAdmin(admin.ModelAdmin):
         "payment_intent_id",
         "created_at",
     )
+    list_select_related = ("user",)
     list_filter = ("status", "currency", "created_at")
-    search_fields = ("public_id", "payment_intent_id", "user__email")
+    search_fields = ("=public_id", "payment_intent_id", "user__email")  # exact / prefix (LargeTableAdmin)
     readonly_fields = ("public_id", "created_at", "updated_at")
     ordering = ("-id",)
     inlines = [OrderItemInline]
 
 
 @admin.register(OrderItem)
-class OrderItemAdmin(admin.ModelAdmin):
+class OrderItemAdmin(LargeTableAdmin, admin.ModelAdmin):
     list_display = (
         "id",
         "order",
@@ -43,8 +46,45 @@ class OrderItemAdmin(admin.ModelAdmin):
         "line_total",
         "created_at",
     )
+    list_select_related = ("order",)
     list_filter = ("created_at",)
-    search_fields = ("sku", "title", "order__public_id", "order__payment_intent_id")
+    search_fields = ("sku", "=order__public_id", "=order__payment_intent_id")
     readonly_fields = ("created_at",)
     ordering = ("-id",)
     autocomplete_fields = ("order",)  # only valid FK here
+
+
+class ArchivedOrderItemInline(admin.TabularInline):
+    model = ArchivedOrderItem
+    extra = 0
+    fields = ("product_id", "sku", "title", "qty", "unit_price", "line_total")
+    ordering = ("id",)
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ArchivedOrder)
+class ArchivedOrderAdmin(LargeTableAdmin, admin.ModelAdmin):
+    """Read-only: rows are written by manage.py archive_orders."""
+    list_display = ("id", "public_id", "user", "status", "currency", "total_amount", "created_at", "archived_at")
+    list_select_related = ("user",)
+    list_filter = ("status", "currency")
+    search_fields = ("=public_id", "=payment_intent_id", "user__email")
+    ordering = ("-id",)
+    inlines = [ArchivedOrderItemInline]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,55 @@
+# orders/archive.py
+"""
+Archival of finished orders.
+
+archive_batch() moves up to `batch_size` paid/canceled/failed orders created
+before a cutoff (and their lines) from orders_order/orders_orderitem into
+orders_archivedorder/orders_archivedorderitem in one short transaction, so
+the live tables (staff lists, admin) stay small. Primary keys and columns are
+kept, which lets the API fall back to the archive transparently:
+OrderViewSet lists/retrieves, the status endpoints, the export and the sales
+rollup rebuild all read both.
+"""
+import logging
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import ArchivedOrder, ArchivedOrderItem, Order, OrderItem
+
+log = logging.getLogger("orders.archive")
+
+ARCHIVABLE_STATUSES = (Order.STATUS_PAID, Order.STATUS_CANCELED, Order.STATUS_FAILED)
+_ORDER_COLUMNS = [f.attname for f in Order._meta.concrete_fields]
+_ITEM_COLUMNS = [f.attname for f in OrderItem._meta.concrete_fields]
+
+# (order model, item model) pairs holding orders, live first
+SOURCES = ((Order, OrderItem), (ArchivedOrder, ArchivedOrderItem))
+
+
+def archivable(before):
+    return Order.objects.filter(status__in=ARCHIVABLE_STATUSES, created_at__lt=before)
+
+
+def archive_batch(before, batch_size=500):
+    """Move one batch; returns (orders, items) moved. (0, 0) means nothing is left."""
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(archivable(before).order_by("id").values_list("id", flat=True)[:batch_size])
+        if not ids:
+            return 0, 0
+        # Lock the rows (and re-check them) so a concurrent status change waits or wins
+        orders = list(
+            Order.objects.select_for_update()
+            .filter(id__in=ids, status__in=ARCHIVABLE_STATUSES)
+            .values(*_ORDER_COLUMNS)
+        )
+        ids = [o["id"] for o in orders]
+        items = list(OrderItem.objects.filter(order_id__in=ids).values(*_ITEM_COLUMNS))
+
+        ArchivedOrder.objects.bulk_create([ArchivedOrder(archived_at=now, **o) for o in orders])
+        ArchivedOrderItem.objects.bulk_create([ArchivedOrderItem(**i) for i in items], batch_size=1000)
+        OrderItem.objects.filter(order_id__in=ids).delete()
+        Order.objects.filter(id__in=ids).delete()
+    log.info("Archived orders=%s items=%s last_id=%s", len(orders), len(items), ids[-1] if ids else None)
+    return len(orders), len(items)
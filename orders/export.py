@@ -0,0 +1,167 @@
+# orders/export.py
+"""
+Order export for finance: one row per order line (orders without lines get a
+single row with empty item columns), streamed as CSV or JSONL.
+
+Rows come from an Order LEFT JOIN OrderItem query (archived orders first,
+from the same join over the archive tables) read with
+`.iterator(chunk_size=...)` (a server-side cursor on PostgreSQL), and output is
+produced in small byte chunks, optionally gzip-compressed on the fly, so
+memory stays flat no matter how many rows are exported.
+
+Used by GET /api/orders/export/ (staff) and `manage.py export_orders`.
+"""
+import csv
+import datetime
+import io
+import zlib
+from itertools import chain
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.renderers import BaseRenderer
+
+from ecom.renderers import dumps
+from .models import ArchivedOrder, Order
+
+# (output column, Order lookup)
+COLUMNS = (
+    ("order_id", "id"),
+    ("order_public_id", "public_id"),
+    ("user_id", "user_id"),
+    ("user_email", "user__email"),
+    ("status", "status"),
+    ("currency", "currency"),
+    ("subtotal_amount", "subtotal_amount"),
+    ("tax_amount", "tax_amount"),
+    ("shipping_amount", "shipping_amount"),
+    ("total_amount", "total_amount"),
+    ("payment_intent_id", "payment_intent_id"),
+    ("created_at", "created_at"),
+    ("paid_at", "paid_at"),
+    ("item_id", "items__id"),
+    ("product_id", "items__product_id"),
+    ("sku", "items__sku"),
+    ("title", "items__title"),
+    ("unit_price", "items__unit_price"),
+    ("qty", "items__qty"),
+    ("line_total", "items__line_total"),
+)
+HEADER = tuple(name for name, _ in COLUMNS)
+FORMATS = ("csv", "jsonl")
+
+DEFAULT_CHUNK_SIZE = 2000
+# Bytes buffered before a chunk is handed to the response / file
+FLUSH_BYTES = 64 * 1024
+
+
+class _ExportRenderer(BaseRenderer):
+    """
+    Content negotiation for the export action (?format=csv|jsonl or Accept).
+    The export body is streamed by the view; only error responses are
+    rendered here (as JSON).
+    """
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return b"" if data is None else dumps(data)
+
+
+class CSVRenderer(_ExportRenderer):
+    media_type = "text/csv"
+    format = "csv"
+
+
+class JSONLRenderer(_ExportRenderer):
+    media_type = "application/x-ndjson"
+    format = "jsonl"
+
+
+def parse_bound(value, name):
+    """Date or datetime string -> aware datetime (dates mean midnight). Raises ValueError."""
+    dt = parse_datetime(value)
+    if dt is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f"{name}: expected YYYY-MM-DD or an ISO 8601 datetime")
+        dt = datetime.datetime.combine(day, datetime.time.min)
+    if timezone.is_naive(dt):
+        dt = timezone.make_aware(dt)
+    return dt
+
+
+def export_queryset(created_from=None, created_to=None, statuses=None, model=Order):
+    """values_list() rows in COLUMNS order; created_from inclusive, created_to exclusive."""
+    qs = model.objects.all()
+    if created_from is not None:
+        qs = qs.filter(created_at__gte=created_from)
+    if created_to is not None:
+        qs = qs.filter(created_at__lt=created_to)
+    if statuses:
+        qs = qs.filter(status__in=statuses)
+    return qs.order_by("id", "items__id").values_list(*(lookup for _, lookup in COLUMNS))
+
+
+def _text(value):
+    if value is None:
+        return ""
+    if isinstance(value, datetime.datetime):
+        text = value.astimezone(datetime.timezone.utc).isoformat()
+        return text[:-6] + "Z"
+    return str(value)
+
+
+def iter_csv(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(HEADER)
+    for row in rows:
+        writer.writerow([_text(v) for v in row])
+        if buffer.tell() >= FLUSH_BYTES:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode()
+
+
+def _json_value(value):
+    # Same formatting as the API: decimals/UUIDs/datetimes as strings
+    if value is None or isinstance(value, int):
+        return value
+    return _text(value)
+
+
+def iter_jsonl(rows):
+    parts, size = [], 0
+    for row in rows:
+        line = dumps({name: _json_value(v) for name, v in zip(HEADER, row)}) + b"\n"
+        parts.append(line)
+        size += len(line)
+        if size >= FLUSH_BYTES:
+            yield b"".join(parts)
+            parts, size = [], 0
+    yield b"".join(parts)
+
+
+def gzip_chunks(chunks, level=6):
+    """Compress a byte stream on the fly (gzip container)."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_chunks(fmt, created_from=None, created_to=None, statuses=None,
+                  chunk_size=DEFAULT_CHUNK_SIZE, compress=False):
+    """Byte chunks of the whole export."""
+    rows = chain.from_iterable(
+        export_queryset(created_from, created_to, statuses, model).iterator(chunk_size=chunk_size)
+        for model in (ArchivedOrder, Order)
+    )
+    chunks = iter_csv(rows) if fmt == "csv" else iter_jsonl(rows)
+    return gzip_chunks(chunks) if compress else chunks
+
+
+def export_filename(fmt, compress=False):
+    stamp = timezone.now().strftime("%Y%m%d-%H%M%S")
+    return f"orders-{stamp}.{fmt}" + (".gz" if compress else "")
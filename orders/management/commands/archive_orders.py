@@ -0,0 +1,56 @@
+# orders/management/commands/archive_orders.py
+"""
+Move finished (paid/canceled/failed) orders created before a cutoff into the
+archive tables, in bounded batches (one short transaction each).
+
+    python manage.py archive_orders --before 2024-01-01 --batch-size 500
+    python manage.py archive_orders --older-than-days 365 --dry-run
+"""
+import datetime
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from orders.archive import archivable, archive_batch
+from orders.export import parse_bound
+
+
+class Command(BaseCommand):
+    help = "Archive finished orders older than a cutoff (live tables -> archive tables)."
+
+    def add_arguments(self, parser):
+        cutoff = parser.add_mutually_exclusive_group(required=True)
+        cutoff.add_argument("--before", help="created_at < this (YYYY-MM-DD or ISO datetime)")
+        cutoff.add_argument("--older-than-days", type=int)
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--max-batches", type=int, default=None, help="stop after this many batches")
+        parser.add_argument("--sleep", type=float, default=0.0, help="pause between batches (s), to go easy on the DB")
+        parser.add_argument("--dry-run", action="store_true", help="only count what would be archived")
+
+    def handle(self, *args, **options):
+        if options["before"]:
+            try:
+                before = parse_bound(options["before"], "--before")
+            except ValueError as e:
+                raise CommandError(str(e))
+        else:
+            before = timezone.now() - datetime.timedelta(days=options["older_than_days"])
+
+        if options["dry_run"]:
+            self.stdout.write(f"{archivable(before).count()} orders created before {before.isoformat()} would be archived")
+            return
+
+        batches = orders = items = 0
+        while options["max_batches"] is None or batches < options["max_batches"]:
+            moved_orders, moved_items = archive_batch(before, batch_size=options["batch_size"])
+            if not moved_orders:
+                break
+            batches += 1
+            orders += moved_orders
+            items += moved_items
+            if options["verbosity"] > 1:
+                self.stdout.write(f"  batch {batches}: {moved_orders} orders, {moved_items} items")
+            if options["sleep"]:
+                time.sleep(options["sleep"])
+        self.stdout.write(self.style.SUCCESS(f"Archived {orders} orders ({items} items) in {batches} batches"))
@@ -0,0 +1,46 @@
+# orders/management/commands/relay_order_events.py
+"""
+Publish the order event outbox to ORDER_EVENTS_SINK (see orders/outbox.py).
+
+    python manage.py relay_order_events --follow --metrics-port 9108   # long-running service
+    python manage.py relay_order_events --sink file                    # drain once, e.g. locally
+    python manage.py relay_order_events --prune --days 7               # cron, e.g. daily
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from orders import outbox
+
+
+class Command(BaseCommand):
+    help = "Publish pending order events to the configured sink (at least once)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sink", help='"file", "redis", "webhook" or a dotted class path (default: ORDER_EVENTS_SINK)')
+        parser.add_argument("--batch-size", type=int, default=settings.ORDER_EVENTS_BATCH_SIZE)
+        parser.add_argument("--follow", action="store_true", help="keep polling, retrying sink failures with backoff")
+        parser.add_argument("--interval", type=float, default=settings.ORDER_EVENTS_POLL_INTERVAL,
+                            help="poll interval when idle with --follow (s)")
+        parser.add_argument("--max-batches", type=int, default=None, help="stop after this many batches")
+        parser.add_argument("--metrics-port", type=int, default=None,
+                            help="serve Prometheus metrics (throughput, failures, lag) on this port")
+        parser.add_argument("--prune", action="store_true", help="only delete published events past the retention")
+        parser.add_argument("--days", type=int, default=settings.ORDER_EVENTS_RETENTION_DAYS)
+
+    def handle(self, *args, **options):
+        if options["prune"]:
+            deleted = outbox.prune_published(options["days"])
+            self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} order events published over {options['days']} days ago"))
+            return
+        if options["metrics_port"]:
+            from prometheus_client import start_http_server
+            start_http_server(options["metrics_port"])
+        sink = outbox.get_sink(options["sink"])
+        try:
+            stats = outbox.relay(
+                sink, batch_size=options["batch_size"], follow=options["follow"],
+                interval=options["interval"], max_batches=options["max_batches"],
+            )
+        except outbox.RelayError as e:
+            raise CommandError(str(e))
+        self.stdout.write(self.style.SUCCESS(f"Order event relay done: {stats}"))
@@ -0,0 +1,23 @@
+from django.db import migrations
+from django.db.models import DecimalField, ExpressionWrapper, F
+
+
+def backfill_line_total(apps, schema_editor):
+    # Items created before line_total was stored kept the column default (0).
+    OrderItem = apps.get_model("orders", "OrderItem")
+    OrderItem.objects.filter(line_total=0, qty__gt=0, unit_price__gt=0).update(
+        line_total=ExpressionWrapper(
+            F("unit_price") * F("qty"), output_field=DecimalField(max_digits=12, decimal_places=2)
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0003_alter_order_public_id'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_line_total, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:29
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0004_backfill_orderitem_line_total'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedOrder',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('public_id', models.UUIDField(unique=True)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('paid', 'Paid'), ('failed', 'Failed'), ('canceled', 'Canceled')], max_length=20)),
+                ('currency', models.CharField(max_length=10)),
+                ('subtotal_amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('tax_amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('shipping_amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('total_amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('payment_intent_id', models.CharField(blank=True, max_length=255)),
+                ('paid_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField()),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_orders', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedOrderItem',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('product_id', models.IntegerField()),
+                ('sku', models.CharField(max_length=64)),
+                ('title', models.CharField(max_length=255)),
+                ('unit_price', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('qty', models.PositiveIntegerField()),
+                ('line_total', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('created_at', models.DateTimeField()),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='orders.archivedorder')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='archivedorder',
+            index=models.Index(fields=['created_at'], name='archived_order_created_at'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:36
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0005_archived_orders'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['payment_intent_id'], name='order_pi_prefix', opclasses=['varchar_pattern_ops']),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0007_order_event'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='orderevent',
+            name='held',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -1,4 +1,6 @@
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models, transaction
+from django.db.models import Q
 from django.utils import timezone
 import uuid
 
@@ -28,6 +30,12 @@ class Order(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # admin prefix search (LIKE 'term%'); opclasses only apply on PostgreSQL
+            models.Index(fields=["payment_intent_id"], name="order_pi_prefix", opclasses=["varchar_pattern_ops"]),
+        ]
+
     @transaction.atomic
     def mark_paid_and_decrement_stock(self):
         """
@@ -39,6 +47,8 @@ class Order(models.Model):
 
         # Lock order rows
         order = Order.objects.select_for_update().get(pk=self.pk)
+        if order.status == self.STATUS_PAID:
+            return  # paid concurrently while we waited for the lock
 
         # Lock all involved products before decrement
         from catalog.models import Product
@@ -47,20 +57,29 @@ class Order(models.Model):
         products = {p.id: p for p in Product.objects.select_for_update().filter(id__in=product_ids)}
 
         # Validate stock and decrement
+        now = timezone.now()
         for row in item_qs:
             p = products[row["product_id"]]
             need = int(row["qty"])
             if p.stock_qty < need:
                 raise ValueError(f"Insufficient stock for product id={p.id}")
             p.stock_qty = p.stock_qty - need
+            p.updated_at = now  # bulk_update bypasses Product.save(); keep ETags honest
 
-        # Persist product updates
-        Product.objects.bulk_update(products.values(), ["stock_qty"])
+        # Persist product updates (also logged to catalog_change, which invalidates
+        # the catalog caches and nav counts of products now out of stock)
+        Product.objects.bulk_update(products.values(), ["stock_qty", "updated_at"])
 
         # Mark paid
         order.status = Order.STATUS_PAID
         order.paid_at = timezone.now()
         order.save(update_fields=["status", "paid_at", "updated_at"])
+        from .outbox import record_event
+        record_event(order, OrderEvent.TYPE_PAID)
+
+        # Sales rollups (no-op unless ANALYTICS_ROLLUP_MODE == "inline")
+        from analytics.rollups import record_paid_order
+        record_paid_order(order)
 
 
 class OrderItem(models.Model):
@@ -72,3 +91,72 @@ class OrderItem(models.Model):
     qty = models.PositiveIntegerField(default=1)
     line_total = models.DecimalField(max_digits=12, decimal_places=2, default=0)  # ← add default
     created_at = models.DateTimeField(auto_now_add=True)
+
+
+class OrderEvent(models.Model):
+    """
+    Outbox row for an order state change, written in the transaction making
+    the change and published by manage.py relay_order_events (orders/outbox.py).
+    Held rows (an external call still in flight, e.g. a Stripe refund) are not
+    published until released.
+    """
+    TYPE_CREATED = "order.created"
+    TYPE_PAID = "order.paid"
+    TYPE_PAYMENT_FAILED = "order.payment_failed"
+    TYPE_REFUNDED = "order.refunded"
+
+    order_id = models.BigIntegerField()  # no FK: events outlive archived orders
+    type = models.CharField(max_length=40)
+    data = models.JSONField(encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(default=timezone.now)
+    published_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True, default="")
+    held = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [
+            # the relay's queue: small, as published rows drop out of it
+            models.Index(fields=["id"], condition=Q(published_at__isnull=True), name="order_event_unpublished"),
+            models.Index(fields=["published_at"], name="order_event_published_at"),
+        ]
+
+    def __str__(self):
+        return f"{self.type} order={self.order_id} ({self.id})"
+
+
+class ArchivedOrder(models.Model):
+    """
+    Read-only copy of a finished Order moved out of the live table by
+    `manage.py archive_orders` (see orders/archive.py). Same column names and
+    primary keys as Order, so lookups and serializers work on either.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey("users.User", on_delete=models.CASCADE, related_name="archived_orders")
+    public_id = models.UUIDField(unique=True)
+    status = models.CharField(max_length=20, choices=Order.STATUS_CHOICES)
+    currency = models.CharField(max_length=10)
+    subtotal_amount = models.DecimalField(max_digits=12, decimal_places=2)
+    tax_amount = models.DecimalField(max_digits=12, decimal_places=2)
+    shipping_amount = models.DecimalField(max_digits=12, decimal_places=2)
+    total_amount = models.DecimalField(max_digits=12, decimal_places=2)
+    payment_intent_id = models.CharField(max_length=255, blank=True)
+    paid_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [models.Index(fields=["created_at"], name="archived_order_created_at")]
+
+
+class ArchivedOrderItem(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    order = models.ForeignKey(ArchivedOrder, related_name="items", on_delete=models.CASCADE)
+    product_id = models.IntegerField()
+    sku = models.CharField(max_length=64)
+    title = models.CharField(max_length=255)
+    unit_price = models.DecimalField(max_digits=12, decimal_places=2)
+    qty = models.PositiveIntegerField()
+    line_total = models.DecimalField(max_digits=12, decimal_places=2)
+    created_at = models.DateTimeField()
@@ -0,0 +1,309 @@
+# orders/outbox.py
+"""
+Order event outbox for downstream systems (fulfillment, CRM...).
+
+record_event() adds an OrderEvent row in the caller's transaction, so an
+event exists exactly when the state change it describes committed:
+- order.created         CreateOrderView (with the item snapshot)
+- order.paid            Order.mark_paid_and_decrement_stock()
+- order.payment_failed  StripeWebhookView
+- order.refunded        CreateRefundView: written held before the Stripe call,
+                        released once Stripe accepted the refund (see
+                        payments/refunds.py, which also settles held events
+                        left behind by a crash)
+
+manage.py relay_order_events publishes unpublished events oldest first, in
+batches, to the sink named by ORDER_EVENTS_SINK:
+- "file":    JSON lines appended to ORDER_EVENTS_FILE (local testing)
+- "redis":   XADD to the Redis stream ORDER_EVENTS_STREAM
+- "webhook": POST {"events": [...]} to ORDER_EVENTS_WEBHOOK_URL, signed with
+             ORDER_EVENTS_WEBHOOK_SECRET
+- or the dotted path of a class with publish(events)
+
+Delivery is at least once: a batch is marked published only after the sink
+accepted it, so a relay that dies in between publishes it again (consumers
+dedupe on the event id). A failing sink is retried with exponential backoff
+and events are never skipped, so with one relay running the events of an
+order arrive in order (a held event is published when released, after any
+later events). Batches are claimed with SELECT ... FOR UPDATE SKIP LOCKED:
+extra relays add throughput, at the cost of that ordering.
+
+A batch's row locks and transaction stay open while the sink is called, so
+a slow sink keeps a transaction open for up to its timeout
+(ORDER_EVENTS_WEBHOOK_TIMEOUT, 5s for Redis). This is what makes "published"
+and "marked published" one step for concurrent relays; it blocks nothing
+else (new events are inserts, other relays skip locked rows), so the cost is
+one long-ish transaction per relay, not contention.
+"""
+import datetime
+import hashlib
+import hmac
+import logging
+import os
+import random
+import time
+import urllib.request
+
+import orjson
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from prometheus_client import Counter, Gauge, Histogram
+
+from .models import OrderEvent
+
+log = logging.getLogger("orders.outbox")
+
+EVENTS_PUBLISHED = Counter("ecom_order_events_published", "Order events accepted by the sink", ["sink", "type"])
+PUBLISH_FAILURES = Counter("ecom_order_events_publish_failures", "Order event batches the sink rejected", ["sink"])
+PUBLISH_BATCH_SECONDS = Histogram(
+    "ecom_order_events_batch_duration_seconds",
+    "Duration of publishing one order event batch",
+    ["sink"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+EVENTS_LAG = Gauge(
+    "ecom_order_events_lag_seconds",
+    "Age of the oldest unpublished order event",
+    multiprocess_mode="max",
+)
+
+
+def order_data(order, **extra):
+    data = {
+        "order_id": order.id,
+        "public_id": str(order.public_id),
+        "user_id": order.user_id,
+        "status": order.status,
+        "currency": order.currency,
+        "total_amount": str(order.total_amount),
+        "payment_intent_id": order.payment_intent_id,
+        "paid_at": order.paid_at.isoformat() if order.paid_at else None,
+    }
+    data.update(extra)
+    return data
+
+
+def record_event(order, event_type, held=False, **extra):
+    """
+    Add an event for `order` (its current state plus `extra`) to the outbox,
+    in the current transaction. A `held` event is not published until
+    release_event().
+    """
+    return OrderEvent.objects.create(order_id=order.id, type=event_type, held=held,
+                                     data=order_data(order, **extra))
+
+
+def release_event(event_id, **extra):
+    """Add `extra` to a held event's data and let the relay publish it; False if it is not held."""
+    with transaction.atomic():
+        event = OrderEvent.objects.select_for_update().filter(id=event_id, held=True).first()
+        if event is None:
+            return False
+        event.data.update(extra)
+        event.held = False
+        event.save(update_fields=["data", "held"])
+    return True
+
+
+def as_dict(event):
+    return {
+        "id": event.id,
+        "type": event.type,
+        "order_id": event.order_id,
+        "created_at": event.created_at.isoformat(),
+        "data": event.data,
+    }
+
+
+class FileSink:
+    name = "file"
+
+    def __init__(self, path=None):
+        self.path = path or settings.ORDER_EVENTS_FILE
+
+    def publish(self, events):
+        with open(self.path, "ab") as f:
+            f.write(b"".join(orjson.dumps(event) + b"\n" for event in events))
+            f.flush()
+            os.fsync(f.fileno())
+
+
+class RedisStreamSink:
+    name = "redis"
+
+    def __init__(self, url=None, stream=None, maxlen=None):
+        import redis
+        self.stream = stream or settings.ORDER_EVENTS_STREAM
+        self.maxlen = maxlen or settings.ORDER_EVENTS_STREAM_MAXLEN
+        self._redis = redis.Redis.from_url(url or settings.ORDER_EVENTS_REDIS_URL, socket_timeout=5)
+
+    def publish(self, events):
+        pipe = self._redis.pipeline(transaction=False)
+        for event in events:
+            pipe.xadd(
+                self.stream,
+                {"id": event["id"], "type": event["type"], "order_id": event["order_id"], "event": orjson.dumps(event)},
+                maxlen=self.maxlen, approximate=True,
+            )
+        pipe.execute()
+
+
+class WebhookSink:
+    """POST the batch as JSON; X-Order-Events-Signature is HMAC-SHA256 of "<timestamp>.<body>"."""
+    name = "webhook"
+
+    def __init__(self, url=None, secret=None, timeout=None):
+        self.url = url or settings.ORDER_EVENTS_WEBHOOK_URL
+        self.secret = secret if secret is not None else settings.ORDER_EVENTS_WEBHOOK_SECRET
+        self.timeout = timeout or settings.ORDER_EVENTS_WEBHOOK_TIMEOUT
+
+    def publish(self, events):
+        body = orjson.dumps({"events": events})
+        timestamp = str(int(time.time()))
+        headers = {"Content-Type": "application/json", "X-Order-Events-Timestamp": timestamp}
+        if self.secret:
+            digest = hmac.new(self.secret.encode(), timestamp.encode() + b"." + body, hashlib.sha256).hexdigest()
+            headers["X-Order-Events-Signature"] = f"sha256={digest}"
+        request = urllib.request.Request(self.url, data=body, headers=headers, method="POST")
+        # urlopen raises HTTPError for 4xx/5xx
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+SINKS = {
+    "file": "orders.outbox.FileSink",
+    "redis": "orders.outbox.RedisStreamSink",
+    "webhook": "orders.outbox.WebhookSink",
+}
+
+
+def get_sink(name=None):
+    name = name or settings.ORDER_EVENTS_SINK
+    return import_string(SINKS.get(name, name))()
+
+
+class RelayError(Exception):
+    pass
+
+
+def publish_batch(sink, batch_size=None):
+    """
+    Publish the next batch of unpublished events; returns its size (0: none
+    pending). Raises RelayError, with the attempt recorded on the events, when
+    the sink fails.
+    """
+    batch_size = batch_size or settings.ORDER_EVENTS_BATCH_SIZE
+    sink_name = getattr(sink, "name", type(sink).__name__)
+    error = None
+    with transaction.atomic():
+        events = list(
+            OrderEvent.objects.select_for_update(skip_locked=True)
+            .filter(published_at__isnull=True, held=False).order_by("id")[:batch_size]
+        )
+        if not events:
+            return 0
+        ids = [event.id for event in events]
+        start = time.perf_counter()
+        try:
+            sink.publish([as_dict(event) for event in events])
+        except Exception as e:
+            error = e
+            PUBLISH_FAILURES.labels(sink=sink_name).inc()
+            OrderEvent.objects.filter(id__in=ids).update(attempts=F("attempts") + 1, last_error=repr(e)[:1000])
+        else:
+            OrderEvent.objects.filter(id__in=ids).update(
+                published_at=timezone.now(), attempts=F("attempts") + 1, last_error="",
+            )
+            for event in events:
+                EVENTS_PUBLISHED.labels(sink=sink_name, type=event.type).inc()
+        finally:
+            PUBLISH_BATCH_SECONDS.labels(sink=sink_name).observe(time.perf_counter() - start)
+    if error is not None:
+        raise RelayError(f"{sink_name} sink failed for events {ids[0]}..{ids[-1]}: {error!r}") from error
+    return len(events)
+
+
+def update_lag():
+    oldest = (OrderEvent.objects.filter(published_at__isnull=True, held=False)
+              .order_by("id").values_list("created_at", flat=True).first())
+    lag = (timezone.now() - oldest).total_seconds() if oldest else 0.0
+    EVENTS_LAG.set(lag)
+    return lag
+
+
+def backoff_delay(failures):
+    """Seconds to wait after `failures` consecutive sink failures (exponential, jittered, capped)."""
+    delay = min(settings.ORDER_EVENTS_BACKOFF_BASE * 2 ** (failures - 1), settings.ORDER_EVENTS_BACKOFF_MAX)
+    return delay * random.uniform(0.5, 1.0)
+
+
+class RelayStats:
+    __slots__ = ("batches", "events", "failures", "seconds")
+
+    def __init__(self):
+        self.batches = self.events = self.failures = 0
+        self.seconds = 0.0
+
+    @property
+    def rate(self):
+        return self.events / self.seconds if self.seconds else 0.0
+
+    def __str__(self):
+        return (f"batches={self.batches} events={self.events} failures={self.failures} "
+                f"rate={self.rate:.1f}/s")
+
+
+def relay(sink, batch_size=None, follow=False, interval=1.0, max_batches=None, sleep=time.sleep):
+    """
+    Publish pending events until none are left (or forever with `follow`,
+    polling every `interval` seconds). Sink failures are retried after
+    backoff_delay(); without `follow` the first failure is raised.
+    """
+    stats = RelayStats()
+    failures = 0
+    started = time.perf_counter()
+    burst = None  # (start, events) of the current run of non-empty batches, for the throughput log
+    while max_batches is None or stats.batches < max_batches:
+        try:
+            published = publish_batch(sink, batch_size)
+        except RelayError as e:
+            stats.failures += 1
+            failures += 1
+            if not follow:
+                raise
+            delay = backoff_delay(failures)
+            log.warning("Order event relay failure #%s, retrying in %.1fs: %s", failures, delay, e)
+            sleep(delay)
+            continue
+        failures = 0
+        if published:
+            stats.batches += 1
+            stats.events += published
+            burst = burst or (time.perf_counter(), stats.events - published)
+            continue
+        if burst is not None:
+            elapsed = time.perf_counter() - burst[0]
+            events = stats.events - burst[1]
+            log.info("Published %s order events in %.2fs (%.0f/s)", events, elapsed, events / elapsed if elapsed else 0)
+            burst = None
+        update_lag()
+        if not follow:
+            break
+        sleep(interval)
+    stats.seconds = time.perf_counter() - started
+    return stats
+
+
+def prune_published(days=None, batch_size=10_000):
+    """Delete events published more than `days` ago, in batches; returns how many."""
+    days = settings.ORDER_EVENTS_RETENTION_DAYS if days is None else days
+    old = OrderEvent.objects.filter(published_at__lt=timezone.now() - datetime.timedelta(days=days))
+    deleted = 0
+    while True:
+        ids = list(old.order_by("id").values_list("id", flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        deleted += OrderEvent.objects.filter(id__in=ids).delete()[0]
@@ -1,17 +1,13 @@
 from rest_framework import serializers
-from .models import Order, OrderItem
+from .models import ArchivedOrder, ArchivedOrderItem, Order, OrderItem
 
 class OrderItemSerializer(serializers.ModelSerializer):
-    line_total = serializers.SerializerMethodField()
-
     class Meta:
         model = OrderItem
+        # line_total is stored when the order is created (no per-item recomputation)
         fields = ("id", "product_id", "sku", "title", "unit_price", "qty", "line_total", "created_at")
         read_only_fields = fields
 
-    def get_line_total(self, obj):
-        return f"{(obj.unit_price * obj.qty):.2f}"
-
 class OrderSerializer(serializers.ModelSerializer):
     items = OrderItemSerializer(many=True, read_only=True)
 
@@ -23,3 +19,22 @@ class OrderSerializer(serializers.ModelSerializer):
             "payment_intent_id", "items", "created_at", "updated_at",
         )
         read_only_fields = fields
+
+    def __init__(self, *args, fields=None, **kwargs):
+        """`fields` (optional iterable) limits the output to a subset of Meta.fields."""
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class ArchivedOrderItemSerializer(OrderItemSerializer):
+    class Meta(OrderItemSerializer.Meta):
+        model = ArchivedOrderItem
+
+class ArchivedOrderSerializer(OrderSerializer):
+    """Same representation as OrderSerializer, read from the archive tables."""
+    items = ArchivedOrderItemSerializer(many=True, read_only=True)
+
+    class Meta(OrderSerializer.Meta):
+        model = ArchivedOrder
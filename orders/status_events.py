@@ -0,0 +1,159 @@
+# orders/status_events.py
+"""
+Order status change broadcaster.
+
+StripeWebhookView publishes (order_id, status) after it commits a paid/failed
+transition; the SSE stream and long-poll endpoints (orders/stream.py) wait on
+it instead of re-reading the order in a loop.
+
+- LocalBroadcaster: in-process fan-out (threads via a Condition, asyncio tasks
+  via futures). Always used to wake local waiters.
+- RedisBroadcaster: publishes to a Redis pub/sub channel and feeds every
+  process' LocalBroadcaster from a listener thread, so a webhook handled by one
+  gunicorn worker wakes clients connected to any other worker. The listener
+  starts with the first wait, so processes that only publish (the WSGI
+  workers) never subscribe.
+
+Delivery is best effort (a message published before the listener subscribed,
+or during a reconnect, is lost): waiters re-read the order periodically.
+"""
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+from django.conf import settings
+
+log = logging.getLogger("orders.status")
+
+CHANNEL = "orders:status"
+
+
+class LocalBroadcaster:
+    def __init__(self, max_tracked=10_000):
+        self.max_tracked = max_tracked
+        self._cond = threading.Condition()
+        self._latest = OrderedDict()  # order_id -> last published status
+        self._async_waiters = defaultdict(set)  # order_id -> {(loop, future)}
+
+    def publish(self, order_id, status):
+        order_id = int(order_id)
+        with self._cond:
+            self._latest[order_id] = status
+            self._latest.move_to_end(order_id)
+            while len(self._latest) > self.max_tracked:
+                self._latest.popitem(last=False)
+            waiters = self._async_waiters.pop(order_id, set())
+            self._cond.notify_all()
+        for loop, fut in waiters:
+            loop.call_soon_threadsafe(_resolve, fut, status)
+
+    def _changed(self, order_id, known_status):
+        status = self._latest.get(order_id)
+        return status if status is not None and status != known_status else None
+
+    def wait(self, order_id, known_status, timeout):
+        """Block until order_id leaves known_status; returns the new status or None on timeout."""
+        order_id = int(order_id)
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                status = self._changed(order_id, known_status)
+                if status is not None:
+                    return status
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+
+    async def wait_async(self, order_id, known_status, timeout):
+        """asyncio flavour of wait(); does not hold a thread while waiting."""
+        order_id = int(order_id)
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        with self._cond:
+            status = self._changed(order_id, known_status)
+            if status is not None:
+                return status
+            self._async_waiters[order_id].add((loop, fut))
+        try:
+            return await asyncio.wait_for(fut, timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            with self._cond:
+                waiters = self._async_waiters.get(order_id)
+                if waiters is not None:
+                    waiters.discard((loop, fut))
+                    if not waiters:
+                        del self._async_waiters[order_id]
+
+
+def _resolve(fut, status):
+    if not fut.done():
+        fut.set_result(status)
+
+
+class RedisBroadcaster(LocalBroadcaster):
+    def __init__(self, url, **kwargs):
+        super().__init__(**kwargs)
+        import redis
+        self._redis = redis.Redis.from_url(url, socket_connect_timeout=2)
+        self._listener = None
+        self._listener_lock = threading.Lock()
+
+    def _ensure_listener(self):
+        if self._listener is None:
+            with self._listener_lock:
+                if self._listener is None:
+                    self._listener = threading.Thread(target=self._listen, name="order-status-listener", daemon=True)
+                    self._listener.start()
+
+    def wait(self, order_id, known_status, timeout):
+        self._ensure_listener()
+        return super().wait(order_id, known_status, timeout)
+
+    async def wait_async(self, order_id, known_status, timeout):
+        self._ensure_listener()
+        return await super().wait_async(order_id, known_status, timeout)
+
+    def publish(self, order_id, status):
+        try:
+            self._redis.publish(CHANNEL, json.dumps({"order_id": int(order_id), "status": status}))
+        except Exception as e:
+            # Redis down: at least wake clients connected to this process
+            log.warning("Redis publish failed, local only: %s", e)
+            super().publish(order_id, status)
+
+    def _listen(self):
+        while True:
+            try:
+                pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(CHANNEL)
+                for message in pubsub.listen():
+                    data = json.loads(message["data"])
+                    super().publish(data["order_id"], data["status"])
+            except Exception as e:
+                log.warning("Order status listener error, reconnecting: %s", e)
+                time.sleep(1)
+
+
+_broadcaster = None
+_broadcaster_lock = threading.Lock()
+
+
+def get_broadcaster():
+    global _broadcaster
+    if _broadcaster is None:
+        with _broadcaster_lock:
+            if _broadcaster is None:
+                url = getattr(settings, "ORDER_STATUS_REDIS_URL", None)
+                _broadcaster = RedisBroadcaster(url) if url else LocalBroadcaster()
+    return _broadcaster
+
+
+def publish_order_status(order_id, status):
+    log.debug("Publish order status order=%s status=%s", order_id, status)
+    get_broadcaster().publish(order_id, status)
@@ -0,0 +1,133 @@
+# orders/stream.py
+"""
+Order status push endpoints (async views, served by the ASGI app):
+
+GET /api/orders/{id}/stream/               Server-Sent Events; one "status" event
+                                           now and one per change, until a final state
+GET /api/orders/{id}/status/?status=pending&wait=25
+                                           long-poll fallback; answers as soon as the
+                                           status differs from ?status= (or after wait s)
+
+Both wait on orders.status_events instead of re-reading the order in a tight
+loop, but re-read it every ORDER_STATUS_STREAM_KEEPALIVE seconds: a pub/sub
+message can be lost (listener not subscribed yet, Redis reconnecting), and the
+database is the source of truth. Auth is the usual JWT bearer header;
+EventSource cannot send headers, so ?access_token= is accepted as well.
+"""
+import json
+import logging
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from .models import ArchivedOrder, Order
+from .status_events import get_broadcaster
+
+log = logging.getLogger("orders.status")
+
+FINAL_STATUSES = {Order.STATUS_PAID, Order.STATUS_FAILED, Order.STATUS_CANCELED}
+
+
+def _authenticate(request):
+    auth = JWTAuthentication()
+    token = request.GET.get("access_token")
+    try:
+        if token:
+            validated = auth.get_validated_token(token)
+            return auth.get_user(validated)
+        result = auth.authenticate(request)
+        return result[0] if result else None
+    except Exception:
+        return None
+
+
+def _order_status(user, pk):
+    for model in (Order, ArchivedOrder):
+        qs = model.objects.filter(pk=pk)
+        if not user.is_staff:
+            qs = qs.filter(user=user)
+        status = qs.values_list("status", flat=True).first()
+        if status is not None:
+            return status
+    return None
+
+
+async def _load(request, pk):
+    """(user, status, None) or (None, None, error response)."""
+    user = await sync_to_async(_authenticate)(request)
+    if user is None or not user.is_active:
+        return None, None, JsonResponse({"detail": "Authentication credentials were not provided."}, status=401)
+    status = await sync_to_async(_order_status)(user, pk)
+    if status is None:
+        return None, None, JsonResponse({"detail": "Not found."}, status=404)
+    return user, status, None
+
+
+async def _wait_for_change(user, pk, known, timeout):
+    """New status once the order leaves `known` (broadcast, else the re-read order), or None after `timeout`."""
+    changed = await get_broadcaster().wait_async(pk, known, timeout)
+    if changed is not None:
+        return changed
+    status = await sync_to_async(_order_status)(user, pk)
+    if status is not None and status != known:
+        log.info("Order %s status change to %s seen in the database, not broadcast", pk, status)
+        return status
+    return None
+
+
+async def order_status_longpoll(request, pk):
+    user, status, error = await _load(request, pk)
+    if error:
+        return error
+    known = request.GET.get("status")
+    max_wait = getattr(settings, "ORDER_STATUS_LONGPOLL_MAX", 30)
+    step = getattr(settings, "ORDER_STATUS_STREAM_KEEPALIVE", 15)
+    try:
+        wait = min(float(request.GET.get("wait", max_wait)), max_wait)
+    except ValueError:
+        wait = max_wait
+
+    if known and status == known and status not in FINAL_STATUSES:
+        deadline = time.monotonic() + wait
+        while (remaining := deadline - time.monotonic()) > 0:
+            changed = await _wait_for_change(user, pk, known, min(step, remaining))
+            if changed is not None:
+                status = changed
+                break
+    response = JsonResponse({"id": pk, "status": status})
+    response["Cache-Control"] = "no-store"
+    return response
+
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def order_status_stream(request, pk):
+    user, status, error = await _load(request, pk)
+    if error:
+        return error
+    keepalive = getattr(settings, "ORDER_STATUS_STREAM_KEEPALIVE", 15)
+    max_seconds = getattr(settings, "ORDER_STATUS_STREAM_MAX", 300)
+
+    async def events():
+        current = status
+        yield _sse("status", {"id": pk, "status": current})
+        waited = 0
+        while current not in FINAL_STATUSES and waited < max_seconds:
+            changed = await _wait_for_change(user, pk, current, keepalive)
+            if changed is None:
+                waited += keepalive
+                yield ": keepalive\n\n"
+                continue
+            current = changed
+            yield _sse("status", {"id": pk, "status": current})
+        log.debug("Order stream closed order=%s status=%s", pk, current)
+
+    response = StreamingHttpResponse(events(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # nginx: flush events immediately
+    return response
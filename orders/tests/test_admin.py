@@ -0,0 +1,53 @@
+# orders/tests/test_admin.py
+"""LargeTableAdmin: seek pagination matches OFFSET pagination; search is prefix/exact only."""
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.paginator import Paginator
+from django.test import TestCase
+
+from ecom.admin import SeekPaginator, seek_ordering
+from orders.models import Order
+
+User = get_user_model()
+
+
+class LargeTableAdminTests(TestCase):
+    def setUp(self):
+        self.staff = User.objects.create_superuser(email="admin@example.com", password="A-secure-pass1")
+        buyer = User.objects.create_user(email="buyer@example.com", password="B-secure-pass1")
+        for n in range(23):
+            Order.objects.create(
+                user=buyer, total_amount=Decimal(n % 4), payment_intent_id=f"pi_{n:03d}",
+                status=Order.STATUS_PAID if n % 3 else Order.STATUS_PENDING,
+            )
+        self.client.force_login(self.staff)
+
+    def test_seek_pages_match_offset_pages(self):
+        for ordering in (("-id",), ("total_amount", "-id"), ("-status", "total_amount", "id")):
+            qs = Order.objects.order_by(*ordering)
+            self.assertIsNotNone(seek_ordering(qs))
+            seek, offset = SeekPaginator(qs, 5), Paginator(qs, 5)
+            for number in offset.page_range:
+                self.assertEqual(list(seek.page(number)), list(offset.page(number)), (ordering, number))
+        self.assertIsNone(seek_ordering(Order.objects.order_by("user__email", "id")))
+
+    def test_changelist_search(self):
+        resp = self.client.get("/admin/orders/order/", {"q": "pi_01"})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.context["cl"].result_count, 10)
+        # no substring matching
+        resp = self.client.get("/admin/orders/order/", {"q": "i_01"})
+        self.assertEqual(resp.context["cl"].result_count, 0)
+        public_id = Order.objects.first().public_id
+        resp = self.client.get("/admin/orders/order/", {"q": str(public_id)})
+        self.assertEqual(resp.context["cl"].result_count, 1)
+        resp = self.client.get("/admin/orders/order/", {"p": "2"})
+        self.assertEqual(resp.status_code, 200)
+
+    def test_product_category_filter(self):
+        resp = self.client.get("/admin/catalog/product/", {"category": "1"})
+        self.assertEqual(resp.status_code, 200)
+        self.assertContains(resp, 'name="category" value="1"')
+        resp = self.client.get("/admin/catalog/product/", {"category": "x"})
+        self.assertEqual(resp.status_code, 302)  # invalid lookup -> ?e=1
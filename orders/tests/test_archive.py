@@ -0,0 +1,99 @@
+# orders/tests/test_archive.py
+"""
+Archival: archive_batch moves finished orders and their lines, and the order
+API keeps serving them to their owner unchanged; refunds and late Stripe
+webhooks still find them.
+"""
+import datetime
+import io
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from orders.archive import archive_batch
+from orders.models import ArchivedOrder, ArchivedOrderItem, Order, OrderEvent, OrderItem
+
+User = get_user_model()
+
+
+class OrderArchiveTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="dora@example.com", password="D-secure-pass1")
+        self.staff = User.objects.create_user(email="staff@example.com", password="S-secure-pass1", is_staff=True)
+        old = timezone.now() - datetime.timedelta(days=400)
+        self.orders = []
+        for n, status in enumerate((Order.STATUS_PAID, Order.STATUS_PENDING, Order.STATUS_FAILED)):
+            order = Order.objects.create(user=self.user, status=status, total_amount=Decimal("20.00"))
+            OrderItem.objects.create(
+                order=order, product_id=n + 1, sku=f"A{n}", title=f"Item {n}",
+                unit_price=Decimal("10.00"), qty=2, line_total=Decimal("20.00"),
+            )
+            self.orders.append(order)
+        Order.objects.update(created_at=old)
+        self.recent = Order.objects.create(user=self.user, status=Order.STATUS_PAID)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _cutoff(self):
+        return timezone.now() - datetime.timedelta(days=365)
+
+    def test_batches_move_finished_orders_only(self):
+        self.assertEqual(archive_batch(self._cutoff(), batch_size=1), (1, 1))
+        self.assertEqual(archive_batch(self._cutoff(), batch_size=10), (1, 1))
+        self.assertEqual(archive_batch(self._cutoff()), (0, 0))
+        # the old pending order and the recent one stay live
+        self.assertEqual(set(Order.objects.values_list("id", flat=True)), {self.orders[1].id, self.recent.id})
+        self.assertEqual(
+            set(ArchivedOrder.objects.values_list("id", flat=True)), {self.orders[0].id, self.orders[2].id},
+        )
+        self.assertEqual(ArchivedOrderItem.objects.count(), 2)
+        self.assertEqual(OrderItem.objects.count(), 1)
+
+    def test_owner_sees_archived_orders_unchanged(self):
+        before_list = self.client.get("/api/orders/").json()
+        before_detail = self.client.get(f"/api/orders/{self.orders[0].id}/").json()
+        call_command("archive_orders", before=self._cutoff().isoformat(), stdout=io.StringIO())
+
+        after_list = self.client.get("/api/orders/").json()
+        self.assertEqual(sorted(after_list, key=lambda o: o["id"]), sorted(before_list, key=lambda o: o["id"]))
+        self.assertEqual(self.client.get(f"/api/orders/{self.orders[0].id}/").json(), before_detail)
+        compact = self.client.get("/api/orders/", {"fields": "id,status"}).json()
+        self.assertEqual(len(compact), 4)
+
+    def test_staff_lists_exclude_archive_by_default(self):
+        archive_batch(self._cutoff())
+        staff = APIClient()
+        staff.force_authenticate(self.staff)
+        self.assertEqual(len(staff.get("/api/orders/").json()), 2)
+        self.assertEqual(len(staff.get("/api/orders/", {"include_archived": "true"}).json()), 4)
+
+    def test_etag_changes_after_archival(self):
+        etag = self.client.get("/api/orders/")["ETag"]
+        archive_batch(self._cutoff())
+        resp = self.client.get("/api/orders/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 200)
+        self.assertNotEqual(resp["ETag"], etag)
+
+    @override_settings(STRIPE_SECRET_KEY="sk_test", PAYMENTS_ALLOW_UNVERIFIED_WEBHOOKS=True,
+                       ORDER_STATUS_REDIS_URL=None)
+    def test_archived_orders_can_be_refunded_and_take_late_webhooks(self):
+        paid = self.orders[0]
+        Order.objects.filter(pk=paid.pk).update(payment_intent_id="pi_old")
+        archive_batch(self._cutoff())
+        with mock.patch("stripe.Refund.create", return_value={"id": "re_1", "status": "succeeded"}) as create:
+            resp = self.client.post("/api/payments/refund/", {"order_id": paid.id}, format="json")
+        self.assertEqual(resp.status_code, 200, resp.content)
+        self.assertEqual(create.call_args.kwargs["payment_intent"], "pi_old")
+        self.assertEqual(create.call_args.kwargs["amount"], 2000)
+        self.assertEqual(OrderEvent.objects.get(type=OrderEvent.TYPE_REFUNDED).order_id, paid.id)
+
+        event = {"id": "evt_late", "type": "payment_intent.succeeded",
+                 "data": {"object": {"id": "pi_old", "metadata": {"order_id": str(paid.id)}}}}
+        self.assertEqual(APIClient().post("/api/payments/webhook/", event, format="json").status_code, 200)
+        self.assertEqual(ArchivedOrder.objects.get(pk=paid.pk).status, Order.STATUS_PAID)
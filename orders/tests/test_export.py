@@ -0,0 +1,73 @@
+# orders/tests/test_export.py
+"""
+Staff order export: CSV/JSONL rows per order line, filters, gzip, and the
+export_orders management command producing the same bytes.
+"""
+
+import csv
+import gzip
+import io
+import json
+import os
+import tempfile
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from orders.models import Order, OrderItem
+
+User = get_user_model()
+
+
+class OrderExportTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="erin@example.com", password="E-secure-pass1")
+        self.staff = User.objects.create_user(email="fin@example.com", password="F-secure-pass1", is_staff=True)
+        paid = Order.objects.create(user=self.user, status=Order.STATUS_PAID, total_amount=Decimal("25.00"))
+        for n, price in enumerate((Decimal("10.00"), Decimal("15.00"))):
+            OrderItem.objects.create(order=paid, product_id=n + 1, sku=f"S{n}", title=f"Thing, {n}",
+                                     unit_price=price, qty=1, line_total=price)
+        Order.objects.create(user=self.user, status=Order.STATUS_PENDING)  # no lines
+        self.client = APIClient()
+        self.client.force_authenticate(self.staff)
+
+    def _body(self, resp):
+        return b"".join(resp.streaming_content)
+
+    def test_csv_one_row_per_line(self):
+        resp = self.client.get("/api/orders/export/", {"format": "csv"})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp["Content-Type"], "text/csv")
+        rows = list(csv.DictReader(io.StringIO(self._body(resp).decode())))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[1]["title"], "Thing, 1")
+        self.assertEqual(rows[1]["line_total"], "15.00")
+        self.assertEqual(rows[2]["item_id"], "")
+
+    def test_jsonl_gzip_and_status_filter(self):
+        resp = self.client.get("/api/orders/export/", {"format": "jsonl", "status": "paid", "compress": "gzip"})
+        self.assertEqual(resp["Content-Type"], "application/gzip")
+        lines = gzip.decompress(self._body(resp)).decode().splitlines()
+        rows = [json.loads(line) for line in lines]
+        self.assertEqual({r["status"] for r in rows}, {"paid"})
+        self.assertEqual(rows[0]["unit_price"], "10.00")
+
+    def test_staff_only_and_validation(self):
+        customer = APIClient()
+        customer.force_authenticate(self.user)
+        self.assertEqual(customer.get("/api/orders/export/").status_code, 403)
+        self.assertEqual(self.client.get("/api/orders/export/", {"created_from": "yesterday"}).status_code, 400)
+        self.assertEqual(self.client.get("/api/orders/export/", {"status": "lost"}).status_code, 400)
+
+    def test_command_matches_endpoint(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "orders.csv.gz")
+            call_command("export_orders", "--format", "csv", "--gzip", "-o", path, "--chunk-size", "1",
+                         stderr=io.StringIO())
+            with gzip.open(path, "rb") as f:
+                exported = f.read()
+        expected = self._body(self.client.get("/api/orders/export/", {"format": "csv"}))
+        self.assertEqual(exported, expected)
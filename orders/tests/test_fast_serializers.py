@@ -0,0 +1,82 @@
+# orders/tests/test_fast_serializers.py
+"""
+Fast list serialization and the orjson renderer must produce byte-identical
+JSON to the DRF serializers / stdlib renderer (decimals, datetimes, UUIDs,
+nested category, reverse order items), streamed or not.
+"""
+import datetime
+import uuid
+
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from catalog.models import Category, Product
+from catalog.serializers import ProductSerializer
+from ecom.fastserializers import FastSerializer
+from ecom.renderers import ORJSONRenderer
+from orders.models import Order, OrderItem
+from orders.serializers import OrderSerializer
+
+User = get_user_model()
+
+
+class FastSerializerParityTests(TestCase):
+    def setUp(self):
+        cache.clear()  # catalog API lists are cached per catalog version
+        self.user = User.objects.create_user(email="dave@example.com", password="D-secure-pass1")
+        cat = Category.objects.create(name="Books", description="Paper")
+        for n in range(3):
+            Product.objects.create(category=cat, sku=f"B{n}", title=f"Book {n}", price=Decimal("9.5") + n, stock_qty=n)
+        order = Order.objects.create(user=self.user, total_amount=Decimal("19.00"))
+        OrderItem.objects.create(order=order, product_id=1, sku="B0", title="Book 0",
+                                 unit_price=Decimal("9.50"), qty=2, line_total=Decimal("19.00"))
+        Order.objects.create(user=self.user)  # no items
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _assert_same(self, serializer_class, queryset):
+        render = JSONRenderer().render
+        self.assertEqual(
+            render(FastSerializer(serializer_class).serialize(queryset)),
+            render(serializer_class(queryset, many=True).data),
+        )
+
+    def test_products(self):
+        self._assert_same(ProductSerializer, Product.objects.select_related("category").order_by("id"))
+
+    def test_orders_with_items(self):
+        self._assert_same(OrderSerializer, Order.objects.prefetch_related("items").order_by("id"))
+
+    def test_endpoints_match_drf_path(self):
+        for url in ("/api/products/", "/api/categories/", "/api/orders/", "/api/orders/?fields=id,status"):
+            fast = self.client.get(url).content
+            with override_settings(FAST_SERIALIZERS_ENABLED=False):
+                slow = self.client.get(url).content
+            self.assertEqual(fast, slow, url)
+
+    @override_settings(JSON_STREAM_THRESHOLD=1, JSON_STREAM_CHUNK_SIZE=2)
+    def test_long_lists_are_streamed(self):
+        for fast in (True, False):
+            with override_settings(FAST_SERIALIZERS_ENABLED=fast):
+                resp = self.client.get("/api/products/")
+                self.assertTrue(resp.streaming)
+                self.assertIn("ETag", resp)
+                with override_settings(JSON_STREAM_THRESHOLD=None):
+                    expected = self.client.get("/api/products/").content
+                self.assertEqual(b"".join(resp.streaming_content), expected)
+
+    def test_orjson_renderer_matches_stdlib(self):
+        data = {
+            "when": datetime.datetime(2025, 1, 2, 3, 4, 5, 678901, tzinfo=datetime.timezone.utc),
+            "day": datetime.date(2025, 1, 2),
+            "price": Decimal("1.10"),
+            "id": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+            "text": "caf\u00e9 \u2028 / <b>",
+            1: [True, None, 1.5],
+        }
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
@@ -0,0 +1,56 @@
+# orders/tests/test_order_history.py
+"""
+Order history sparse fieldsets: ?fields= trims columns and skips the items
+prefetch unless ?expand=items; the legacy response is unchanged.
+"""
+
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from orders.models import Order, OrderItem
+
+User = get_user_model()
+
+
+class OrderHistoryFieldsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="carol@example.com", password="C-secure-pass1")
+        for n in range(3):
+            order = Order.objects.create(user=self.user, total_amount=Decimal("30.00"))
+            OrderItem.objects.create(
+                order=order, product_id=n + 1, sku=f"S{n}", title=f"Item {n}",
+                unit_price=Decimal("10.00"), qty=3, line_total=Decimal("30.00"),
+            )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_legacy_representation(self):
+        resp = self.client.get("/api/orders/")
+        self.assertEqual(resp.status_code, 200)
+        row = resp.json()[0]
+        self.assertIn("payment_intent_id", row)
+        self.assertEqual(row["items"][0]["line_total"], "30.00")
+
+    def test_compact_fields_skip_items(self):
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get("/api/orders/", {"fields": "id,status,total_amount,created_at"})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(set(resp.json()[0]), {"id", "status", "total_amount", "created_at"})
+        self.assertFalse(any("orders_orderitem" in q["sql"] for q in ctx.captured_queries))
+        self.assertFalse(any('"payment_intent_id"' in q["sql"] for q in ctx.captured_queries))
+
+    def test_expand_items(self):
+        resp = self.client.get("/api/orders/", {"fields": "id,status", "expand": "items"})
+        self.assertEqual(resp.status_code, 200)
+        row = resp.json()[0]
+        self.assertEqual(set(row), {"id", "status", "items"})
+        self.assertEqual(len(row["items"]), 1)
+
+    def test_unknown_field_is_rejected(self):
+        resp = self.client.get("/api/orders/", {"fields": "id,password"})
+        self.assertEqual(resp.status_code, 400)
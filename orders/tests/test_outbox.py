@@ -0,0 +1,147 @@
+# orders/tests/test_outbox.py
+"""Order event outbox: events written with the state change, relayed at least once in id order."""
+import datetime
+import os
+import tempfile
+from decimal import Decimal
+from unittest import mock
+
+import orjson
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from catalog.models import Category, Product
+from orders import outbox
+from orders.models import Order, OrderEvent, OrderItem
+from payments.refunds import reconcile_held_refunds
+
+User = get_user_model()
+
+
+class FlakySink:
+    name = "flaky"
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.published = []
+
+    def publish(self, events):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("sink down")
+        self.published.extend(events)
+
+
+@override_settings(PAYMENTS_ALLOW_UNVERIFIED_WEBHOOKS=True, ORDER_STATUS_REDIS_URL=None)
+class OrderOutboxTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="dave@example.com", password="D-secure-pass1")
+        self.product = Product.objects.create(
+            category=Category.objects.create(name="Tools"), sku="T1", title="Saw", price=Decimal("20.00"), stock_qty=5,
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _pending_order(self):
+        order = Order.objects.create(user=self.user, total_amount=Decimal("20.00"), payment_intent_id="pi_1")
+        OrderItem.objects.create(order=order, product_id=self.product.id, sku="T1", title="Saw",
+                                 unit_price=Decimal("20.00"), qty=1, line_total=Decimal("20.00"))
+        return order
+
+    def _webhook(self, event_type, order, event_id):
+        event = {"id": event_id, "type": event_type,
+                 "data": {"object": {"id": "pi_1", "metadata": {"order_id": str(order.id)}}}}
+        resp = APIClient().post("/api/payments/webhook/", event, format="json")
+        self.assertEqual(resp.status_code, 200, resp.content)
+
+    def test_state_changes_write_events(self):
+        self.client.post("/api/cart/items/", {"product_id": self.product.id, "qty": 2}, format="json")
+        resp = self.client.post("/api/checkout/create-order/", {}, format="json")
+        self.assertEqual(resp.status_code, 201, resp.content)
+        created = OrderEvent.objects.get()
+        self.assertEqual(created.type, OrderEvent.TYPE_CREATED)
+        self.assertEqual(created.data["items"], [{"product_id": self.product.id, "sku": "T1", "qty": 2, "unit_price": "20.00"}])
+
+        paid, failed = self._pending_order(), self._pending_order()
+        self._webhook("payment_intent.succeeded", paid, "evt_1")
+        self._webhook("payment_intent.succeeded", paid, "evt_1")  # duplicate delivery: no second event
+        self._webhook("payment_intent.payment_failed", failed, "evt_2")
+        self.assertEqual(
+            list(OrderEvent.objects.order_by("id").values_list("order_id", "type", "data__status"))[1:],
+            [(paid.id, OrderEvent.TYPE_PAID, "paid"), (failed.id, OrderEvent.TYPE_PAYMENT_FAILED, "failed")],
+        )
+
+    def test_failed_state_change_writes_no_event(self):
+        order = self._pending_order()
+        self.product.stock_qty = 0
+        self.product.save()
+        with self.assertRaises(ValueError):
+            order.mark_paid_and_decrement_stock()
+        self.assertFalse(OrderEvent.objects.exists())
+
+    def test_relay_retries_until_the_sink_accepts(self):
+        for n in range(5):
+            outbox.record_event(self._pending_order(), OrderEvent.TYPE_CREATED)
+        sink = FlakySink(failures=2)
+        delays = []
+        stats = outbox.relay(sink, batch_size=2, follow=True, max_batches=3, sleep=delays.append)
+        self.assertEqual((stats.events, stats.failures, len(delays)), (5, 2, 2))
+        self.assertEqual([e["id"] for e in sink.published], sorted(OrderEvent.objects.values_list("id", flat=True)))
+        self.assertFalse(OrderEvent.objects.filter(published_at__isnull=True).exists())
+        self.assertEqual(OrderEvent.objects.order_by("id").first().attempts, 3)
+        self.assertEqual(outbox.relay(sink).events, 0)
+
+    def test_relay_to_file_sink(self):
+        outbox.record_event(self._pending_order(), OrderEvent.TYPE_CREATED)
+        fd, path = tempfile.mkstemp(suffix=".jsonl")
+        os.close(fd)
+        self.addCleanup(os.remove, path)
+        with self.assertRaises(outbox.RelayError):
+            outbox.relay(FlakySink(failures=1))
+        outbox.relay(outbox.FileSink(path))
+        with open(path, "rb") as f:
+            lines = [orjson.loads(line) for line in f]
+        self.assertEqual([(e["type"], e["data"]["status"]) for e in lines], [(OrderEvent.TYPE_CREATED, "pending")])
+
+    @override_settings(STRIPE_SECRET_KEY="sk_test")
+    def test_refund_event_is_held_while_stripe_is_called(self):
+        order = self._pending_order()
+        order.mark_paid_and_decrement_stock()
+        sink = FlakySink(failures=0)
+
+        def create(**kwargs):
+            # The event exists before Stripe is called, but is not published yet
+            held = OrderEvent.objects.get(type=OrderEvent.TYPE_REFUNDED)
+            self.assertTrue(held.held)
+            self.assertEqual(kwargs["metadata"], {"order_event_id": str(held.id)})
+            outbox.relay(sink)
+            self.assertEqual([e["type"] for e in sink.published], [OrderEvent.TYPE_PAID])
+            return {"id": "re_1", "status": "succeeded"}
+
+        with mock.patch("stripe.Refund.create", side_effect=create):
+            resp = self.client.post("/api/payments/refund/", {"order_id": order.id}, format="json")
+        self.assertEqual(resp.status_code, 200, resp.content)
+        outbox.relay(sink)
+        self.assertEqual(sink.published[-1]["data"]["refund_id"], "re_1")
+
+        with mock.patch("stripe.Refund.create", side_effect=RuntimeError("card_declined")):
+            resp = self.client.post("/api/payments/refund/", {"order_id": order.id}, format="json")
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(OrderEvent.objects.filter(type=OrderEvent.TYPE_REFUNDED).count(), 1)
+
+    @override_settings(STRIPE_SECRET_KEY="sk_test")
+    def test_reconcile_settles_events_held_by_a_dead_request(self):
+        refunded = outbox.record_event(self._pending_order(), OrderEvent.TYPE_REFUNDED, held=True, amount_minor=2000)
+        never = outbox.record_event(self._pending_order(), OrderEvent.TYPE_REFUNDED, held=True, amount_minor=500)
+        in_flight = outbox.record_event(self._pending_order(), OrderEvent.TYPE_REFUNDED, held=True, amount_minor=100)
+        old = timezone.now() - datetime.timedelta(hours=1)
+        OrderEvent.objects.filter(id__in=[refunded.id, never.id]).update(created_at=old)
+        refunds = {"data": [{"id": "re_9", "status": "succeeded", "metadata": {"order_event_id": str(refunded.id)}}]}
+        with mock.patch("stripe.Refund.list", return_value=refunds):
+            self.assertEqual(reconcile_held_refunds(), (1, 1))
+        refunded.refresh_from_db()
+        self.assertEqual((refunded.held, refunded.data["refund_id"]), (False, "re_9"))
+        self.assertFalse(OrderEvent.objects.filter(id=never.id).exists())
+        self.assertTrue(OrderEvent.objects.get(id=in_flight.id).held)
@@ -0,0 +1,120 @@
+# orders/tests/test_status_stream.py
+"""
+Order status push: a single webhook delivery wakes every waiting client
+(thread-based long-poll waiters and asyncio SSE waiters alike), and a change
+whose broadcast was lost is still picked up from the database.
+"""
+
+import asyncio
+import threading
+from unittest import mock
+from decimal import Decimal
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from catalog.models import Category, Product
+from orders.models import Order, OrderItem
+from orders import status_events
+from orders.status_events import LocalBroadcaster
+
+User = get_user_model()
+
+
+@override_settings(PAYMENTS_ALLOW_UNVERIFIED_WEBHOOKS=True, ORDER_STATUS_REDIS_URL=None)
+class OrderStatusBroadcastTests(TestCase):
+    def setUp(self):
+        status_events._broadcaster = LocalBroadcaster()
+        self.addCleanup(setattr, status_events, "_broadcaster", None)
+
+        self.user = User.objects.create_user(email="bob@example.com", password="B-secure-pass1")
+        cat = Category.objects.create(name="Audio")
+        self.product = Product.objects.create(
+            category=cat, sku="HP1", title="Headphones", price=Decimal("50.00"), stock_qty=10
+        )
+        self.order = Order.objects.create(
+            user=self.user, total_amount=Decimal("50.00"), payment_intent_id="pi_wake_1"
+        )
+        OrderItem.objects.create(
+            order=self.order, product_id=self.product.id, sku="HP1", title="Headphones",
+            unit_price=Decimal("50.00"), qty=1, line_total=Decimal("50.00"),
+        )
+
+    def _post_succeeded(self):
+        event = {
+            "id": "evt_wake_1",
+            "type": "payment_intent.succeeded",
+            "data": {"object": {"id": "pi_wake_1", "metadata": {"order_id": str(self.order.id)}}},
+        }
+        with self.captureOnCommitCallbacks(execute=True):
+            resp = APIClient().post("/api/payments/webhook/", event, format="json")
+        self.assertEqual(resp.status_code, 200, resp.content)
+
+    def test_one_webhook_wakes_all_waiters(self):
+        broadcaster = status_events.get_broadcaster()
+        results = []
+        lock = threading.Lock()
+
+        def thread_waiter():
+            status = broadcaster.wait(self.order.id, Order.STATUS_PENDING, timeout=10)
+            with lock:
+                results.append(status)
+
+        async def async_waiters(n):
+            return await asyncio.gather(*[
+                broadcaster.wait_async(self.order.id, Order.STATUS_PENDING, 10) for _ in range(n)
+            ])
+
+        async_results = []
+        threads = [threading.Thread(target=thread_waiter) for _ in range(5)]
+        threads.append(threading.Thread(target=lambda: async_results.extend(asyncio.run(async_waiters(5)))))
+        for t in threads:
+            t.start()
+
+        # nobody may be woken before the webhook arrives
+        self.assertIsNone(broadcaster.wait(self.order.id, Order.STATUS_PENDING, timeout=0.2))
+        self._post_succeeded()
+
+        for t in threads:
+            t.join(timeout=10)
+        self.assertEqual(results, [Order.STATUS_PAID] * 5)
+        self.assertEqual(async_results, [Order.STATUS_PAID] * 5)
+
+    def test_waiter_arriving_after_publish_returns_immediately(self):
+        self._post_succeeded()
+        status = status_events.get_broadcaster().wait(self.order.id, Order.STATUS_PENDING, timeout=0)
+        self.assertEqual(status, Order.STATUS_PAID)
+
+    def test_longpoll_without_change_times_out_with_current_status(self):
+        token = str(AccessToken.for_user(self.user))
+        resp = self.client.get(
+            f"/api/orders/{self.order.id}/status/", {"status": "pending", "wait": "0.1", "access_token": token}
+        )
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json(), {"id": self.order.id, "status": "pending"})
+
+    @override_settings(ORDER_STATUS_STREAM_KEEPALIVE=0.05)
+    def test_longpoll_sees_a_change_whose_broadcast_was_lost(self):
+        token = str(AccessToken.for_user(self.user))
+        # pending when the request arrives, paid (nothing published) by the first re-check
+        with mock.patch("orders.stream._order_status", side_effect=["pending", "pending", "paid"]):
+            resp = self.client.get(
+                f"/api/orders/{self.order.id}/status/", {"status": "pending", "wait": "5", "access_token": token}
+            )
+        self.assertEqual(resp.json(), {"id": self.order.id, "status": "paid"})
+
+    @override_settings(ORDER_STATUS_STREAM_KEEPALIVE=0.05, ORDER_STATUS_STREAM_MAX=2)
+    async def test_stream_sees_a_change_whose_broadcast_was_lost(self):
+        token = str(await sync_to_async(AccessToken.for_user)(self.user))
+        resp = await self.async_client.get(f"/api/orders/{self.order.id}/stream/", {"access_token": token})
+        chunks = []
+        async for chunk in resp.streaming_content:
+            chunks.append(chunk.decode() if isinstance(chunk, bytes) else chunk)
+            if len(chunks) == 1:
+                await Order.objects.filter(pk=self.order.pk).aupdate(status=Order.STATUS_PAID)
+        events = [c for c in chunks if c.startswith("event:")]
+        self.assertEqual(len(events), 2)
+        self.assertIn('"status": "paid"', events[-1])
@@ -1,11 +1,15 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import OrderViewSet, CreateOrderView
+from .stream import order_status_longpoll, order_status_stream
 
 router = DefaultRouter()
 router.register(r"orders", OrderViewSet, basename="orders")
 
 urlpatterns = [
     path("checkout/create-order/", CreateOrderView.as_view(), name="create-order"),
+    # async (ASGI) push endpoints; must precede the router's orders/{pk}/ routes
+    path("orders/<int:pk>/stream/", order_status_stream, name="order-status-stream"),
+    path("orders/<int:pk>/status/", order_status_longpoll, name="order-status-longpoll"),
     path("", include(router.urls)),
 ]
@@ -1,32 +1,169 @@
 import logging
 from decimal import Decimal
 from django.db import transaction
+from django.db.models import Count, Max, Prefetch
+from django.http import Http404, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
 from rest_framework import permissions, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from .models import Order, OrderItem
-from .serializers import OrderSerializer
+from . import export as order_export
+from .models import ArchivedOrder, ArchivedOrderItem, Order, OrderEvent, OrderItem
+from .outbox import record_event
+from .serializers import ArchivedOrderSerializer, OrderSerializer
 from cart.models import Cart, CartItem
 from catalog.models import Product
+from ecom.conditional import ConditionalGetMixin
+from ecom.fastserializers import FastListMixin, fast_serializer_for
 
 log = logging.getLogger("orders.api")
 
-class OrderViewSet(viewsets.ReadOnlyModelViewSet):
+class OrderViewSet(FastListMixin, ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
     """
     List/retrieve orders. Users see only their own orders.
     Staff can see all.
+    Supports ETag (lists and detail) and Last-Modified (detail) so status
+    polling gets cheap 304s.
+
+    Sparse fieldsets for history screens:
+      ?fields=id,status,total_amount,created_at   only these columns are loaded
+      ?fields=...&expand=items                    plus the order lines (one prefetch)
+    Without ?fields= the full representation (with items) is returned.
+
+    Archived orders (manage.py archive_orders) are included transparently for
+    customers: lists return them first (they are the oldest), then live orders,
+    and retrieve falls back to the archive. Staff lists show live orders only
+    unless ?include_archived=true.
+
+    Staff export (streamed, one row per order line):
+      GET /api/orders/export/?format=csv|jsonl&status=paid,failed
+          &created_from=2025-01-01&created_to=2025-02-01&compress=gzip
     """
     serializer_class = OrderSerializer
     permission_classes = [permissions.IsAuthenticated]
+    cache_control = {"private": True, "no_cache": True}  # always revalidate
+    conditional_per_user = True
+    expandable = ("items",)
 
-    def get_queryset(self):
-        qs = Order.objects.prefetch_related("items").all()
+    def _projection(self):
+        """(fields or None, with_items) parsed from ?fields= / ?expand=, once per request."""
+        cached = getattr(self, "_projection_cache", None)
+        if cached is not None:
+            return cached
+        params = self.request.query_params
+        expand = {e.strip() for e in params.get("expand", "").split(",") if e.strip()}
+        unknown = expand - set(self.expandable)
+        if unknown:
+            raise ValidationError({"expand": f"Unknown value(s): {', '.join(sorted(unknown))}"})
+
+        fields = None
+        with_items = True
+        if "fields" in params:
+            fields = [f.strip() for f in params["fields"].split(",") if f.strip()]
+            unknown = set(fields) - set(OrderSerializer.Meta.fields)
+            if unknown or not fields:
+                raise ValidationError({"fields": f"Unknown field(s): {', '.join(sorted(unknown)) or '(empty)'}"})
+            with_items = "items" in fields or "items" in expand
+            if with_items and "items" not in fields:
+                fields.append("items")
+        self._projection_cache = (fields, with_items)
+        return self._projection_cache
+
+    def _scoped(self, model, item_model):
+        qs = model.objects.all()
         user = self.request.user
         if not user.is_staff:
             qs = qs.filter(user=user)
+
+        fields, with_items = self._projection()
+        if fields is not None:
+            # updated_at backs the ETag/Last-Modified validators
+            columns = {f for f in fields if f != "items"} | {"id", "updated_at"}
+            qs = qs.only(*columns)
+        if with_items:
+            qs = qs.prefetch_related(Prefetch("items", queryset=item_model.objects.order_by("id")))
         return qs
 
+    def get_queryset(self):
+        return self._scoped(Order, OrderItem)
+
+    def _include_archived(self):
+        if not self.request.user.is_staff:
+            return True
+        return self.request.query_params.get("include_archived", "").lower() in ("1", "true", "yes")
+
+    def _archived_queryset(self):
+        return self.filter_queryset(self._scoped(ArchivedOrder, ArchivedOrderItem))
+
+    def get_list_sources(self, queryset):
+        sources = [(queryset, OrderSerializer)]
+        if self._include_archived():
+            sources.insert(0, (self._archived_queryset(), ArchivedOrderSerializer))
+        return sources
+
+    def _list_validators(self, queryset):
+        last_modified, count = super()._list_validators(queryset)
+        if self._include_archived():
+            # archived_at >= updated_at, and it moves whenever orders are archived
+            stats = self._archived_queryset().order_by().aggregate(last=Max("archived_at"), n=Count("pk"))
+            last_modified = max(filter(None, (last_modified, stats["last"])), default=None)
+            count += stats["n"]
+        return last_modified, count
+
+    def get_object(self):
+        try:
+            return super().get_object()
+        except Http404:
+            lookup = self.kwargs[self.lookup_url_kwarg or self.lookup_field]
+            obj = get_object_or_404(self._scoped(ArchivedOrder, ArchivedOrderItem), **{self.lookup_field: lookup})
+            self.check_object_permissions(self.request, obj)
+            return obj
+
+    def get_fast_serializer(self, serializer_class=None):
+        fields, _ = self._projection()
+        return fast_serializer_for(serializer_class or OrderSerializer, tuple(fields) if fields is not None else None)
+
+    def get_serializer(self, *args, **kwargs):
+        fields, _ = self._projection()
+        if fields is not None:
+            kwargs["fields"] = fields
+        if args and isinstance(args[0], ArchivedOrder):
+            kwargs.setdefault("serializer_class", ArchivedOrderSerializer)
+        return super().get_serializer(*args, **kwargs)
+
+    @action(detail=False, methods=["get"], permission_classes=[permissions.IsAdminUser],
+            renderer_classes=[order_export.CSVRenderer, order_export.JSONLRenderer])
+    def export(self, request):
+        params = request.query_params
+        bounds = {}
+        for name in ("created_from", "created_to"):
+            if params.get(name):
+                try:
+                    bounds[name] = order_export.parse_bound(params[name], name)
+                except ValueError as e:
+                    raise ValidationError({name: str(e)})
+        statuses = [s.strip() for s in params.get("status", "").split(",") if s.strip()]
+        unknown = set(statuses) - {choice for choice, _ in Order.STATUS_CHOICES}
+        if unknown:
+            raise ValidationError({"status": f"Unknown status(es): {', '.join(sorted(unknown))}"})
+        compress = params.get("compress") == "gzip"
+
+        fmt = request.accepted_renderer.format
+        log.info("Order export by user=%s format=%s status=%s range=%s..%s gzip=%s", request.user.id, fmt,
+                 statuses or "*", bounds.get("created_from"), bounds.get("created_to"), compress)
+        response = StreamingHttpResponse(
+            order_export.export_chunks(fmt, statuses=statuses, compress=compress, **bounds),
+            content_type="application/gzip" if compress else request.accepted_renderer.media_type,
+        )
+        filename = order_export.export_filename(fmt, compress)
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        response["Cache-Control"] = "no-store"
+        response["X-Accel-Buffering"] = "no"
+        return response
+
 class CreateOrderView(APIView):
     """
     POST /api/checkout/create-order/
@@ -66,6 +203,7 @@ class CreateOrderView(APIView):
         )
 
         subtotal = Decimal("0.00")
+        items = []
         for ci in cart.items.select_related("product"):
             p: Product = ci.product
             oi = OrderItem.objects.create(
@@ -75,8 +213,10 @@ class CreateOrderView(APIView):
                 title=p.title,
                 unit_price=p.price,  # snapshot current price
                 qty=ci.qty,
+                line_total=p.price * ci.qty,
             )
             subtotal += oi.unit_price * oi.qty
+            items.append({"product_id": p.id, "sku": p.sku, "qty": oi.qty, "unit_price": str(oi.unit_price)})
 
         tax = Decimal("0.00")
         shipping = Decimal("0.00")
@@ -93,7 +233,8 @@ class CreateOrderView(APIView):
         cart.status = Cart.STATUS_CONVERTED
         cart.save()
 
+        record_event(order, OrderEvent.TYPE_CREATED, items=items)
         log.info("Created order id=%s user=%s items=%s total=%s %s",
-                 order.id, user.id, order.items.count(), order.total_amount, order.currency)
+                 order.id, user.id, len(items), order.total_amount, order.currency)
 
         return Response(OrderSerializer(order).data, status=status.HTTP_201_CREATED)
@@ -2,3 +2,11 @@ from django.apps import AppConfig
 class PaymentsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "payments"
+
+    def ready(self):
+        # Optional API base override (e.g. the fake Stripe used by loadtest/)
+        from django.conf import settings
+        api_base = getattr(settings, "STRIPE_API_BASE", None)
+        if api_base:
+            import stripe
+            stripe.api_base = api_base
@@ -0,0 +1,24 @@
+# payments/management/commands/reconcile_refunds.py
+"""
+Settle order.refunded events left held by a refund request that died between
+the Stripe call and releasing its event (see payments/refunds.py).
+
+    python manage.py reconcile_refunds                    # cron, e.g. every 5 minutes
+    python manage.py reconcile_refunds --older-than 60
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from payments.refunds import reconcile_held_refunds
+
+
+class Command(BaseCommand):
+    help = "Release or drop held refund events according to the refunds found on Stripe."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--older-than", type=int, default=settings.REFUND_RECONCILE_AFTER_SECONDS,
+                            help="only events held at least this many seconds")
+
+    def handle(self, *args, **options):
+        released, deleted = reconcile_held_refunds(options["older_than"])
+        self.stdout.write(self.style.SUCCESS(f"Refund events released={released} dropped={deleted}"))
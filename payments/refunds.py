@@ -0,0 +1,73 @@
+# payments/refunds.py
+"""
+Stripe refunds with a recoverable order.refunded outbox event.
+
+A refund changes no order row, so its event cannot ride along a state
+change's transaction. Instead create_refund() commits a *held* event first,
+passes its id to Stripe as refund metadata, and releases it with the refund
+id once Stripe answered (or deletes it when Stripe refused). If the process
+dies in between, the held event stays behind: reconcile_held_refunds()
+(manage.py reconcile_refunds, e.g. every few minutes from cron) looks the
+refund up on Stripe by that metadata and releases the event, or deletes it
+when no refund was made.
+"""
+import datetime
+import logging
+
+import stripe
+from django.conf import settings
+from django.utils import timezone
+
+from orders.models import OrderEvent
+from orders.outbox import record_event, release_event
+
+log = logging.getLogger("payments.stripe")
+
+
+def create_refund(order, amount_minor):
+    """Refund `amount_minor` of the order's payment on Stripe; returns the Stripe refund (raises on failure)."""
+    event = record_event(order, OrderEvent.TYPE_REFUNDED, held=True, amount_minor=amount_minor)
+    try:
+        refund = stripe.Refund.create(
+            payment_intent=order.payment_intent_id,
+            amount=amount_minor,
+            metadata={"order_event_id": str(event.id)},
+            idempotency_key=f"order-event-{event.id}",
+        )
+    except Exception:
+        OrderEvent.objects.filter(id=event.id, held=True).delete()
+        raise
+    release_event(event.id, refund_id=refund["id"], refund_status=refund["status"])
+    return refund
+
+
+def _find_refund(payment_intent_id, event_id):
+    refunds = stripe.Refund.list(payment_intent=payment_intent_id, limit=100)
+    for refund in refunds["data"]:
+        if (refund.get("metadata") or {}).get("order_event_id") == str(event_id):
+            return refund
+    return None
+
+
+def reconcile_held_refunds(older_than=None):
+    """Settle held refund events older than `older_than` seconds; returns (released, deleted)."""
+    older_than = settings.REFUND_RECONCILE_AFTER_SECONDS if older_than is None else older_than
+    stripe.api_key = settings.STRIPE_SECRET_KEY
+    held = OrderEvent.objects.filter(
+        type=OrderEvent.TYPE_REFUNDED, held=True,
+        created_at__lt=timezone.now() - datetime.timedelta(seconds=older_than),
+    ).order_by("id")
+    released = deleted = 0
+    for event in held:
+        try:
+            refund = _find_refund(event.data["payment_intent_id"], event.id)
+        except Exception as e:
+            log.warning("Refund lookup failed for order event %s, retrying next run: %r", event.id, e)
+            continue
+        if refund is not None:
+            released += release_event(event.id, refund_id=refund["id"], refund_status=refund["status"])
+            log.info("Released refund event %s order=%s refund_id=%s", event.id, event.order_id, refund["id"])
+        else:
+            deleted += OrderEvent.objects.filter(id=event.id, held=True).delete()[0]
+            log.info("Dropped refund event %s order=%s: no refund on Stripe", event.id, event.order_id)
+    return released, deleted
@@ -6,13 +6,14 @@ from decimal import Decimal
 import stripe
 from django.conf import settings
 from django.db import transaction
-from django.utils.timezone import now
 from django.views.decorators.csrf import csrf_exempt
 from rest_framework import permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from orders.models import Order
+from orders.models import ArchivedOrder, Order, OrderEvent
+from orders.outbox import record_event
+from orders.status_events import publish_order_status
 from .models import StripeEvent
 
 log = logging.getLogger("payments.stripe")
@@ -77,7 +78,7 @@ class CreatePaymentIntentView(APIView):
                         automatic_payment_methods={"enabled": True},
                     )
                     order.payment_intent_id = pi["id"]
-                    order.save(update_fields=["payment_intent_id"])
+                    order.save(update_fields=["payment_intent_id", "updated_at"])
             else:
                 # Create new PI
                 pi = stripe.PaymentIntent.create(
@@ -87,9 +88,10 @@ class CreatePaymentIntentView(APIView):
                     automatic_payment_methods={"enabled": True},
                 )
                 order.payment_intent_id = pi["id"]
-                order.save(update_fields=["payment_intent_id"])
+                order.save(update_fields=["payment_intent_id", "updated_at"])
 
-            client_secret = pi.get("client_secret")
+            # Item access works for both dict-like (old) and StripeObject (new) SDKs
+            client_secret = pi["client_secret"]
             log.info(
                 "Created/Retrieved PI order=%s pi=%s amount=%s %s",
                 order.id, order.payment_intent_id, amount, currency
@@ -127,12 +129,10 @@ class StripeWebhookView(APIView):
         allow_unverified = getattr(settings, "PAYMENTS_ALLOW_UNVERIFIED_WEBHOOKS", False)
 
         try:
-            if allow_unverified or not secret:
-                event = json.loads(payload.decode("utf-8"))
-            else:
-                event = stripe.Webhook.construct_event(
-                    payload=payload, sig_header=sig_header, secret=secret
-                )
+            if secret and not allow_unverified:
+                # Verify only; parse ourselves so `event` is a plain dict on every SDK version
+                stripe.WebhookSignature.verify_header(payload, sig_header, secret)
+            event = json.loads(payload.decode("utf-8"))
         except Exception as e:
             log.error("Webhook verification failed: %s", e)
             return Response({"detail": "invalid_signature"}, status=status.HTTP_400_BAD_REQUEST)
@@ -157,7 +157,16 @@ class StripeWebhookView(APIView):
                 if not order_id:
                     raise ValueError("Missing order_id in PaymentIntent metadata")
 
-                order = Order.objects.get(pk=order_id)
+                order = Order.objects.filter(pk=order_id).first()
+                if order is None:
+                    # Archived orders are finished (paid/canceled/failed): a late event changes nothing
+                    archived = ArchivedOrder.objects.filter(pk=order_id).values_list("status", flat=True).first()
+                    if archived is None:
+                        raise Order.DoesNotExist(f"Order {order_id} not found")
+                    if archived != Order.STATUS_PAID:
+                        log.warning("Payment succeeded for archived %s order=%s pi=%s", archived, order_id, pi_id)
+                    log.info("Late webhook for archived order ignored: order=%s event=%s", order_id, event_id)
+                    return Response({"status": "ok"}, status=200)
                 if order.payment_intent_id and order.payment_intent_id != pi_id:
                     log.warning(
                         "PI mismatch for order=%s saved=%s incoming=%s",
@@ -165,9 +174,11 @@ class StripeWebhookView(APIView):
                     )
                 if not order.payment_intent_id:
                     order.payment_intent_id = pi_id
-                    order.save(update_fields=["payment_intent_id"])
+                    order.save(update_fields=["payment_intent_id", "updated_at"])
 
                 order.mark_paid_and_decrement_stock()
+                # wake SSE / long-poll clients once the change is visible to them
+                transaction.on_commit(lambda: publish_order_status(order.id, Order.STATUS_PAID))
                 log.info("Order marked PAID and stock decremented: order=%s pi=%s", order.id, pi_id)
                 return Response({"status": "ok"}, status=200)
 
@@ -176,7 +187,14 @@ class StripeWebhookView(APIView):
                 metadata = data.get("metadata") or {}
                 order_id = metadata.get("order_id")
                 if order_id:
-                    Order.objects.filter(pk=order_id).update(status=Order.STATUS_FAILED, updated_at=now())
+                    with transaction.atomic():
+                        order = Order.objects.select_for_update().filter(pk=order_id).first()
+                        if order is not None:
+                            order.status = Order.STATUS_FAILED
+                            order.save(update_fields=["status", "updated_at"])
+                            record_event(order, OrderEvent.TYPE_PAYMENT_FAILED,
+                                         failure_code=(data.get("last_payment_error") or {}).get("code"))
+                            transaction.on_commit(lambda: publish_order_status(order_id, Order.STATUS_FAILED))
                     log.info("Order marked FAILED: order=%s pi=%s", order_id, pi_id)
                 return Response({"status": "ok"}, status=200)
 
@@ -7,7 +7,8 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 import stripe
 
-from orders.models import Order
+from orders.models import ArchivedOrder, Order
+from .refunds import create_refund
 
 log = logging.getLogger("payments.stripe")
 
@@ -24,7 +25,7 @@ class CreateRefundView(APIView):
 
     Behavior:
     - Requires authenticated user
-    - User must own the order or be staff
+    - User must own the order (live or archived) or be staff
     - Order must be PAID (we keep status unchanged to avoid migrations for now)
     - If "amount" omitted => full refund of order.total_amount
     - Returns { refund_id, status }
@@ -36,9 +37,9 @@ class CreateRefundView(APIView):
         if not order_id:
             return Response({"detail": "order_id is required"}, status=status.HTTP_400_BAD_REQUEST)
 
-        try:
-            order = Order.objects.get(pk=order_id)
-        except Order.DoesNotExist:
+        # Paid orders may have been moved to the archive (orders/archive.py) and stay refundable
+        order = Order.objects.filter(pk=order_id).first() or ArchivedOrder.objects.filter(pk=order_id).first()
+        if order is None:
             return Response({"detail": "order not found"}, status=status.HTTP_404_NOT_FOUND)
 
         # AuthZ: owner or staff
@@ -69,18 +70,16 @@ class CreateRefundView(APIView):
             return Response({"detail": "order has no payment_intent_id"}, status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            refund = stripe.Refund.create(
-                payment_intent=order.payment_intent_id,
-                amount=amount_minor,
-            )
+            refund = create_refund(order, amount_minor)
             log.info(
                 "Refund created user=%s order=%s amount_minor=%s refund_id=%s",
-                request.user.id, order.id, amount_minor, refund.get("id")
-            )
-            return Response(
-                {"refund_id": refund.get("id"), "status": refund.get("status")},
-                status=status.HTTP_200_OK
+                request.user.id, order.id, amount_minor, refund["id"]
             )
         except Exception as e:
             log.error("Refund error order=%s type=%s msg=%s", order.id, type(e).__name__, str(e))
             return Response({"detail": "refund_error", "message": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(
+            {"refund_id": refund["id"], "status": refund["status"]},
+            status=status.HTTP_200_OK
+        )
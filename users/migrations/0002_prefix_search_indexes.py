@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['email'], name='user_email_prefix', opclasses=['varchar_pattern_ops']),
+        ),
+    ]
@@ -15,5 +15,11 @@ class User(AbstractUser):
 
     objects = UserManager()
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # admin prefix search (LIKE 'term%'); opclasses only apply on PostgreSQL
+            models.Index(fields=["email"], name="user_email_prefix", opclasses=["varchar_pattern_ops"]),
+        ]
+
     def __str__(self):
         return self.email
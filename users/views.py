@@ -3,6 +3,7 @@ from rest_framework import permissions, generics
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from ecom.ratelimit import RateLimit
 from .serializers import SignupSerializer, UserSerializer
 
 log = logging.getLogger("users.api")
@@ -14,6 +15,7 @@ class SignupView(generics.CreateAPIView):
     """
     serializer_class = SignupSerializer
     permission_classes = [permissions.AllowAny]
+    ratelimits = (RateLimit("10/h", key="ip", methods=("POST",)),)
 
     def perform_create(self, serializer):
         user = serializer.save()
@@ -30,8 +32,13 @@ class MeView(APIView):
 class LoginView(TokenObtainPairView):
     """
     JWT login (obtain tokens). Adds simple INFO log on success.
+    Rate limited per client IP (password guessing).
     """
     permission_classes = [permissions.AllowAny]
+    ratelimits = (
+        RateLimit("5/m", key="ip", methods=("POST",)),
+        RateLimit("50/h", key="ip", methods=("POST",), scope="login:hourly"),
+    )
 
     def post(self, request, *args, **kwargs):
         response = super().post(request, *args, **kwargs)
@@ -43,3 +50,4 @@ class LoginView(TokenObtainPairView):
 
 class RefreshView(TokenRefreshView):
     permission_classes = [permissions.AllowAny]
+    ratelimits = (RateLimit("30/m", key="ip", methods=("POST",)),)